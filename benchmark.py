@@ -0,0 +1,277 @@
+import os
+import sys
+import json
+import time
+import statistics
+import py_compile
+import subprocess
+import argparse
+import platform
+import tracemalloc
+import logging
+from datetime import datetime
+from typing import Dict, List
+
+from date_convert import DateTimeUtil
+
+# 固定的参考日期，覆盖普通日期、闰日、年末（周日）、年初、季末
+BENCH_DATES = [
+    datetime(2024, 12, 6),
+    datetime(2024, 2, 29),
+    datetime(2023, 12, 31),
+    datetime(2025, 1, 1),
+    datetime(2024, 6, 30),
+]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+
+# 旧实现：按优先级逐条 match，命中后再为每个子分组重新 match 一次取值
+def resolve_sequential(expression: str, now: datetime):
+    for name, pattern, handler in DateTimeUtil.DATE_RULES:
+        if pattern.match(expression):
+            groups = tuple(pattern.match(expression).group(i + 1) for i in range(pattern.groups))
+            return handler(now, expression, groups)
+    return None
+
+
+def time_per_call(func, expression: str, now: datetime, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(expression, now)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def bench_dispatch(now: datetime, repeat: int):
+    expressions = DateTimeUtil.EXAMPLE_EXPRESSIONS
+    # 预热，同时确认两种实现结果一致
+    for expression in expressions:
+        before = resolve_sequential(expression, now)
+        after = DateTimeUtil.resolve_expression(expression, now)
+        if before != after:
+            raise AssertionError(f"结果不一致: {expression}, {before} != {after}")
+
+    total_before = total_after = 0.0
+    print(f"{'expression':<24}{'before(us)':>12}{'after(us)':>12}{'speedup':>10}")
+    for expression in expressions:
+        before = time_per_call(resolve_sequential, expression, now, repeat)
+        after = time_per_call(DateTimeUtil.resolve_expression, expression, now, repeat)
+        total_before += before
+        total_after += after
+        print(f"{expression:<24}{before:>12.2f}{after:>12.2f}{before / after:>9.2f}x")
+    print(f"{'total':<24}{total_before:>12.2f}{total_after:>12.2f}{total_before / total_after:>9.2f}x")
+
+
+# 按命中的规则把示例表达式分组，每组即一个表达式族，顺序与匹配优先级一致
+def family_cases() -> Dict[str, List[str]]:
+    families = {name: [] for name, pattern, handler in DateTimeUtil.DATE_RULES}
+    for expression in DateTimeUtil.EXAMPLE_EXPRESSIONS:
+        families[DateTimeUtil.match_rule(expression)[0]].append(expression)
+    return {name: expressions for name, expressions in families.items() if expressions}
+
+
+def run_case(expression: str, now: datetime):
+    try:
+        DateTimeUtil.build_date_expressions([expression], now)
+    except ValueError:
+        # 例如 2月29日 的"去年本月"，原逻辑会抛异常，同样计入耗时
+        pass
+
+
+def measure_family(expressions: List[str], min_time: float) -> dict:
+    cases = [(expression, now) for expression in expressions for now in BENCH_DATES]
+    for expression, now in cases:
+        run_case(expression, now)
+
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for expression, now in cases:
+            run_case(expression, now)
+        calls += len(cases)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+
+    # 单次调用过程中的内存分配峰值（字节），tracemalloc 会拖慢执行，因此与计时分开
+    tracemalloc.start()
+    peaks = []
+    for expression, now in cases:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        run_case(expression, now)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    return {
+        "ops_per_sec": calls / elapsed,
+        "us_per_op": elapsed / calls * 1e6,
+        "peak_bytes": sum(peaks) / len(peaks),
+        "cases": len(cases),
+    }
+
+
+def bench_families(min_time: float) -> dict:
+    results = {}
+    all_expressions = []
+    # get_day_ex 遇到不存在的日期（如 12月31日的上月今天）会写 warning 日志，计时期间关闭
+    logging.disable(logging.WARNING)
+    try:
+        for name, expressions in family_cases().items():
+            results[name] = measure_family(expressions, min_time)
+            all_expressions += expressions
+        results["ALL"] = measure_family(all_expressions, min_time * 5)
+    finally:
+        logging.disable(logging.NOTSET)
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "dates": [now.strftime("%Y-%m-%d") for now in BENCH_DATES],
+        "families": results,
+    }
+
+
+def print_families(report: dict):
+    print(f"{'family':<36}{'ops/sec':>12}{'us/op':>10}{'peak(B)':>10}")
+    for name, result in report["families"].items():
+        print(f"{name:<36}{result['ops_per_sec']:>12.0f}{result['us_per_op']:>10.2f}{result['peak_bytes']:>10.0f}")
+
+
+def compare_families(report: dict, baseline: dict, threshold: float) -> int:
+    regressions = 0
+    print(f"{'family':<36}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, result in report["families"].items():
+        base = baseline["families"].get(name)
+        if base is None:
+            print(f"{name:<36}{'-':>12}{result['ops_per_sec']:>12.0f}{'new':>10}")
+            continue
+        change = result["ops_per_sec"] / base["ops_per_sec"] - 1
+        flag = ""
+        if change < -threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{name:<36}{base['ops_per_sec']:>12.0f}{result['ops_per_sec']:>12.0f}{change:>+10.1%}{flag}")
+    return regressions
+
+
+STARTUP_SCRIPT = (
+    "import time\n"
+    "from datetime import datetime\n"
+    "start = time.perf_counter()\n"
+    "from date_convert import DateTimeUtil\n"
+    "imported = time.perf_counter()\n"
+    "DateTimeUtil.build_date_expressions(['上周'], datetime(2024, 12, 6))\n"
+    "print((imported - start) * 1e3, (time.perf_counter() - imported) * 1e3)\n"
+)
+
+
+def bench_startup(runs: int) -> dict:
+    # 先写好 .pyc，测量的是部署后的冷启动而不是首次编译
+    here = os.path.dirname(os.path.abspath(__file__))
+    py_compile.compile(os.path.join(here, "date_convert.py"), doraise=True)
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="")
+
+    import_us, import_ms, first_call_ms = [], [], []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT], cwd=here, env=env,
+                                capture_output=True, text=True, check=True)
+        for line in output.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            fields = [field.strip() for field in line.split("|")]
+            if len(fields) == 3 and fields[2] == "date_convert":
+                import_us.append(int(fields[1]))
+        wall_import, wall_first_call = output.stdout.split()
+        import_ms.append(float(wall_import))
+        first_call_ms.append(float(wall_first_call))
+
+    return {
+        "importtime_ms": statistics.median(import_us) / 1e3,
+        "import_wall_ms": statistics.median(import_ms),
+        "first_call_ms": statistics.median(first_call_ms),
+        "runs": runs,
+    }
+
+
+def bench_pipeline(batch_sizes: List[int], latency_ms: float, per_char_us: float, count: int):
+    # 用确定性的 RuleBackend 模拟模型开销，对比不同批大小下的吞吐量和 padding
+    from date_pipeline import ExtractionPipeline, RuleBackend
+
+    expressions = DateTimeUtil.EXAMPLE_EXPRESSIONS
+    templates = ["{}的销量是多少？", "{}各城市的GMV按渠道拆分是多少", "统计{}新增用户"]
+    questions = [templates[i % len(templates)].format(expressions[i % len(expressions)]) for i in range(count)]
+    expected = None
+    print(f"{'batch_size':>10}{'batches':>10}{'padded':>10}{'q/sec':>12}")
+    for batch_size in batch_sizes:
+        backend = RuleBackend(latency_ms, per_char_us)
+        pipeline = ExtractionPipeline(backend, batch_size=batch_size, max_batch_chars=1 << 30)
+        start = time.perf_counter()
+        result = pipeline.run(questions, BENCH_DATES[0])
+        elapsed = time.perf_counter() - start
+        # 批大小不影响结果和顺序
+        if expected is None:
+            expected = result
+        elif result != expected:
+            raise AssertionError(f"batch_size={batch_size} 的结果与 batch_size={batch_sizes[0]} 不一致")
+        print(f"{batch_size:>10}{pipeline.batches:>10}{backend.padded_chars:>10}{count / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="时间表达式解析性能测试")
+    subparsers = parser.add_subparsers(dest="command")
+
+    dispatch_parser = subparsers.add_parser("dispatch", help="逐条匹配与合并分发的逐表达式耗时对比")
+    dispatch_parser.add_argument("--now", default="2024-12-06", help="参考日期，格式 YYYY-MM-DD")
+    dispatch_parser.add_argument("--repeat", type=int, default=2000, help="每个表达式重复次数")
+
+    families_parser = subparsers.add_parser("families", help="按表达式族统计吞吐量和内存分配")
+    families_parser.add_argument("--min-time", type=float, default=0.2, help="每个表达式族至少运行的秒数")
+    families_parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE, default=None,
+                                 help="把结果保存为基线文件")
+    families_parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, default=None,
+                                 help="与基线文件对比")
+    families_parser.add_argument("--threshold", type=float, default=0.2, help="吞吐量下降超过该比例视为退化")
+
+    startup_parser = subparsers.add_parser("startup", help="用 python -X importtime 测量 import 和首次解析的耗时")
+    startup_parser.add_argument("--runs", type=int, default=20, help="启动子进程的次数，取中位数")
+    startup_parser.add_argument("--max-ms", type=float, default=10.0, help="import 耗时超过该值（毫秒）时退出码为 1")
+    # 延迟的正则编译和日历计算都发生在首次解析，只看 import 发现不了这部分的退化
+    startup_parser.add_argument("--max-first-call-ms", type=float, default=20.0,
+                                help="首次解析耗时超过该值（毫秒）时退出码为 1")
+
+    pipeline_parser = subparsers.add_parser("pipeline", help="用本地替身后端测试批量抽取的批大小")
+    pipeline_parser.add_argument("--batch-sizes", default="1,4,16,64", help="逗号分隔的批大小")
+    pipeline_parser.add_argument("--latency-ms", type=float, default=20.0, help="模拟每次前向的固定耗时（毫秒）")
+    pipeline_parser.add_argument("--per-char-us", type=float, default=5.0, help="模拟 padding 后每个字符的耗时（微秒）")
+    pipeline_parser.add_argument("--count", type=int, default=256, help="问题数量")
+
+    args = parser.parse_args()
+    if args.command == "pipeline":
+        bench_pipeline([int(size) for size in args.batch_sizes.split(",")], args.latency_ms, args.per_char_us,
+                       args.count)
+    elif args.command == "startup":
+        report = bench_startup(args.runs)
+        print(f"import date_convert (-X importtime): {report['importtime_ms']:.2f} ms")
+        print(f"import wall time:                    {report['import_wall_ms']:.2f} ms")
+        print(f"first build_date_expressions call:   {report['first_call_ms']:.2f} ms")
+        failed = []
+        if report["importtime_ms"] > args.max_ms:
+            failed.append(f"import {report['importtime_ms']:.2f} ms > {args.max_ms} ms")
+        if report["first_call_ms"] > args.max_first_call_ms:
+            failed.append(f"首次解析 {report['first_call_ms']:.2f} ms > {args.max_first_call_ms} ms")
+        for message in failed:
+            print(f"REGRESSION: {message}")
+        sys.exit(1 if failed else 0)
+    elif args.command == "families":
+        report = bench_families(args.min_time)
+        if args.compare:
+            with open(args.compare, encoding="utf-8") as f:
+                regressions = compare_families(report, json.load(f), args.threshold)
+        else:
+            regressions = 0
+            print_families(report)
+        if args.save:
+            with open(args.save, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        sys.exit(1 if regressions else 0)
+    else:
+        now = getattr(args, "now", "2024-12-06")
+        bench_dispatch(datetime.strptime(now, "%Y-%m-%d"), getattr(args, "repeat", 2000))
@@ -0,0 +1,195 @@
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+from collections import deque, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Iterator, List
+
+from date_convert import DateTimeUtil, reference_day
+
+
+# 输入记录统一为 (id, anchor_date, expressions, error)，anchor_date 为空时使用当天
+# 读取出错的行 error 为带行号的错误信息，照常进入输出，不中断整个任务
+def check_expressions(expressions) -> List[str]:
+    if not isinstance(expressions, list) or not all(isinstance(e, str) for e in expressions):
+        raise ValueError("expressions 应为字符串列表")
+    return expressions
+
+
+def read_jsonl(stream) -> Iterator[tuple]:
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        record = None
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("应为 JSON 对象")
+            expressions = check_expressions(record.get("expressions") or [])
+        except ValueError as e:
+            record_id = record.get("id") if isinstance(record, dict) else None
+            yield record_id, "", [], f"第{number}行不合法: {e}"
+            continue
+        yield record.get("id"), record.get("anchor_date") or "", expressions, None
+
+
+def read_csv(stream) -> Iterator[tuple]:
+    # expressions 列可以是 JSON 列表，也可以用 | 分隔
+    reader = csv.DictReader(stream)
+    for row in reader:
+        expressions = (row.get("expressions") or "").strip()
+        try:
+            if expressions.startswith("["):
+                expressions = check_expressions(json.loads(expressions))
+            else:
+                expressions = [e for e in expressions.split("|") if e]
+        except ValueError as e:
+            yield row.get("id"), row.get("anchor_date") or "", [], f"第{reader.line_num}行不合法: {e}"
+            continue
+        yield row.get("id"), row.get("anchor_date") or "", expressions, None
+
+
+def resolve_chunk(records: List[tuple], tz: str = None) -> List[tuple]:
+    # 同一块内按参考日期分组，每组走一次 run_batch，相同表达式只解析一次
+    # 带时区偏移的 anchor_date 换算到 tz 的当地日期，anchor_date 为空时取 tz 的今天
+    # 出错的记录输出 error 字段，不影响其他记录：anchor_date 不合法时整组报错，整组解析失败时逐条重试
+    groups = defaultdict(list)
+    results = [None] * len(records)
+    for index, (record_id, anchor_date, expressions, error) in enumerate(records):
+        if error is not None:
+            results[index] = (record_id, anchor_date, [], error)
+        else:
+            groups[anchor_date].append(index)
+
+    for anchor_date, indexes in groups.items():
+        try:
+            now = reference_day(datetime.fromisoformat(anchor_date) if anchor_date else None, tz)
+        except (ValueError, TypeError, KeyError) as e:
+            for i in indexes:
+                results[i] = (records[i][0], anchor_date, [], f"anchor_date 不合法: {e}")
+            continue
+        try:
+            resolved = DateTimeUtil.run_batch([records[i][2] for i in indexes], now)
+        except Exception:
+            for i in indexes:
+                results[i] = resolve_record(records[i], now)
+            continue
+        for i, result in zip(indexes, resolved):
+            results[i] = (records[i][0], anchor_date, result, None)
+    return results
+
+
+def resolve_record(record: tuple, now) -> tuple:
+    record_id, anchor_date, expressions, _ = record
+    try:
+        return record_id, anchor_date, DateTimeUtil.run_batch([expressions], now)[0], None
+    except Exception as e:
+        return record_id, anchor_date, [], f"{type(e).__name__}: {e}"
+
+
+class BulkWriter:
+    def __init__(self, stream, output_format: str):
+        self.stream = stream
+        self.output_format = output_format
+        self.csv_writer = None
+        if output_format == "csv":
+            self.csv_writer = csv.writer(stream)
+            self.csv_writer.writerow(["id", "anchor_date", "result", "error"])
+
+    def write(self, record_id, anchor_date: str, result: List[str], error: str = None):
+        if self.csv_writer is not None:
+            self.csv_writer.writerow([record_id, anchor_date, json.dumps(result, ensure_ascii=False), error or ""])
+        else:
+            record = {"id": record_id, "anchor_date": anchor_date, "result": result}
+            if error is not None:
+                record["error"] = error
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def chunked(records: Iterator[tuple], chunk_size: int) -> Iterator[List[tuple]]:
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_bulk(records: Iterator[tuple], writer: BulkWriter, workers: int, chunk_size: int,
+             max_inflight: int, report_every: float, log=sys.stderr, tz: str = None) -> int:
+    # 滑动窗口提交任务：最多 max_inflight 个块在途，按提交顺序写出，内存占用有上界
+    # 整块失败（如子进程退出）时该块每条记录都输出 error，任务继续
+    total = errors = 0
+    start = last_report = time.perf_counter()
+    inflight = deque()
+
+    def drain_one():
+        nonlocal total, errors, last_report
+        chunk, future = inflight.popleft()
+        try:
+            results = future.result()
+        except Exception as e:
+            results = [(record[0], record[1], [], f"{type(e).__name__}: {e}") for record in chunk]
+        for record_id, anchor_date, result, error in results:
+            writer.write(record_id, anchor_date, result, error)
+            total += 1
+            errors += error is not None
+        now = time.perf_counter()
+        if report_every and now - last_report >= report_every:
+            last_report = now
+            log.write(f"已处理 {total} 条，{total / (now - start):.0f} 条/秒\n")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk in chunked(records, chunk_size):
+            if len(inflight) >= max_inflight:
+                drain_one()
+            inflight.append((chunk, executor.submit(resolve_chunk, chunk, tz)))
+        while inflight:
+            drain_one()
+
+    elapsed = time.perf_counter() - start
+    log.write(f"完成 {total} 条（{errors} 条出错），耗时 {elapsed:.2f} 秒，{total / elapsed if elapsed else 0:.0f} 条/秒\n")
+    return total
+
+
+def detect_format(path: str, default: str = "jsonl") -> str:
+    if path and path.lower().endswith(".csv"):
+        return "csv"
+    return default
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="批量解析 JSONL/CSV 文件中的时间表达式")
+    parser.add_argument("input", help="输入文件，- 表示标准输入；记录字段为 id, anchor_date, expressions")
+    parser.add_argument("-o", "--output", default="-", help="输出文件，默认标准输出")
+    parser.add_argument("--input-format", choices=["jsonl", "csv"], default=None, help="默认按扩展名判断")
+    parser.add_argument("--output-format", choices=["jsonl", "csv"], default=None, help="默认按扩展名判断")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="进程数，默认 CPU 核数")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="每个任务块的记录数")
+    parser.add_argument("--max-inflight", type=int, default=None, help="同时在途的任务块数，默认进程数的 4 倍")
+    parser.add_argument("--report-every", type=float, default=5.0, help="吞吐量汇报间隔（秒），0 表示不汇报")
+    parser.add_argument("--tz", default=None, help="IANA 时区名，决定 anchor_date 为空时的今天，默认服务器本地时区")
+    args = parser.parse_args(argv)
+
+    input_format = args.input_format or detect_format(args.input)
+    output_format = args.output_format or detect_format(args.output, input_format)
+    input_stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8", newline="")
+    output_stream = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        records = read_csv(input_stream) if input_format == "csv" else read_jsonl(input_stream)
+        run_bulk(records, BulkWriter(output_stream, output_format), args.workers, args.chunk_size,
+                 args.max_inflight or args.workers * 4, args.report_every, tz=args.tz)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import re
+import json
+import time
+import sqlite3
+import threading
+import unicodedata
+from typing import Dict, List, Optional
+
+
+class ExtractionCache:
+    # 问题 -> 时间表达式列表 的持久化缓存（SQLite）。抽取结果与当天日期无关，命中后按当天的 now 重新解析即可
+    # 键为规范化后的问题；超过 max_entries 时按最近使用时间淘汰最旧的 evict_ratio 部分
+    SPACE_PATTERN = re.compile(r'\s+')
+    TRAILING_PUNCTUATION = "?？!！。.,，;；~"
+
+    def __init__(self, path: str = "date_extraction_cache.db", max_entries: int = 100000, evict_ratio: float = 0.1):
+        self.path = path
+        self.max_entries = max_entries
+        self.evict_ratio = evict_ratio
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS extraction ("
+                           "question TEXT PRIMARY KEY, expressions TEXT NOT NULL, last_used REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS extraction_last_used ON extraction (last_used)")
+        self._size = self._conn.execute("SELECT COUNT(*) FROM extraction").fetchone()[0]
+
+    @staticmethod
+    def normalize_question(question: str) -> str:
+        # 全角转半角、去掉空白和句末标点、英文小写
+        text = unicodedata.normalize("NFKC", question)
+        text = ExtractionCache.SPACE_PATTERN.sub("", text).lower()
+        return text.rstrip(ExtractionCache.TRAILING_PUNCTUATION)
+
+    def get(self, question: str) -> Optional[List[str]]:
+        return self.get_many([question])[0]
+
+    def get_many(self, questions: List[str]) -> List[Optional[List[str]]]:
+        keys = [ExtractionCache.normalize_question(question) for question in questions]
+        found: Dict[str, List[str]] = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            # SQLite 默认最多 999 个参数
+            for start in range(0, len(unique), 900):
+                part = unique[start:start + 900]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT question, expressions FROM extraction WHERE question IN ({placeholders})", part)
+                found.update((key, json.loads(expressions)) for key, expressions in rows)
+            if found:
+                now = time.time()
+                self._conn.executemany("UPDATE extraction SET last_used = ? WHERE question = ?",
+                                       [(now, key) for key in found])
+            results = [found.get(key) for key in keys]
+            hits = sum(result is not None for result in results)
+            self.hits += hits
+            self.misses += len(results) - hits
+        return results
+
+    def put(self, question: str, expressions: List[str]):
+        self.put_many([question], [expressions])
+
+    def put_many(self, questions: List[str], expression_lists: List[List[str]]):
+        now = time.time()
+        rows = {ExtractionCache.normalize_question(question): json.dumps(expressions, ensure_ascii=False)
+                for question, expressions in zip(questions, expression_lists)}
+        with self._lock:
+            size, evictions = self._size, self.evictions
+            self._conn.execute("BEGIN")
+            try:
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO extraction (question, expressions, last_used) VALUES (?, ?, ?)",
+                    [(key, expressions, now) for key, expressions in rows.items()])
+                self._size += self._conn.total_changes - before
+                self._conn.executemany("UPDATE extraction SET expressions = ?, last_used = ? WHERE question = ?",
+                                       [(expressions, now, key) for key, expressions in rows.items()])
+                if self._size > self.max_entries:
+                    self._evict()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                # 回滚后连接回到自动提交状态，之后的写入不受影响
+                self._conn.execute("ROLLBACK")
+                self._size, self.evictions = size, evictions
+                raise
+
+    def _evict(self):
+        # 一次淘汰一批，避免每次写入都触发删除
+        count = self._size - self.max_entries + int(self.max_entries * self.evict_ratio)
+        self._conn.execute("DELETE FROM extraction WHERE question IN "
+                           "(SELECT question FROM extraction ORDER BY last_used LIMIT ?)", (count,))
+        self.evictions += count
+        self._size = self._conn.execute("SELECT COUNT(*) FROM extraction").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM extraction")
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def info(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"size": self._size, "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / total if total else 0.0, "evictions": self.evictions}
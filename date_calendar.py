@@ -0,0 +1,322 @@
+import bisect
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from date_convert import DateTimeUtil, DateRange, to_day
+
+
+class CalendarRangeError(ValueError):
+    # 日期超出 PeriodIndex 预先展开的年份范围，FiscalCalendar 对这类表达式不给出区间
+    pass
+
+
+class CalendarConfig:
+    # fiscal_start_month: 财年起始月，1 为公历年
+    # year_label: "start" 按财年开始所在的公历年命名（2024财年 = 2024-04 ~ 2025-03），"end" 按结束所在的公历年命名
+    # week_start: 一周的第一天，0 为周一 ... 6 为周日
+    # week_numbering: 第N周的编号方式
+    #   "jan1"       从财年第一天起每 7 天一周，最后一周截断到年末（与公历规则一致）
+    #   "first_full" 从财年内第一个完整周开始
+    #   "iso"        ISO-8601：第 1 周是包含财年第 4 天的那一周，可能跨年
+    # retail_pattern: "445" / "454" / "544" 时使用零售周历：财年由整周组成，每季度 13 周按该模式分成 3 个期间，
+    #   53 周的年份多出的一周计入最后一个期间；财年在起始月前一个月的最后一个周末结束（retail_anchor="last"），
+    #   或在离该月末最近的周末结束（"nearest"）
+    PATTERNS = {"445": (4, 4, 5), "454": (4, 5, 4), "544": (5, 4, 4)}
+    WEEK_NUMBERINGS = ("jan1", "first_full", "iso")
+
+    def __init__(self, fiscal_start_month: int = 1, year_label: str = "start", week_start: int = 0,
+                 week_numbering: str = "jan1", retail_pattern: str = None, retail_anchor: str = "last"):
+        if not 1 <= fiscal_start_month <= 12:
+            raise ValueError(f"fiscal_start_month 需要在 1-12 之间: {fiscal_start_month}")
+        if year_label not in ("start", "end"):
+            raise ValueError(f"year_label 只能是 start 或 end: {year_label}")
+        if not 0 <= week_start <= 6:
+            raise ValueError(f"week_start 需要在 0-6 之间: {week_start}")
+        if week_numbering not in CalendarConfig.WEEK_NUMBERINGS:
+            raise ValueError(f"week_numbering 只能是 {', '.join(CalendarConfig.WEEK_NUMBERINGS)}: {week_numbering}")
+        if retail_pattern is not None and retail_pattern not in CalendarConfig.PATTERNS:
+            raise ValueError(f"retail_pattern 只能是 {', '.join(CalendarConfig.PATTERNS)}: {retail_pattern}")
+        if retail_anchor not in ("last", "nearest"):
+            raise ValueError(f"retail_anchor 只能是 last 或 nearest: {retail_anchor}")
+        self.fiscal_start_month = fiscal_start_month
+        self.year_label = year_label
+        self.week_start = week_start
+        self.week_numbering = week_numbering
+        self.retail_pattern = retail_pattern
+        self.retail_anchor = retail_anchor
+
+    @property
+    def is_gregorian(self) -> bool:
+        # 季度、年与公历一致时沿用 2024年第1季度、2024年 这样的输出
+        return self.fiscal_start_month == 1 and self.retail_pattern is None
+
+    def __repr__(self):
+        return (f"CalendarConfig(fiscal_start_month={self.fiscal_start_month}, year_label={self.year_label!r}, "
+                f"week_start={self.week_start}, week_numbering={self.week_numbering!r}, "
+                f"retail_pattern={self.retail_pattern!r}, retail_anchor={self.retail_anchor!r})")
+
+
+class PeriodIndex:
+    # 把日历配置预先展开成各粒度期间的起始日（date.toordinal()）升序数组，查询都是二分查找：
+    #   starts[kind][i] 为第 i 个期间的起始日，末尾多一个哨兵，期间 i 的结束日为 starts[kind][i + 1] - 1
+    #   labels[kind][i] 为 (财年, 财年内序号)
+    # kind 为 year / half / quarter / month / week，其中 week 是按 week_start 对齐的连续周
+    # numbered_weeks[财年] 为按 week_numbering 编号的第 1..N 周 (起始日, 结束日)
+    PER_YEAR = {"year": 1, "half": 2, "quarter": 4, "month": 12}
+
+    def __init__(self, config: CalendarConfig, first_year: int = 1900, last_year: int = 2100):
+        self.config = config
+        self.first_year = first_year
+        self.last_year = last_year
+        self.starts: Dict[str, List[int]] = {kind: [] for kind in ("year", "half", "quarter", "month", "week")}
+        self.labels: Dict[str, List[Tuple[int, int]]] = {kind: [] for kind in PeriodIndex.PER_YEAR}
+        self.first_index: Dict[str, Dict[int, int]] = {kind: {} for kind in PeriodIndex.PER_YEAR}
+        self.numbered_weeks: Dict[int, List[Tuple[int, int]]] = {}
+        self._build()
+
+    def nominal_start(self, fiscal_year: int) -> date:
+        config = self.config
+        year = fiscal_year
+        if config.fiscal_start_month > 1 and config.year_label == "end":
+            year -= 1
+        return date(year, config.fiscal_start_month, 1)
+
+    def aligned(self, ordinal: int) -> int:
+        # ordinal 所在周（按 week_start 对齐）的第一天
+        return ordinal - (date.fromordinal(ordinal).weekday() - self.config.week_start) % 7
+
+    def retail_year_end(self, fiscal_year: int) -> int:
+        # 零售财年的最后一天：起始月前一个月的最后一个周末，或离月末最近的周末
+        month_end = self.nominal_start(fiscal_year + 1).toordinal() - 1
+        week_end = self.aligned(month_end) + 6
+        if week_end > month_end:
+            week_end -= 7
+        if self.config.retail_anchor == "nearest" and month_end - week_end > 3:
+            week_end += 7
+        return week_end
+
+    def year_bounds(self, fiscal_year: int) -> Tuple[int, int]:
+        # (第一天, 下一财年第一天)
+        if self.config.retail_pattern is not None:
+            return self.retail_year_end(fiscal_year - 1) + 1, self.retail_year_end(fiscal_year) + 1
+        return self.nominal_start(fiscal_year).toordinal(), self.nominal_start(fiscal_year + 1).toordinal()
+
+    def month_starts(self, fiscal_year: int, year_start: int, year_end: int) -> List[int]:
+        if self.config.retail_pattern is not None:
+            starts, ordinal = [], year_start
+            for weeks in CalendarConfig.PATTERNS[self.config.retail_pattern] * 4:
+                starts.append(ordinal)
+                ordinal += weeks * 7
+            return starts
+        first = self.nominal_start(fiscal_year)
+        index = first.year * 12 + first.month - 1
+        return [date((index + i) // 12, (index + i) % 12 + 1, 1).toordinal() for i in range(12)]
+
+    def week_numbers(self, year_start: int, year_end: int) -> List[Tuple[int, int]]:
+        numbering = self.config.week_numbering
+        if self.config.retail_pattern is not None:
+            return [(start, start + 6) for start in range(year_start, year_end, 7)]
+        if numbering == "jan1":
+            return [(start, min(start + 6, year_end - 1)) for start in range(year_start, year_end, 7)]
+        if numbering == "first_full":
+            first = self.aligned(year_start + 6)
+            return [(start, start + 6) for start in range(first, year_end - 6, 7)]
+        # iso：第 1 周包含财年第 4 天，最后一周到下一财年第 1 周之前
+        first = self.aligned(year_start + 3)
+        last = self.aligned(year_end + 3)
+        return [(start, start + 6) for start in range(first, last, 7)]
+
+    def _build(self):
+        bounds = {year: self.year_bounds(year) for year in range(self.first_year, self.last_year + 2)}
+        for year in range(self.first_year, self.last_year + 1):
+            year_start, year_end = bounds[year]
+            months = self.month_starts(year, year_start, year_end)
+            groups = {"year": months[:1], "half": months[::6], "quarter": months[::3], "month": months}
+            for kind, starts in groups.items():
+                self.first_index[kind][year] = len(self.starts[kind])
+                self.starts[kind] += starts
+                self.labels[kind] += [(year, i + 1) for i in range(len(starts))]
+            self.numbered_weeks[year] = self.week_numbers(year_start, year_end)
+        sentinel = bounds[self.last_year][1]
+        for kind in PeriodIndex.PER_YEAR:
+            self.starts[kind].append(sentinel)
+        first = self.aligned(bounds[self.first_year][0])
+        self.starts["week"] = list(range(first, sentinel + 7, 7))
+
+    def locate(self, kind: str, day: date) -> int:
+        starts = self.starts[kind]
+        ordinal = day.toordinal()
+        i = bisect.bisect_right(starts, ordinal) - 1
+        if i < 0 or i >= len(starts) - 1:
+            raise CalendarRangeError(f"{day} 超出日历范围 {self.first_year}-{self.last_year}")
+        return i
+
+    def bounds(self, kind: str, i: int) -> Tuple[date, date]:
+        starts = self.starts[kind]
+        if i < 0 or i >= len(starts) - 1:
+            raise CalendarRangeError(f"超出日历范围 {self.first_year}-{self.last_year}")
+        return date.fromordinal(starts[i]), date.fromordinal(starts[i + 1] - 1)
+
+    def find(self, kind: str, fiscal_year: int, number: int) -> Optional[int]:
+        if not 1 <= number <= PeriodIndex.PER_YEAR[kind]:
+            return None
+        first = self.first_index[kind].get(fiscal_year)
+        if first is None:
+            raise CalendarRangeError(f"{fiscal_year} 超出日历范围 {self.first_year}-{self.last_year}")
+        return first + number - 1
+
+    def fiscal_year(self, day: date) -> int:
+        return self.labels["year"][self.locate("year", day)][0]
+
+    def numbered_week(self, fiscal_year: int, number: int) -> Optional[Tuple[date, date]]:
+        weeks = self.numbered_weeks.get(fiscal_year)
+        if weeks is None:
+            raise CalendarRangeError(f"{fiscal_year} 超出日历范围 {self.first_year}-{self.last_year}")
+        if not 1 <= number <= len(weeks):
+            return None
+        start, end = weeks[number - 1]
+        return date.fromordinal(start), date.fromordinal(end)
+
+    def complete_week(self, first_day: date, last_day: date, number: int) -> Optional[Tuple[date, date]]:
+        # first_day~last_day 之内的第 number 个完整周
+        starts = self.starts["week"]
+        if first_day.toordinal() < starts[0] or last_day.toordinal() >= starts[-1]:
+            raise CalendarRangeError(f"{first_day} 超出日历范围 {self.first_year}-{self.last_year}")
+        i = bisect.bisect_left(starts, first_day.toordinal()) + number - 1
+        if number < 1 or i >= len(starts) - 1 or starts[i] + 6 > last_day.toordinal():
+            return None
+        return self.bounds("week", i)
+
+    def last_complete(self, kind: str, today: date) -> int:
+        # 截至 today 的最后一个完整期间：today 是期间最后一天时为当前期间，否则为上一个
+        i = self.locate(kind, today)
+        return i if self.starts[kind][i + 1] - 1 == today.toordinal() else i - 1
+
+
+class FiscalCalendar:
+    # 按日历配置解析季度、半年、年和周相关的规则，通过 DateTimeUtil.set_calendar 启用；
+    # 其余规则（具体日期、月份、近N天等）与日历无关，仍走 DateTimeUtil 原有逻辑
+    QUARTER_OFFSETS = {"本季度": 0, "上季度": -1, "下季度": 1, "去年本季度": -4}
+
+    def __init__(self, config: CalendarConfig = None, first_year: int = 1900, last_year: int = 2100):
+        self.config = config or CalendarConfig()
+        self.index = PeriodIndex(self.config, first_year, last_year)
+        quarter = "quarter" if self.config.is_gregorian else "fiscal_quarter"
+        year = "year" if self.config.is_gregorian else "fiscal_year"
+        index = self.index
+        # 规则名 -> (粒度, 区间函数)，与 DateTimeUtil.RANGE_RULES 的格式相同
+        self.RANGE_RULES = {
+            "SPECIFIC_YEAR_HALF_YEAR": (
+                "half_year", lambda today, expression, g: self.period("half", int(g[0]), 1 if g[1] == "上" else 2)),
+            "GENERAL_YEAR_HALF_YEAR": (
+                "half_year", lambda today, expression, g: self.period(
+                    "half", self.year_of(today, g[0]), 1 if g[1] == "上" else 2)),
+            "HALF_YEAR": (
+                "half_year", lambda today, expression, g: self.period(
+                    "half", index.fiscal_year(today), 1 if g[0] == "上" else 2)),
+            "SPECIFIC_YEAR_MONTH_COMPLETE_WEEK": (
+                "week", lambda today, expression, g: self.month_complete_week(int(g[0]), int(g[1]), int(g[2]))),
+            "GENERAL_YEAR_MONTH_COMPLETE_WEEK": (
+                "week", lambda today, expression, g: self.month_complete_week(
+                    today.year + DateTimeUtil.YEAR_OFFSETS[g[0]], int(g[1]), int(g[2]))),
+            "SPECIFIC_YEAR_COMPLETE_WEEK": (
+                "week", lambda today, expression, g: self.year_complete_week(int(g[0]), int(g[1]))),
+            "GENERAL_YEAR_COMPLETE_WEEK": (
+                "week", lambda today, expression, g: self.year_complete_week(self.year_of(today, g[0]), int(g[1]))),
+            "GENERAL_MONTH_COMPLETE_WEEK": (
+                "week", lambda today, expression, g: self.month_complete_week(
+                    *DateTimeUtil.month_of(today, g[0]), int(g[1]))),
+            "WEEK_DAY": (
+                "day", lambda today, expression, g: self.week_day(today, 0, int(g[0]) - 1)),
+            "GENERAL_WEEK_SPECIFIC_DAY": (
+                "day", lambda today, expression, g: self.week_day(
+                    today, DateTimeUtil.WEEK_OFFSETS[g[0]], self.weekday_offset(int(g[1])))),
+            "SPECIFIC_YEAR_QUARTER": (
+                quarter, lambda today, expression, g: self.period("quarter", int(expression[0:4]), int(expression[6]))),
+            "GENERAL_YEAR_QUARTER": (
+                quarter, lambda today, expression, g: self.period(
+                    "quarter", self.year_of(today, g[0]), int(g[1][1]))),
+            "GENERAL_QUARTER": (
+                quarter, lambda today, expression, g: index.bounds(
+                    "quarter", index.locate("quarter", today) + FiscalCalendar.QUARTER_OFFSETS[g[0]])),
+            "GENERAL_WEEK": (
+                "week", lambda today, expression, g: index.bounds(
+                    "week", index.locate("week", today) + DateTimeUtil.WEEK_OFFSETS[g[0]])),
+            "SPECIFIC_YEAR_WEEK": (
+                "week", lambda today, expression, g: index.numbered_week(int(g[0]), int(g[1]))),
+            "GENERAL_YEAR_WEEK": (
+                "week", lambda today, expression, g: index.numbered_week(self.year_of(today, g[0]), int(g[1]))),
+            "SPECIFIC_YEAR_MONTH_LAST_WEEK": (
+                "week", lambda today, expression, g: self.month_last_week(int(g[0]), int(g[1]))),
+            "GENERAL_MONTH_LAST_WEEK": (
+                "week", lambda today, expression, g: self.month_last_week(*DateTimeUtil.month_of(today, g[0]))),
+            "RECENT_N_COMPLETE_YEAR": (
+                "range", lambda today, expression, g: self.recent_complete("year", today, int(g[0]))),
+            "RECENT_N_COMPLETE_QUARTER": (
+                "range", lambda today, expression, g: self.recent_complete("quarter", today, int(g[0]))),
+            "RECENT_N_COMPLETE_WEEK": (
+                "range", lambda today, expression, g: self.recent_complete("week", today, int(g[0]))),
+            "RECENT_N_QUARTER_WITH_CURRENT": (
+                "range", lambda today, expression, g: self.recent_with_current("quarter", today, int(g[0]))),
+            "SPECIFIC_YEAR": (
+                year, lambda today, expression, g: self.period("year", int(g[0]), 1)),
+            "GENERAL_YEAR": (
+                year, lambda today, expression, g: self.period("year", self.year_of(today, g[0]), 1)),
+        }
+        if self.config.is_gregorian:
+            # 内置的 近N个完整季度 从季度初的次日开始（沿用原实现的结果），公历季度下交给内置规则，保持输出一致
+            del self.RANGE_RULES["RECENT_N_COMPLETE_QUARTER"]
+
+    def year_of(self, today: date, year_ex: str) -> int:
+        return self.index.fiscal_year(today) + DateTimeUtil.YEAR_OFFSETS[year_ex]
+
+    def period(self, kind: str, fiscal_year: int, number: int) -> Optional[Tuple[date, date]]:
+        i = self.index.find(kind, fiscal_year, number)
+        return None if i is None else self.index.bounds(kind, i)
+
+    def weekday_offset(self, weekday: int) -> int:
+        # 星期N 相对一周第一天的天数，周日开始的周里 星期1 是第 2 天；
+        # 星期0、星期8 等与公历规则一样从本周星期1 往前后顺延（星期0 是星期1 的前一天）
+        monday = -self.config.week_start % 7
+        if 1 <= weekday <= 7:
+            return (monday + weekday - 1) % 7
+        return monday + weekday - 1
+
+    def week_day(self, today: date, week_offset: int, day_offset: int) -> Tuple[date, date]:
+        start = self.index.bounds("week", self.index.locate("week", today) + week_offset)[0]
+        day = start + timedelta(days=day_offset)
+        return day, day
+
+    def month_complete_week(self, year: int, month: int, number: int) -> Optional[Tuple[date, date]]:
+        return self.index.complete_week(date(year, month, 1), DateTimeUtil.month_end(year, month), number)
+
+    def year_complete_week(self, fiscal_year: int, number: int) -> Optional[Tuple[date, date]]:
+        start, end = self.period("year", fiscal_year, 1)
+        return self.index.complete_week(start, end, number)
+
+    def month_last_week(self, year: int, month: int) -> Tuple[date, date]:
+        end = DateTimeUtil.month_end(year, month)
+        return self.index.bounds("week", self.index.locate("week", end))[0], end
+
+    def recent_complete(self, kind: str, today: date, n: int) -> Tuple[date, date]:
+        last = self.index.last_complete(kind, today)
+        return self.index.bounds(kind, last - n + 1)[0], self.index.bounds(kind, last)[1]
+
+    def recent_with_current(self, kind: str, today: date, n: int) -> Tuple[date, date]:
+        current = self.index.locate(kind, today)
+        return self.index.bounds(kind, current - n + 1)[0], self.index.bounds(kind, current)[1]
+
+    def resolve_range(self, name: str, now: date, expression: str, groups: tuple) -> Optional[DateRange]:
+        # 超出日历范围时返回 None，公历配置下由 DateTimeUtil 按原规则计算
+        granularity, range_func = self.RANGE_RULES[name]
+        try:
+            dates = range_func(to_day(now), expression, groups)
+        except CalendarRangeError:
+            return None
+        if dates is None:
+            return None
+        return DateRange(expression, dates[0], dates[1], granularity, name)
+
+    def resolve(self, name: str, now: date, expression: str, groups: tuple) -> Optional[str]:
+        date_range = self.resolve_range(name, now, expression, groups)
+        return None if date_range is None else date_range.format()
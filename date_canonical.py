@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from datetime import date
+from date_convert import DateTimeUtil, DateRange, OrdinalCalendar, reference_day
+
+
+def default_candidates() -> list[str]:
+    # 相对区间的候选说法，靠前的优先作为规范表达式
+    candidates = [f"近{n}天" for n in range(1, 366)]
+    candidates += [f"不包含今天的近{n}天" for n in range(1, 366)]
+    candidates += [f"近{n}周" for n in range(1, 53)]
+    candidates += [f"近{n}个月" for n in range(1, 25)]
+    candidates += [f"近{n}年" for n in range(1, 11)]
+    candidates += [f"近{n}个完整周" for n in range(1, 53)]
+    candidates += [f"近{n}个完整年" for n in range(1, 11)]
+    candidates += [f"包含当前季度的近{n}个季度" for n in range(1, 9)]
+    candidates += [f"近{n}个完整季度" for n in range(1, 9)]
+    candidates += ["近2个完整月"]
+    # 跨年的周没有绝对写法；设置财年日历后年、季度等也可能没有，用示例表达式兜底
+    candidates += list(DateTimeUtil.WEEK_OFFSETS)
+    candidates += DateTimeUtil.EXAMPLE_EXPRESSIONS
+    return candidates
+
+
+class CanonicalIndex:
+    # 区间 -> 规范表达式 的反向索引，与 DateRange.fingerprint 配合使用：
+    #   某天、某月、某季度、某半年、某年、年内的完整周 直接生成绝对写法（2024年第48个完整周），不随参考日期变化
+    #   其余区间（近N天 等）在创建时按 now 把候选说法逐个解析建立索引
+    # 生成的表达式都会再解析一遍确认得到同一区间，设置了财年日历或注册了新规则时也成立
+    def __init__(self, now: date = None, tz=None, candidates: list[str] = None):
+        self.now = reference_day(now, tz)
+        # 建立索引时的日历和规则表，变化后索引需要重建
+        self.calendar = DateTimeUtil.get_calendar()
+        self.rules = DateTimeUtil.DATE_RULES
+        self.index: dict[tuple, str] = {}
+        for date_range in DateTimeUtil.build_date_ranges(candidates or default_candidates(), self.now):
+            self.index.setdefault(date_range.fingerprint, date_range.expression)
+
+    @staticmethod
+    def absolute(start: date, end: date) -> list[str]:
+        # 可能表示 start~end 的绝对写法，按优先级排列，是否成立由 lookup 解析验证
+        shape = DateRange("", start, end, "range", "").shape
+        year = f"{start.year:04d}年"
+        month = f"{year}{start.month:02d}月"
+        if shape == "day":
+            return [f"{month}{start.day:02d}日"]
+        if shape == "month":
+            return [month]
+        if shape == "quarter":
+            return [f"{year}第{(start.month - 1) // 3 + 1}季度"]
+        if shape == "half_year":
+            return [f"{year}{'上' if start.month == 1 else '下'}半年"]
+        if shape == "year":
+            return [year]
+        if end.year != start.year:
+            return []
+        expressions = []
+        if shape == "week":
+            week = (start.toordinal() - OrdinalCalendar.first_monday(start.year)) // 7 + 1
+            expressions.append(f"{year}第{week:02d}个完整周")
+        # 按天数切分的周：从1月1日或每月1日起每7天一周，最后一周到月底为止
+        expressions.append(f"{year}第{(start.timetuple().tm_yday - 1) // 7 + 1:02d}周")
+        if end.month == start.month:
+            expressions.append(f"{month}第{(start.day - 1) // 7 + 1}周")
+            expressions.append(f"{month}最后一周")
+        return expressions
+
+    def lookup(self, start: date, end: date) -> str | None:
+        fingerprint = DateRange("", start, end, "range", "").fingerprint
+        for expression in CanonicalIndex.absolute(start, end):
+            resolved = DateTimeUtil.resolve_range(expression, self.now)
+            if resolved is not None and resolved.fingerprint == fingerprint:
+                return expression
+        return self.index.get(fingerprint)
+
+    def canonical(self, target: DateRange | tuple) -> str | None:
+        # target 为 DateRange 或 fingerprint
+        if isinstance(target, DateRange):
+            return self.lookup(target.start, target.end)
+        return self.lookup(date.fromisoformat(target[0]), date.fromisoformat(target[1]))
+
+
+class DateCanonicalUtil:
+    # 按参考日期缓存反向索引，与 DateTimeUtil 的当天结果表一样只保留最近几天，整体替换字典
+    # set_calendar、register_rule 之后按新的日历和规则重建
+    INDEX_DAYS = 3
+    _indexes: dict[date, CanonicalIndex] = {}
+
+    @staticmethod
+    def get_index(now: date = None, tz=None) -> CanonicalIndex:
+        day = reference_day(now, tz)
+        indexes = DateCanonicalUtil._indexes
+        index = indexes.get(day)
+        if index is None or index.calendar is not DateTimeUtil.get_calendar() or index.rules is not DateTimeUtil.DATE_RULES:
+            index = CanonicalIndex(day)
+            indexes = dict(indexes)
+            indexes[day] = index
+            if len(indexes) > DateCanonicalUtil.INDEX_DAYS:
+                del indexes[min(indexes)]
+            DateCanonicalUtil._indexes = indexes
+        return index
+
+    @staticmethod
+    def clear():
+        DateCanonicalUtil._indexes = {}
+
+    @staticmethod
+    def run(date_list, now: date = None, tz=None) -> dict[str, str | None]:
+        # 表达式 -> 规范表达式，区间相同的说法得到同一个规范表达式
+        day = reference_day(now, tz)
+        index = DateCanonicalUtil.get_index(day)
+        return {date_range.expression: index.canonical(date_range)
+                for date_range in DateTimeUtil.build_date_ranges(date_list, day)}
@@ -1,356 +1,1156 @@
-import re
-import calendar
+# 冷启动敏感：模块级只导入 datetime/time，re、logging、threading 等在首次用到时再导入，
+# 注解不在运行时求值，因此也不需要导入 typing
+from __future__ import annotations
+
+import time
+import bisect
 from datetime import datetime, timedelta, date
-from typing import List
-from dateutil.relativedelta import relativedelta
 
 
-class DateTimeUtil:
-    SPECIFIC_YEAR_MONTH_DAY_PATTERN = re.compile(r'\d{4}年\d{2}月\d{2}日')
-    GENERAL_YEAR_MONTH_DAY_PATTERN = re.compile(r'(今年|去年|前年|明年|后年)(\d{2}月\d{2}日)')
-    GENERAL_MONTH_DAY_PATTERN = re.compile(r'(本月|上月|上上月|下月)(\d{2}日)')
-    GENERAL_DAY_PATTERN = re.compile(r'(今天|昨天|前天|明天|后天|上月今天|上上月今天)')
-    # 每周从周一开始算
-    WEEK_DAY_PATTERN = re.compile(r'本周第(\d)天')
-    GENERAL_MONTH_LAST_DAY_PATTERN = re.compile(r'(本月|上月)最后一天')
-    GENERAL_YEAR_MONTH_LAST_DAY_PATTERN = re.compile(r'(今年)(\d{2})月最后一天')
-    SPECIFIC_YEAR_MONTH_PATTERN = re.compile(r'\d{4}年\d{2}月')
-    GENERAL_YEAR_MONTH_PATTERN = re.compile(r'(今年|去年|前年|明年|后年)(\d{2}月)')
-    GENERAL_MONTH_PATTERN = re.compile(r'(本月|上月|上上月|下月|去年本月)')
-    SPECIFIC_YEAR_PATTERN = re.compile(r'(\d{4})年')
-    GENERAL_YEAR_PATTERN = re.compile(r'(今年|去年|前年|明年|后年)')
-    SPECIFIC_YEAR_QUARTER_PATTERN = re.compile(r'\d{4}年第\d季度')
-    # 今年第1季度 = 2024年第1季度
-    GENERAL_YEAR_QUARTER_PATTERN = re.compile(r'(今年|去年|前年|明年|后年)(第\d季度)')
-    GENERAL_QUARTER_PATTERN = re.compile(r'(本季度|上季度|下季度|去年本季度)')
-    GENERAL_WEEK_SPECIFIC_DAY_PATTERN = re.compile(r'(本周|上周|上上周|下周|下下周)星期(\d)')
-    GENERAL_WEEK_PATTERN = re.compile(r'(本周|上周|上上周|下周|下下周)')
-    SPECIFIC_YEAR_WEEK_PATTERN = re.compile(r'(\d{4})年第(\d{2})周')
-    # 今年第54周会输出一个错的，第53周是对的，会截取到今天
-    GENERAL_YEAR_WEEK_PATTERN = re.compile(r'(今年|去年|前年)第(\d{2})周')
-    # 和上面同理
-    GENERAL_MONTH_WEEK_PATTERN = re.compile(r'(本月|上月)第(\d)周')
-    SPECIFIC_YEAR_MONTH_LAST_WEEK_PATTERN = re.compile(r'(\d{4})年(\d{2})月最后一周')
-    GENERAL_MONTH_LAST_WEEK_PATTERN = re.compile(r'(本月|上月|上上月)最后一周')
-    SPECIFIC_YEAR_MONTH_WEEK_PATTERN = re.compile(r'(\d{4})年(\d{2})月第(\d)周')
-    GENERAL_YEAR_MONTH_WEEK_PATTERN = re.compile(r'(今年|去年|前年)(\d{2})月第(\d)周')
-    SPECIFIC_YEAR_MONTH_COMPLETE_WEEK_PATTERN = re.compile(r'(\d{4})年(\d{2})月第(\d)个完整周')
-    GENERAL_YEAR_COMPLETE_WEEK_PATTERN = re.compile(r'(今年|去年|前年)第(\d{2})个完整周')
-    SPECIFIC_YEAR_COMPLETE_WEEK_PATTERN = re.compile(r'(\d{4})年第(\d{2})个完整周')
-    GENERAL_YEAR_MONTH_COMPLETE_WEEK_PATTERN = re.compile(r'(今年|去年|前年)(\d{2})月第(\d)个完整周')
-    GENERAL_MONTH_COMPLETE_WEEK_PATTERN = re.compile(r'(本月|上月)第(\d)个完整周')
-    # GENERAL_MONTH_LAST_COMPLETE_WEEK_PATTERN = re.compile(r'(本月|上月|上上月)最后一个完整周')
-    RECENT_N_YEAR_PATTERN = re.compile(r'近(\d+)年')
-    RECENT_N_MONTH_PATTERN = re.compile(r'近(\d+)个月')
-    RECENT_N_WEEK_PATTERN = re.compile(r'近(\d+)周')
-    RECENT_N_DAY_PATTERN = re.compile(r'近(\d+)天')
-    RECENT_N_COMPLETE_YEAR_PATTERN = re.compile(r'近(\d+)个完整年')
-    RECENT_N_COMPLETE_QUARTER_PATTERN = re.compile(r'近(\d+)个完整季度')
-    RECENT_N_COMPLETE_MONTH_PATTERN = re.compile(r'近(\d+)个完整月')
-    RECENT_N_COMPLETE_WEEK_PATTERN = re.compile(r'近(\d+)个完整周')
-    RECENT_N_DAY_WITHOUT_TODAY_PATTERN = re.compile(r'不包含今天的近(\d+)天')
-    RECENT_N_QUARTER_WITH_CURRENT_PATTERN = re.compile(r'包含当前季度的近(\d+)个季度')
-    SPECIFIC_YEAR_HALF_YEAR_PATTERN = re.compile(r'(\d{4})年(上|下)半年')
-    GENERAL_YEAR_HALF_YEAR_PATTERN = re.compile(r'(今年|去年)(上|下)半年')
-    HALF_YEAR_PATTERN = re.compile(r'(上|下)半年')
-
-    @staticmethod
-    def build_date_time_comment(expressions: List[str]) -> list:
-        now = datetime.now()
-        year = now.year
-        month = now.month
-        day = now.day
-        quarter = (month - 1) // 3 + 1
-        today_comment = f"今天是{year}年{month:02d}月{day:02d}日，是{year}年的第{quarter}季度"
+def to_day(now: date) -> date:
+    return now.date() if isinstance(now, datetime) else now
 
-        date_time_comment_list = DateTimeUtil.build_date_expressions(expressions, now)
-        final_expression = [today_comment, "需要计算的时间是："] + date_time_comment_list
-        return date_time_comment_list
+
+_zones = {}
+
+
+def get_zone(tz):
+    # IANA 时区名 -> ZoneInfo，每个名称只构造一次；tzinfo 对象原样返回，None 表示服务器本地时区
+    if tz is None or not isinstance(tz, str):
+        return tz
+    zone = _zones.get(tz)
+    if zone is None:
+        from zoneinfo import ZoneInfo
+        zone = _zones[tz] = ZoneInfo(tz)
+    return zone
+
+
+def reference_day(now: date = None, tz=None) -> date:
+    # 解析所用的当地日期：显式传入的 now 优先，带时区的 datetime 换算到 tz；没有 now 时取 tz 的当前日期
+    zone = get_zone(tz)
+    if now is None:
+        return datetime.now(zone).date()
+    if zone is not None and isinstance(now, datetime) and now.tzinfo is not None:
+        now = now.astimezone(zone)
+    return to_day(now)
+
+
+def get_logger():
+    import logging
+    return logging.getLogger(__name__)
+
+
+class LazyPattern:
+    # 首次使用时才编译的正则，其余行为与 re.Pattern 相同
+    __slots__ = ("pattern", "_compiled")
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self._compiled = None
+
+    def compile(self):
+        if self._compiled is None:
+            import re
+            self._compiled = re.compile(self.pattern)
+        return self._compiled
+
+    def __getattr__(self, name):
+        return getattr(self.compile(), name)
+
+    def __repr__(self):
+        return f"LazyPattern({self.pattern!r})"
+
+
+def _new_lock():
+    import threading
+    return threading.Lock()
+
+
+class OrdinalCalendar:
+    # 以 date.toordinal() 的整数为单位的日历核心，起止日的计算都是整数加减和查表，只在输出时转换成日期或文字
+    # 逐年数据在首次用到该年时计算并缓存，不预先展开 0001-9999 年（冷启动只算用到的几年）：
+    #   _years[y] = (y 年 1 月 1 日, 闰年为 1, 当年第一个周一)
+    # 月初 = 1 月 1 日 + CUMULATIVE_DAYS[闰年][m - 1]，季度边界即 1/4/7/10 月初
+    CUMULATIVE_DAYS = ((0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334, 365),
+                       (0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335, 366))
+    MAX_YEAR = 9999
+    _years = {}
 
     @staticmethod
-    def build_date_expressions(expressions: List[str], now: date) -> List[str]:
-        date_time_comment_list = []
+    def year_info(year: int) -> tuple:
+        info = OrdinalCalendar._years.get(year)
+        if info is None:
+            if not 1 <= year <= OrdinalCalendar.MAX_YEAR:
+                raise ValueError(f"year {year} is out of range")
+            y = year - 1
+            start = 365 * y + y // 4 - y // 100 + y // 400 + 1
+            leap = int(year % 4 == 0 and (year % 100 != 0 or year % 400 == 0))
+            # date.fromordinal(1) 是周一
+            info = (start, leap, start + -(start - 1) % 7)
+            OrdinalCalendar._years[year] = info
+        return info
 
-        for expression in expressions:
-            if DateTimeUtil.SPECIFIC_YEAR_HALF_YEAR_PATTERN.match(expression):
-                year_ex = int(DateTimeUtil.SPECIFIC_YEAR_HALF_YEAR_PATTERN.match(expression).group(1))
-                half_year_ex = DateTimeUtil.SPECIFIC_YEAR_HALF_YEAR_PATTERN.match(expression).group(2)
-                comment = DateTimeUtil.get_specific_year_half_year_ex(now, year_ex, half_year_ex)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def year_start(year: int) -> int:
+        return OrdinalCalendar.year_info(year)[0]
 
-            if DateTimeUtil.GENERAL_YEAR_HALF_YEAR_PATTERN.match(expression):
-                year_ex = DateTimeUtil.GENERAL_YEAR_HALF_YEAR_PATTERN.match(expression).group(1)
-                half_year_ex = DateTimeUtil.GENERAL_YEAR_HALF_YEAR_PATTERN.match(expression).group(2)
-                comment = DateTimeUtil.get_general_year_half_year_ex(now, year_ex, half_year_ex)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def year_end(year: int) -> int:
+        start, leap, _ = OrdinalCalendar.year_info(year)
+        return start + 364 + leap
 
-            if DateTimeUtil.HALF_YEAR_PATTERN.match(expression):
-                half_year_ex = DateTimeUtil.HALF_YEAR_PATTERN.match(expression).group(1)
-                comment = DateTimeUtil.get_specific_year_half_year_ex(now, now.year, half_year_ex)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def first_monday(year: int) -> int:
+        return OrdinalCalendar.year_info(year)[2]
 
-            if DateTimeUtil.SPECIFIC_YEAR_MONTH_COMPLETE_WEEK_PATTERN.match(expression):
-                year_ex = int(DateTimeUtil.SPECIFIC_YEAR_MONTH_COMPLETE_WEEK_PATTERN.match(expression).group(1))
-                month_ex = int(DateTimeUtil.SPECIFIC_YEAR_MONTH_COMPLETE_WEEK_PATTERN.match(expression).group(2))
-                week_ex = int(DateTimeUtil.SPECIFIC_YEAR_MONTH_COMPLETE_WEEK_PATTERN.match(expression).group(3))
-                comment = DateTimeUtil.get_specific_year_month_complete_week_ex(now, year_ex, month_ex, week_ex)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def month_start(year: int, month: int) -> int:
+        if not 1 <= month <= 12:
+            raise ValueError(f"bad month number {month}; must be 1-12")
+        start, leap, _ = OrdinalCalendar.year_info(year)
+        return start + OrdinalCalendar.CUMULATIVE_DAYS[leap][month - 1]
 
-            if DateTimeUtil.GENERAL_YEAR_MONTH_COMPLETE_WEEK_PATTERN.match(expression):
-                year_ex = DateTimeUtil.GENERAL_YEAR_MONTH_COMPLETE_WEEK_PATTERN.match(expression).group(1)
-                month_ex = int(DateTimeUtil.GENERAL_YEAR_MONTH_COMPLETE_WEEK_PATTERN.match(expression).group(2))
-                week_ex = int(DateTimeUtil.GENERAL_YEAR_MONTH_COMPLETE_WEEK_PATTERN.match(expression).group(3))
-                comment = DateTimeUtil.get_general_year_month_complete_week_ex(now, year_ex, month_ex, week_ex)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def month_end(year: int, month: int) -> int:
+        if not 1 <= month <= 12:
+            raise ValueError(f"bad month number {month}; must be 1-12")
+        start, leap, _ = OrdinalCalendar.year_info(year)
+        return start + OrdinalCalendar.CUMULATIVE_DAYS[leap][month] - 1
 
-            if DateTimeUtil.SPECIFIC_YEAR_COMPLETE_WEEK_PATTERN.match(expression):
-                year_ex = int(DateTimeUtil.SPECIFIC_YEAR_COMPLETE_WEEK_PATTERN.match(expression).group(1))
-                week_ex = int(DateTimeUtil.SPECIFIC_YEAR_COMPLETE_WEEK_PATTERN.match(expression).group(2))
-                comment = DateTimeUtil.get_specific_year_complete_week_ex(now, year_ex, week_ex)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def days_in_month(year: int, month: int) -> int:
+        return OrdinalCalendar.month_end(year, month) - OrdinalCalendar.month_start(year, month) + 1
 
-            if DateTimeUtil.GENERAL_YEAR_COMPLETE_WEEK_PATTERN.match(expression):
-                year_ex = DateTimeUtil.GENERAL_YEAR_COMPLETE_WEEK_PATTERN.match(expression).group(1)
-                week_ex = int(DateTimeUtil.GENERAL_YEAR_COMPLETE_WEEK_PATTERN.match(expression).group(2))
-                comment = DateTimeUtil.get_general_year_complete_week_ex(now, year_ex, week_ex)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def ordinal(year: int, month: int, day: int) -> int:
+        start = OrdinalCalendar.month_start(year, month)
+        if not 1 <= day <= OrdinalCalendar.month_end(year, month) - start + 1:
+            raise ValueError("day is out of range for month")
+        return start + day - 1
 
-            if DateTimeUtil.GENERAL_MONTH_COMPLETE_WEEK_PATTERN.match(expression):
-                month_ex = DateTimeUtil.GENERAL_MONTH_COMPLETE_WEEK_PATTERN.match(expression).group(1)
-                week_ex = int(DateTimeUtil.GENERAL_MONTH_COMPLETE_WEEK_PATTERN.match(expression).group(2))
-                comment = DateTimeUtil.get_general_month_complete_week_ex(now, month_ex, week_ex)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def weekday(ordinal: int) -> int:
+        return (ordinal - 1) % 7
 
-            if DateTimeUtil.GENERAL_MONTH_WEEK_PATTERN.match(expression):
-                month_ex = DateTimeUtil.GENERAL_MONTH_WEEK_PATTERN.match(expression).group(1)
-                week_ex = int(DateTimeUtil.GENERAL_MONTH_WEEK_PATTERN.match(expression).group(2))
-                comment = DateTimeUtil.get_general_month_week_ex(now, month_ex, week_ex)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def monday(ordinal: int) -> int:
+        return ordinal - (ordinal - 1) % 7
 
-            if DateTimeUtil.SPECIFIC_YEAR_MONTH_DAY_PATTERN.match(expression):
-                date_time_comment_list.append(f"{expression}={expression}")
-                continue
+    @staticmethod
+    def add_months(year: int, month: int, day: int, months: int) -> int:
+        # 与 relativedelta(months=n) 一致：目标月没有这一天时取月末
+        index = year * 12 + month - 1 + months
+        year, month = index // 12, index % 12 + 1
+        start = OrdinalCalendar.month_start(year, month)
+        return min(start + day - 1, OrdinalCalendar.month_end(year, month))
 
-            if DateTimeUtil.GENERAL_YEAR_MONTH_DAY_PATTERN.match(expression):
-                year_ex = DateTimeUtil.GENERAL_YEAR_MONTH_DAY_PATTERN.match(expression).group(1)
-                comment = DateTimeUtil.get_year_ex(now, year_ex) + DateTimeUtil.GENERAL_YEAR_MONTH_DAY_PATTERN.match(
-                    expression).group(2)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def year_month(ordinal: int) -> tuple:
+        day = date.fromordinal(ordinal)
+        return day.year, day.month
 
-            if DateTimeUtil.GENERAL_MONTH_DAY_PATTERN.match(expression):
-                month_ex = DateTimeUtil.GENERAL_MONTH_DAY_PATTERN.match(expression).group(1)
-                comment = DateTimeUtil.get_month_ex(now, month_ex) + DateTimeUtil.GENERAL_MONTH_DAY_PATTERN.match(
-                    expression).group(2)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    # 输出：只在这里转换成日期
+    @staticmethod
+    def format_day(ordinal: int) -> str:
+        day = date.fromordinal(ordinal)
+        return f"{day.year}年{day.month:02d}月{day.day:02d}日"
 
-            if DateTimeUtil.GENERAL_YEAR_MONTH_LAST_DAY_PATTERN.match(expression):
-                year_ex = DateTimeUtil.GENERAL_YEAR_MONTH_LAST_DAY_PATTERN.match(expression).group(1)
-                month_ex = DateTimeUtil.GENERAL_YEAR_MONTH_LAST_DAY_PATTERN.match(expression).group(2)
-                comment = DateTimeUtil.get_general_year_month_last_day_ex(now, year_ex, int(month_ex))
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def format_range(start: int, end: int) -> str:
+        return f"{OrdinalCalendar.format_day(start)}至{OrdinalCalendar.format_day(end)}"
 
-            if DateTimeUtil.GENERAL_MONTH_LAST_DAY_PATTERN.match(expression):
-                month_ex = DateTimeUtil.GENERAL_MONTH_LAST_DAY_PATTERN.match(expression).group(1)
-                comment = DateTimeUtil.get_month_last_day_ex(now, month_ex)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def format_month(ordinal: int) -> str:
+        year, month = OrdinalCalendar.year_month(ordinal)
+        return f"{year}年{month:02d}月"
 
-            if DateTimeUtil.WEEK_DAY_PATTERN.match(expression):
-                week_day = int(DateTimeUtil.WEEK_DAY_PATTERN.match(expression).group(1))
-                comment = DateTimeUtil.get_week_day_ex(now, week_day)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def to_range(start: int, end: int) -> tuple:
+        return date.fromordinal(start), date.fromordinal(end)
+
+
+class ExpressionCache:
+    # 按 (表达式, 当地日期) 缓存解析结果，LRU 淘汰；同时保留最近 max_days 个日期，
+    # 不同时区的"今天"最多相差两天，同一当地日期的请求不论来自哪个时区都共用缓存
+    MISSING = object()
+
+    def __init__(self, maxsize: int = 4096, max_days: int = 3):
+        self.maxsize = maxsize
+        self.max_days = max_days
+        self.hits = 0
+        self.misses = 0
+        self._days = []
+        # dict 保持插入顺序，最近使用的放在末尾，最久未使用的在开头
+        self._data = {}
+        self._lock = _new_lock()
+
+    def _roll(self, day: date) -> bool:
+        # 新的日期到来时丢弃最旧一天的结果；比保留的日期都早的请求不进入缓存
+        days = self._days
+        if day in days:
+            return True
+        if len(days) >= self.max_days and day < days[0]:
+            return False
+        bisect.insort(days, day)
+        if len(days) > self.max_days:
+            oldest = days.pop(0)
+            self._data = {key: comment for key, comment in self._data.items() if key[1] != oldest}
+        return True
+
+    def get(self, expression: str, day: date):
+        key = (expression, day)
+        with self._lock:
+            if self._roll(day) and key in self._data:
+                comment = self._data[key] = self._data.pop(key)
+                self.hits += 1
+                return comment
+            self.misses += 1
+            return ExpressionCache.MISSING
+
+    def put(self, expression: str, day: date, comment: str | None):
+        key = (expression, day)
+        with self._lock:
+            if not self._roll(day):
+                return
+            self._data.pop(key, None)
+            self._data[key] = comment
+            if len(self._data) > self.maxsize:
+                del self._data[next(iter(self._data))]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._days = []
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data),
+                    "maxsize": self.maxsize, "days": list(self._days)}
+
+
+class InvalidationIndex:
+    # 记录每个缓存条目的失效时刻，时钟前进时只返回受影响的条目
+    def __init__(self):
+        self._entries = {}
+        self._keys = {}
+        self._boundaries = []
+        self._lock = _new_lock()
+
+    def add(self, key, expression: str, now: date) -> datetime | None:
+        boundary = DateTimeUtil.next_change(expression, now)
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = boundary
+            if boundary is not None:
+                if boundary not in self._keys:
+                    self._keys[boundary] = set()
+                    bisect.insort(self._boundaries, boundary)
+                self._keys[boundary].add(key)
+        return boundary
+
+    def remove(self, key):
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key):
+        boundary = self._entries.pop(key, None)
+        if boundary is None:
+            return
+        keys = self._keys[boundary]
+        keys.discard(key)
+        if not keys:
+            del self._keys[boundary]
+            self._boundaries.remove(boundary)
+
+    def next_change(self, key) -> datetime | None:
+        return self._entries.get(key)
+
+    def affected(self, old: datetime, new: datetime) -> list:
+        # 时钟从 old 走到 new 时结果会变化的条目，即失效时刻落在 (old, new] 内
+        with self._lock:
+            left = bisect.bisect_right(self._boundaries, old)
+            right = bisect.bisect_right(self._boundaries, new)
+            return [key for boundary in self._boundaries[left:right] for key in self._keys[boundary]]
+
+    def expire(self, now: datetime) -> list:
+        # 取出并移除所有在 now 之前已经失效的条目，调用方重新计算后再 add 回来
+        with self._lock:
+            right = bisect.bisect_right(self._boundaries, now)
+            expired = []
+            for boundary in self._boundaries[:right]:
+                for key in self._keys.pop(boundary):
+                    del self._entries[key]
+                    expired.append(key)
+            del self._boundaries[:right]
+            return expired
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DateRange:
+    # 结构化的解析结果：起止日期 + 粒度 + 命中的规则，字符串格式化只在最后按需进行
+    __slots__ = ("expression", "start", "end", "granularity", "rule")
+
+    def __init__(self, expression: str, start: date, end: date, granularity: str, rule: str):
+        self.expression = expression
+        self.start = start
+        self.end = end
+        self.granularity = granularity
+        self.rule = rule
+
+    def __repr__(self):
+        return (f"DateRange({self.expression!r}, {self.start.isoformat()}, {self.end.isoformat()}, "
+                f"{self.granularity!r}, {self.rule!r})")
+
+    def __eq__(self, other):
+        if not isinstance(other, DateRange):
+            return NotImplemented
+        return (self.expression, self.start, self.end, self.granularity, self.rule) == \
+            (other.expression, other.start, other.end, other.granularity, other.rule)
+
+    def __hash__(self):
+        return hash((self.expression, self.start, self.end, self.granularity, self.rule))
+
+    # 与 DateTimeUtil.run 输出的文字格式保持一致
+    def format(self) -> str:
+        if self.granularity == "day":
+            return self.start.strftime('%Y年%m月%d日')
+        if self.granularity == "month":
+            return self.start.strftime('%Y年%m月')
+        if self.granularity == "quarter":
+            return f"{self.start.year}年第{(self.start.month - 1) // 3 + 1}季度"
+        if self.granularity == "year":
+            return f"{self.start.year}年"
+        return f"{self.start.strftime('%Y年%m月%d日')}至{self.end.strftime('%Y年%m月%d日')}"
+
+    def __str__(self):
+        return f"{self.expression}={self.format()}"
+
+    # 只由起止日决定的粒度，与命中的规则无关：上周、2024年第48个完整周、近1个完整周 在同一天都是同一个 week
+    @property
+    def shape(self) -> str:
+        start, end = self.start.toordinal(), self.end.toordinal()
+        if start == end:
+            return "day"
+        if self.start.day == 1 and end == OrdinalCalendar.month_end(self.end.year, self.end.month):
+            months = (self.end.year - self.start.year) * 12 + self.end.month - self.start.month + 1
+            if months == 1:
+                return "month"
+            if months == 3 and self.start.month % 3 == 1:
+                return "quarter"
+            if months == 6 and self.start.month in (1, 7):
+                return "half_year"
+            if months == 12 and self.start.month == 1:
+                return "year"
+        if end - start == 6 and OrdinalCalendar.weekday(start) == 0:
+            return "week"
+        return "range"
+
+    # 规范化的区间指纹，可以作为下游查询/结果缓存的键：不同说法只要区间相同就得到相同的指纹
+    @property
+    def fingerprint(self) -> tuple:
+        return self.start.isoformat(), self.end.isoformat(), self.shape
 
-            if DateTimeUtil.GENERAL_WEEK_SPECIFIC_DAY_PATTERN.match(expression):
-                week_ex = DateTimeUtil.GENERAL_WEEK_SPECIFIC_DAY_PATTERN.match(expression).group(1)
-                day = int(DateTimeUtil.GENERAL_WEEK_SPECIFIC_DAY_PATTERN.match(expression).group(2))
-                comment = DateTimeUtil.get_general_week_day_ex(now, week_ex, day)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
 
-            if DateTimeUtil.SPECIFIC_YEAR_QUARTER_PATTERN.match(expression):
-                date_time_comment_list.append(f"{expression}={expression}")
-                continue
+class DateTimeUtil:
+    SPECIFIC_YEAR_MONTH_DAY_PATTERN = LazyPattern(r'\d{4}年\d{2}月\d{2}日')
+    GENERAL_YEAR_MONTH_DAY_PATTERN = LazyPattern(r'(今年|去年|前年|明年|后年)(\d{2}月\d{2}日)')
+    GENERAL_MONTH_DAY_PATTERN = LazyPattern(r'(本月|上月|上上月|下月)(\d{2}日)')
+    GENERAL_DAY_PATTERN = LazyPattern(r'(今天|昨天|前天|明天|后天|上月今天|上上月今天)')
+    # 每周从周一开始算
+    WEEK_DAY_PATTERN = LazyPattern(r'本周第(\d)天')
+    GENERAL_MONTH_LAST_DAY_PATTERN = LazyPattern(r'(本月|上月)最后一天')
+    GENERAL_YEAR_MONTH_LAST_DAY_PATTERN = LazyPattern(r'(今年)(\d{2})月最后一天')
+    SPECIFIC_YEAR_MONTH_PATTERN = LazyPattern(r'\d{4}年\d{2}月')
+    GENERAL_YEAR_MONTH_PATTERN = LazyPattern(r'(今年|去年|前年|明年|后年)(\d{2}月)')
+    GENERAL_MONTH_PATTERN = LazyPattern(r'(本月|上月|上上月|下月|去年本月)')
+    SPECIFIC_YEAR_PATTERN = LazyPattern(r'(\d{4})年')
+    GENERAL_YEAR_PATTERN = LazyPattern(r'(今年|去年|前年|明年|后年)')
+    SPECIFIC_YEAR_QUARTER_PATTERN = LazyPattern(r'\d{4}年第\d季度')
+    # 今年第1季度 = 2024年第1季度
+    GENERAL_YEAR_QUARTER_PATTERN = LazyPattern(r'(今年|去年|前年|明年|后年)(第\d季度)')
+    GENERAL_QUARTER_PATTERN = LazyPattern(r'(本季度|上季度|下季度|去年本季度)')
+    GENERAL_WEEK_SPECIFIC_DAY_PATTERN = LazyPattern(r'(本周|上周|上上周|下周|下下周)星期(\d)')
+    GENERAL_WEEK_PATTERN = LazyPattern(r'(本周|上周|上上周|下周|下下周)')
+    SPECIFIC_YEAR_WEEK_PATTERN = LazyPattern(r'(\d{4})年第(\d{2})周')
+    # 今年第54周会输出一个错的，第53周是对的，会截取到今天
+    GENERAL_YEAR_WEEK_PATTERN = LazyPattern(r'(今年|去年|前年)第(\d{2})周')
+    # 和上面同理
+    GENERAL_MONTH_WEEK_PATTERN = LazyPattern(r'(本月|上月)第(\d)周')
+    SPECIFIC_YEAR_MONTH_LAST_WEEK_PATTERN = LazyPattern(r'(\d{4})年(\d{2})月最后一周')
+    GENERAL_MONTH_LAST_WEEK_PATTERN = LazyPattern(r'(本月|上月|上上月)最后一周')
+    SPECIFIC_YEAR_MONTH_WEEK_PATTERN = LazyPattern(r'(\d{4})年(\d{2})月第(\d)周')
+    GENERAL_YEAR_MONTH_WEEK_PATTERN = LazyPattern(r'(今年|去年|前年)(\d{2})月第(\d)周')
+    SPECIFIC_YEAR_MONTH_COMPLETE_WEEK_PATTERN = LazyPattern(r'(\d{4})年(\d{2})月第(\d)个完整周')
+    GENERAL_YEAR_COMPLETE_WEEK_PATTERN = LazyPattern(r'(今年|去年|前年)第(\d{2})个完整周')
+    SPECIFIC_YEAR_COMPLETE_WEEK_PATTERN = LazyPattern(r'(\d{4})年第(\d{2})个完整周')
+    GENERAL_YEAR_MONTH_COMPLETE_WEEK_PATTERN = LazyPattern(r'(今年|去年|前年)(\d{2})月第(\d)个完整周')
+    GENERAL_MONTH_COMPLETE_WEEK_PATTERN = LazyPattern(r'(本月|上月)第(\d)个完整周')
+    # GENERAL_MONTH_LAST_COMPLETE_WEEK_PATTERN = LazyPattern(r'(本月|上月|上上月)最后一个完整周')
+    RECENT_N_YEAR_PATTERN = LazyPattern(r'近(\d+)年')
+    RECENT_N_MONTH_PATTERN = LazyPattern(r'近(\d+)个月')
+    RECENT_N_WEEK_PATTERN = LazyPattern(r'近(\d+)周')
+    RECENT_N_DAY_PATTERN = LazyPattern(r'近(\d+)天')
+    RECENT_N_COMPLETE_YEAR_PATTERN = LazyPattern(r'近(\d+)个完整年')
+    RECENT_N_COMPLETE_QUARTER_PATTERN = LazyPattern(r'近(\d+)个完整季度')
+    RECENT_N_COMPLETE_MONTH_PATTERN = LazyPattern(r'近(\d+)个完整月')
+    RECENT_N_COMPLETE_WEEK_PATTERN = LazyPattern(r'近(\d+)个完整周')
+    RECENT_N_DAY_WITHOUT_TODAY_PATTERN = LazyPattern(r'不包含今天的近(\d+)天')
+    RECENT_N_QUARTER_WITH_CURRENT_PATTERN = LazyPattern(r'包含当前季度的近(\d+)个季度')
+    SPECIFIC_YEAR_HALF_YEAR_PATTERN = LazyPattern(r'(\d{4})年(上|下)半年')
+    GENERAL_YEAR_HALF_YEAR_PATTERN = LazyPattern(r'(今年|去年)(上|下)半年')
+    HALF_YEAR_PATTERN = LazyPattern(r'(上|下)半年')
 
-            if DateTimeUtil.GENERAL_YEAR_QUARTER_PATTERN.match(expression):
-                year_ex = DateTimeUtil.GENERAL_YEAR_QUARTER_PATTERN.match(expression).group(1)
-                quarter_ex = DateTimeUtil.GENERAL_YEAR_QUARTER_PATTERN.match(expression).group(2)
-                comment = DateTimeUtil.get_year_ex(now, year_ex) + quarter_ex
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def build_date_time_comment(expressions: list[str], now: date = None, tz=None) -> list:
+        now = reference_day(now, tz)
+        year = now.year
+        month = now.month
+        day = now.day
+        quarter = (month - 1) // 3 + 1
+        today_comment = f"今天是{year}年{month:02d}月{day:02d}日，是{year}年的第{quarter}季度"
 
-            if DateTimeUtil.GENERAL_QUARTER_PATTERN.match(expression):
-                quarter_ex = DateTimeUtil.GENERAL_QUARTER_PATTERN.match(expression).group(1)
-                comment = DateTimeUtil.get_quarter_ex(now, quarter_ex)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+        date_time_comment_list = DateTimeUtil.build_date_expressions(expressions, now)
+        final_expression = [today_comment, "需要计算的时间是："] + date_time_comment_list
+        return date_time_comment_list
 
-            if DateTimeUtil.GENERAL_WEEK_PATTERN.match(expression):
-                week_ex = DateTimeUtil.GENERAL_WEEK_PATTERN.match(expression).group(1)
-                comment = DateTimeUtil.get_week_ex(now, week_ex)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    # 规则表：顺序即匹配优先级，与原先逐条 match 的顺序完全一致
+    # (规则名, 正则, 处理函数)，处理函数签名为 handler(now, expression, groups) -> comment
+    DATE_RULES = [
+        ("SPECIFIC_YEAR_HALF_YEAR", SPECIFIC_YEAR_HALF_YEAR_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_specific_year_half_year_ex(now, int(g[0]), g[1])),
+        ("GENERAL_YEAR_HALF_YEAR", GENERAL_YEAR_HALF_YEAR_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_general_year_half_year_ex(now, g[0], g[1])),
+        ("HALF_YEAR", HALF_YEAR_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_specific_year_half_year_ex(now, now.year, g[0])),
+        ("SPECIFIC_YEAR_MONTH_COMPLETE_WEEK", SPECIFIC_YEAR_MONTH_COMPLETE_WEEK_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_specific_year_month_complete_week_ex(
+             now, int(g[0]), int(g[1]), int(g[2]))),
+        ("GENERAL_YEAR_MONTH_COMPLETE_WEEK", GENERAL_YEAR_MONTH_COMPLETE_WEEK_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_general_year_month_complete_week_ex(
+             now, g[0], int(g[1]), int(g[2]))),
+        ("SPECIFIC_YEAR_COMPLETE_WEEK", SPECIFIC_YEAR_COMPLETE_WEEK_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_specific_year_complete_week_ex(now, int(g[0]), int(g[1]))),
+        ("GENERAL_YEAR_COMPLETE_WEEK", GENERAL_YEAR_COMPLETE_WEEK_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_general_year_complete_week_ex(now, g[0], int(g[1]))),
+        ("GENERAL_MONTH_COMPLETE_WEEK", GENERAL_MONTH_COMPLETE_WEEK_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_general_month_complete_week_ex(now, g[0], int(g[1]))),
+        ("GENERAL_MONTH_WEEK", GENERAL_MONTH_WEEK_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_general_month_week_ex(now, g[0], int(g[1]))),
+        ("SPECIFIC_YEAR_MONTH_DAY", SPECIFIC_YEAR_MONTH_DAY_PATTERN,
+         lambda now, expression, g: expression),
+        ("GENERAL_YEAR_MONTH_DAY", GENERAL_YEAR_MONTH_DAY_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_year_ex(now, g[0]) + g[1]),
+        ("GENERAL_MONTH_DAY", GENERAL_MONTH_DAY_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_month_ex(now, g[0]) + g[1]),
+        ("GENERAL_YEAR_MONTH_LAST_DAY", GENERAL_YEAR_MONTH_LAST_DAY_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_general_year_month_last_day_ex(now, g[0], int(g[1]))),
+        ("GENERAL_MONTH_LAST_DAY", GENERAL_MONTH_LAST_DAY_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_month_last_day_ex(now, g[0])),
+        ("WEEK_DAY", WEEK_DAY_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_week_day_ex(now, int(g[0]))),
+        ("GENERAL_WEEK_SPECIFIC_DAY", GENERAL_WEEK_SPECIFIC_DAY_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_general_week_day_ex(now, g[0], int(g[1]))),
+        ("SPECIFIC_YEAR_QUARTER", SPECIFIC_YEAR_QUARTER_PATTERN,
+         lambda now, expression, g: expression),
+        ("GENERAL_YEAR_QUARTER", GENERAL_YEAR_QUARTER_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_year_ex(now, g[0]) + g[1]),
+        ("GENERAL_QUARTER", GENERAL_QUARTER_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_quarter_ex(now, g[0])),
+        ("GENERAL_WEEK", GENERAL_WEEK_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_week_ex(now, g[0])),
+        ("SPECIFIC_YEAR_WEEK", SPECIFIC_YEAR_WEEK_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_specific_year_week_ex(now, int(g[0]), int(g[1]))),
+        ("GENERAL_YEAR_WEEK", GENERAL_YEAR_WEEK_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_general_year_week_ex(now, g[0], int(g[1]))),
+        ("SPECIFIC_YEAR_MONTH_WEEK", SPECIFIC_YEAR_MONTH_WEEK_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_specific_year_month_week_ex(
+             now, int(g[0]), int(g[1]), int(g[2]))),
+        ("GENERAL_YEAR_MONTH_WEEK", GENERAL_YEAR_MONTH_WEEK_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_general_year_month_week_ex(now, g[0], int(g[1]), int(g[2]))),
+        ("SPECIFIC_YEAR_MONTH_LAST_WEEK", SPECIFIC_YEAR_MONTH_LAST_WEEK_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_specific_year_month_last_week(now, int(g[0]), int(g[1]))),
+        ("GENERAL_MONTH_LAST_WEEK", GENERAL_MONTH_LAST_WEEK_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_general_month_last_week(now, g[0])),
+        # ("GENERAL_MONTH_LAST_COMPLETE_WEEK", GENERAL_MONTH_LAST_COMPLETE_WEEK_PATTERN,
+        #  lambda now, expression, g: DateTimeUtil.get_general_month_last_complete_week_ex(now, g[0])),
+        ("RECENT_N_YEAR", RECENT_N_YEAR_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_recent_n_year(now, int(g[0]))),
+        ("RECENT_N_MONTH", RECENT_N_MONTH_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_recent_n_month(now, int(g[0]))),
+        ("RECENT_N_WEEK", RECENT_N_WEEK_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_recent_n_week(now, int(g[0]))),
+        ("RECENT_N_DAY_WITHOUT_TODAY", RECENT_N_DAY_WITHOUT_TODAY_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_recent_n_day_without_today(now, int(g[0]))),
+        ("RECENT_N_DAY", RECENT_N_DAY_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_recent_n_day(now, int(g[0]))),
+        ("RECENT_N_COMPLETE_YEAR", RECENT_N_COMPLETE_YEAR_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_recent_n_complete_year(now, int(g[0]))),
+        ("RECENT_N_COMPLETE_QUARTER", RECENT_N_COMPLETE_QUARTER_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_recent_n_complete_quarter(now, int(g[0]))),
+        ("RECENT_N_COMPLETE_MONTH", RECENT_N_COMPLETE_MONTH_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_recent_n_complete_month(now, int(g[0]))),
+        ("RECENT_N_COMPLETE_WEEK", RECENT_N_COMPLETE_WEEK_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_recent_n_complete_week(now, int(g[0]))),
+        ("RECENT_N_QUARTER_WITH_CURRENT", RECENT_N_QUARTER_WITH_CURRENT_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_recent_n_quarter_with_current(now, int(g[0]))),
+        ("SPECIFIC_YEAR_MONTH", SPECIFIC_YEAR_MONTH_PATTERN,
+         lambda now, expression, g: expression),
+        ("GENERAL_YEAR_MONTH", GENERAL_YEAR_MONTH_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_year_ex(now, g[0]) + g[1]),
+        ("GENERAL_DAY", GENERAL_DAY_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_day_ex(now, g[0])),
+        ("GENERAL_MONTH", GENERAL_MONTH_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_month_ex(now, g[0])),
+        ("SPECIFIC_YEAR", SPECIFIC_YEAR_PATTERN,
+         lambda now, expression, g: f"{int(g[0])}年"),
+        ("GENERAL_YEAR", GENERAL_YEAR_PATTERN,
+         lambda now, expression, g: DateTimeUtil.get_year_ex(now, g[0])),
+    ]
+
+    # 规则名 -> (粒度, 区间函数)，区间函数签名为 func(today, expression, groups) -> (start, end)，
+    # 结果不是合法日期时返回 None；粒度决定 DateRange.format 的输出形式
+    RANGE_RULES = {
+        "SPECIFIC_YEAR_HALF_YEAR": (
+            "half_year", lambda today, expression, g: DateTimeUtil.half_year_range(int(g[0]), g[1])),
+        "GENERAL_YEAR_HALF_YEAR": (
+            "half_year", lambda today, expression, g: DateTimeUtil.half_year_range(
+                DateTimeUtil.year_of(today, g[0]), g[1])),
+        "HALF_YEAR": (
+            "half_year", lambda today, expression, g: DateTimeUtil.half_year_range(today.year, g[0])),
+        "SPECIFIC_YEAR_MONTH_COMPLETE_WEEK": (
+            "week", lambda today, expression, g: DateTimeUtil.month_complete_week_range(
+                int(g[0]), int(g[1]), int(g[2]))),
+        "GENERAL_YEAR_MONTH_COMPLETE_WEEK": (
+            "week", lambda today, expression, g: DateTimeUtil.month_complete_week_range(
+                DateTimeUtil.year_of(today, g[0]), int(g[1]), int(g[2]))),
+        "SPECIFIC_YEAR_COMPLETE_WEEK": (
+            "week", lambda today, expression, g: DateTimeUtil.year_complete_week_range(int(g[0]), int(g[1]))),
+        "GENERAL_YEAR_COMPLETE_WEEK": (
+            "week", lambda today, expression, g: DateTimeUtil.year_complete_week_range(
+                DateTimeUtil.year_of(today, g[0]), int(g[1]))),
+        "GENERAL_MONTH_COMPLETE_WEEK": (
+            "week", lambda today, expression, g: DateTimeUtil.month_complete_week_range(
+                *DateTimeUtil.month_of(today, g[0]), int(g[1]))),
+        "GENERAL_MONTH_WEEK": (
+            "week", lambda today, expression, g: DateTimeUtil.month_week_range(
+                *DateTimeUtil.month_of(today, g[0]), int(g[1]))),
+        "SPECIFIC_YEAR_MONTH_DAY": (
+            "day", lambda today, expression, g: DateTimeUtil.day_range(
+                int(expression[0:4]), int(expression[5:7]), int(expression[8:10]))),
+        "GENERAL_YEAR_MONTH_DAY": (
+            "day", lambda today, expression, g: DateTimeUtil.day_range(
+                DateTimeUtil.year_of(today, g[0]), int(g[1][0:2]), int(g[1][3:5]))),
+        "GENERAL_MONTH_DAY": (
+            "day", lambda today, expression, g: DateTimeUtil.day_range(
+                *DateTimeUtil.shifted_month_of(today, g[0]), int(g[1][0:2]))),
+        "GENERAL_YEAR_MONTH_LAST_DAY": (
+            "day", lambda today, expression, g: DateTimeUtil.month_last_day_range(
+                DateTimeUtil.year_of(today, g[0]), int(g[1]))),
+        "GENERAL_MONTH_LAST_DAY": (
+            "day", lambda today, expression, g: DateTimeUtil.month_last_day_range(
+                *DateTimeUtil.month_of(today, g[0]))),
+        "WEEK_DAY": (
+            "day", lambda today, expression, g: DateTimeUtil.week_day_range(today, "本周", int(g[0]))),
+        "GENERAL_WEEK_SPECIFIC_DAY": (
+            "day", lambda today, expression, g: DateTimeUtil.week_day_range(today, g[0], int(g[1]))),
+        "SPECIFIC_YEAR_QUARTER": (
+            "quarter", lambda today, expression, g: DateTimeUtil.quarter_range(
+                int(expression[0:4]), int(expression[6]))),
+        "GENERAL_YEAR_QUARTER": (
+            "quarter", lambda today, expression, g: DateTimeUtil.quarter_range(
+                DateTimeUtil.year_of(today, g[0]), int(g[1][1]))),
+        "GENERAL_QUARTER": (
+            "quarter", lambda today, expression, g: DateTimeUtil.general_quarter_range(today, g[0])),
+        "GENERAL_WEEK": (
+            "week", lambda today, expression, g: DateTimeUtil.week_range(today, g[0])),
+        "SPECIFIC_YEAR_WEEK": (
+            "week", lambda today, expression, g: DateTimeUtil.year_week_range(int(g[0]), int(g[1]))),
+        "GENERAL_YEAR_WEEK": (
+            "week", lambda today, expression, g: DateTimeUtil.year_week_range(
+                DateTimeUtil.year_of(today, g[0]), int(g[1]))),
+        "SPECIFIC_YEAR_MONTH_WEEK": (
+            "week", lambda today, expression, g: DateTimeUtil.month_week_range(int(g[0]), int(g[1]), int(g[2]))),
+        "GENERAL_YEAR_MONTH_WEEK": (
+            "week", lambda today, expression, g: DateTimeUtil.month_week_range(
+                DateTimeUtil.year_of(today, g[0]), int(g[1]), int(g[2]))),
+        "SPECIFIC_YEAR_MONTH_LAST_WEEK": (
+            "week", lambda today, expression, g: DateTimeUtil.month_last_week_range(int(g[0]), int(g[1]))),
+        "GENERAL_MONTH_LAST_WEEK": (
+            "week", lambda today, expression, g: DateTimeUtil.month_last_week_range(
+                *DateTimeUtil.month_of(today, g[0]))),
+        "RECENT_N_YEAR": (
+            "range", lambda today, expression, g: DateTimeUtil.recent_n_month_range(today, 12 * int(g[0]))),
+        "RECENT_N_MONTH": (
+            "range", lambda today, expression, g: DateTimeUtil.recent_n_month_range(today, int(g[0]))),
+        "RECENT_N_WEEK": (
+            "range", lambda today, expression, g: DateTimeUtil.recent_n_day_range(today, 7 * int(g[0]))),
+        "RECENT_N_DAY_WITHOUT_TODAY": (
+            "range", lambda today, expression, g: DateTimeUtil.recent_n_day_range(
+                today, int(g[0]), include_today=False)),
+        "RECENT_N_DAY": (
+            "range", lambda today, expression, g: DateTimeUtil.recent_n_day_range(today, int(g[0]))),
+        "RECENT_N_COMPLETE_YEAR": (
+            "range", lambda today, expression, g: DateTimeUtil.recent_n_complete_year_range(today, int(g[0]))),
+        "RECENT_N_COMPLETE_QUARTER": (
+            "range", lambda today, expression, g: DateTimeUtil.recent_n_complete_quarter_range(today, int(g[0]))),
+        "RECENT_N_COMPLETE_MONTH": (
+            "range", lambda today, expression, g: DateTimeUtil.recent_n_complete_month_range(today, int(g[0]))),
+        "RECENT_N_COMPLETE_WEEK": (
+            "range", lambda today, expression, g: DateTimeUtil.recent_n_complete_week_range(today, int(g[0]))),
+        "RECENT_N_QUARTER_WITH_CURRENT": (
+            "range", lambda today, expression, g: DateTimeUtil.recent_n_quarter_with_current_range(
+                today, int(g[0]))),
+        "SPECIFIC_YEAR_MONTH": (
+            "month", lambda today, expression, g: DateTimeUtil.month_range(
+                int(expression[0:4]), int(expression[5:7]))),
+        "GENERAL_YEAR_MONTH": (
+            "month", lambda today, expression, g: DateTimeUtil.month_range(
+                DateTimeUtil.year_of(today, g[0]), int(g[1][0:2]))),
+        "GENERAL_DAY": (
+            "day", lambda today, expression, g: DateTimeUtil.general_day_range(today, g[0])),
+        "GENERAL_MONTH": (
+            "month", lambda today, expression, g: DateTimeUtil.general_month_range(today, g[0])),
+        "SPECIFIC_YEAR": (
+            "year", lambda today, expression, g: DateTimeUtil.year_range(int(g[0]))),
+        "GENERAL_YEAR": (
+            "year", lambda today, expression, g: DateTimeUtil.year_range(DateTimeUtil.year_of(today, g[0]))),
+    }
+
+    # 规则名 -> 结果可能发生变化的边界类型，None 表示结果与当前日期无关；
+    # month_edge 指每月第一天和最后一天（近N个完整年/季度在年末、季末当天会切换）；
+    # 按 ±30 天取月份的规则只能按天检查
+    RULE_PERIODS = {
+        "SPECIFIC_YEAR_HALF_YEAR": None,
+        "GENERAL_YEAR_HALF_YEAR": "year",
+        "HALF_YEAR": "year",
+        "SPECIFIC_YEAR_MONTH_COMPLETE_WEEK": None,
+        "GENERAL_YEAR_MONTH_COMPLETE_WEEK": "year",
+        "SPECIFIC_YEAR_COMPLETE_WEEK": None,
+        "GENERAL_YEAR_COMPLETE_WEEK": "year",
+        "GENERAL_MONTH_COMPLETE_WEEK": "month",
+        "GENERAL_MONTH_WEEK": "month",
+        "SPECIFIC_YEAR_MONTH_DAY": None,
+        "GENERAL_YEAR_MONTH_DAY": "year",
+        "GENERAL_MONTH_DAY": "day",
+        "GENERAL_YEAR_MONTH_LAST_DAY": "year",
+        "GENERAL_MONTH_LAST_DAY": "month",
+        "WEEK_DAY": "week",
+        "GENERAL_WEEK_SPECIFIC_DAY": "week",
+        "SPECIFIC_YEAR_QUARTER": None,
+        "GENERAL_YEAR_QUARTER": "year",
+        "GENERAL_QUARTER": "quarter",
+        "GENERAL_WEEK": "week",
+        "SPECIFIC_YEAR_WEEK": None,
+        "GENERAL_YEAR_WEEK": "year",
+        "SPECIFIC_YEAR_MONTH_WEEK": None,
+        "GENERAL_YEAR_MONTH_WEEK": "year",
+        "SPECIFIC_YEAR_MONTH_LAST_WEEK": None,
+        "GENERAL_MONTH_LAST_WEEK": "month",
+        "RECENT_N_YEAR": "day",
+        "RECENT_N_MONTH": "day",
+        "RECENT_N_WEEK": "day",
+        "RECENT_N_DAY_WITHOUT_TODAY": "day",
+        "RECENT_N_DAY": "day",
+        "RECENT_N_COMPLETE_YEAR": "month_edge",
+        "RECENT_N_COMPLETE_QUARTER": "month_edge",
+        "RECENT_N_COMPLETE_MONTH": "month",
+        "RECENT_N_COMPLETE_WEEK": "sunday",
+        "RECENT_N_QUARTER_WITH_CURRENT": "quarter",
+        "SPECIFIC_YEAR_MONTH": None,
+        "GENERAL_YEAR_MONTH": "year",
+        "GENERAL_DAY": "day",
+        "GENERAL_MONTH": "day",
+        "SPECIFIC_YEAR": None,
+        "GENERAL_YEAR": "year",
+    }
+
+    # 示例表达式，覆盖目前支持的所有规则
+    EXAMPLE_EXPRESSIONS = [
+        "2024年02月29日",
+        # "2023年02月29日",
+        # "24年02月29日",
+        # "今年2月29日",
+        # "去年02月29日",
+        "今年02月29日",
+        "去年02月28日",
+        "前年02月28日",
+        "明年02月28日",
+        "后年02月28日",
+        # "本月31日",
+        "本月30日",
+        "上月31日",
+        "上上月30日",
+        "下月30日",
+        "上月今天",
+        "上上月今天",
+        "今天",
+        "昨天",
+        "前天",
+        "明天",
+        "后天",
+        "本周第1天",
+        "本月最后一天",
+        "上月最后一天",
+        "今年02月最后一天",
+        "2024年02月",
+        "今年02月",
+        "去年02月",
+        "前年02月",
+        "明年02月",
+        "后年02月",
+        "本月",
+        "上月",
+        "上上月",
+        "下月",
+        "去年本月",
+        "2023年",
+        "今年",
+        "去年",
+        "前年",
+        "明年",
+        "后年",
+        "2024年第1季度",
+        "今年第1季度",
+        "去年第1季度",
+        "前年第1季度",
+        "明年第1季度",
+        "后年第1季度",
+        "本季度",
+        "上季度",
+        "下季度",
+        "去年本季度",
+        "2024年上半年",
+        "2024年下半年",
+        "今年上半年",
+        "今年下半年",
+        "去年上半年",
+        "去年下半年",
+        "上半年",
+        "下半年",
+        "本周星期3",
+        "上周星期3",
+        "上上周星期3",
+        "下周星期3",
+        "下下周星期3",
+        "本周",
+        "上周",
+        "上上周",
+        "下周",
+        "下下周",
+        "2024年第01周",
+        "今年第01周",
+        "今年第53周",
+        "去年第01周",
+        "前年第01周",
+        "本月第2周",
+        "上月第1周",
+        "2024年02月最后一周",
+        "2023年02月最后一周",
+        "本月最后一周",
+        "上月最后一周",
+        "上上月最后一周",
+        "2024年02月第4周",
+        "今年02月第4周",
+        "去年02月第4周",
+        "前年02月第4周",
+        "2024年02月第3个完整周",
+        "今年02月第3个完整周",
+        "去年02月第3个完整周",
+        "前年02月第3个完整周",
+        "2024年第01个完整周",
+        "今年第01个完整周",
+        "去年第01个完整周",
+        "前年第01个完整周",
+        "本月第1个完整周",
+        "上月第1个完整周",
+        "近2年",
+        "近3个月",
+        "近3周",
+        "近3天",
+        "近2个完整年",
+        "近2个完整季度",
+        "近2个完整月",
+        "近2个完整周",
+        "不包含今天的近3天",
+        "包含当前季度的近2个季度"
+    ]
+
+    # 所有规则合并成的单个正则，以及 外层分组号 -> (规则名, 处理函数, 子分组数)，首次使用时构建
+    _dispatch_pattern = None
+    _dispatch_rules = None
 
-            if DateTimeUtil.SPECIFIC_YEAR_WEEK_PATTERN.match(expression):
-                year_ex = int(DateTimeUtil.SPECIFIC_YEAR_WEEK_PATTERN.match(expression).group(1))
-                week_ex = int(DateTimeUtil.SPECIFIC_YEAR_WEEK_PATTERN.match(expression).group(2))
-                comment = DateTimeUtil.get_specific_year_week_ex(now, year_ex, week_ex)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def _build_dispatcher():
+        # 每条规则包成一个命名分组，按优先级拼成一个 alternation；
+        # 在位置 0 上正则引擎按从左到右的顺序尝试各分支，语义与逐条 match 相同
+        # 各规则的子分组数由合并后正则的外层分组号推出，不需要逐条编译
+        import re
+        parts = [f"(?P<{name}>{pattern.pattern})" for name, pattern, handler in DateTimeUtil.DATE_RULES]
+        dispatch_pattern = re.compile("|".join(parts))
+        indexes = [dispatch_pattern.groupindex[name] for name, pattern, handler in DateTimeUtil.DATE_RULES]
+        indexes.append(dispatch_pattern.groups + 1)
+        rules = {}
+        for i, (name, pattern, handler) in enumerate(DateTimeUtil.DATE_RULES):
+            rules[indexes[i]] = (name, handler, indexes[i + 1] - indexes[i] - 1)
+        DateTimeUtil._dispatch_rules = rules
+        DateTimeUtil._dispatch_pattern = dispatch_pattern
+
+    # 返回 (规则名, 处理函数, 子分组)，没有规则命中时返回 None
+    @staticmethod
+    def match_rule(expression: str):
+        if DateTimeUtil._dispatch_pattern is None:
+            DateTimeUtil._build_dispatcher()
+        m = DateTimeUtil._dispatch_pattern.match(expression)
+        if m is None:
+            return None
+        index = m.lastindex
+        name, handler, group_count = DateTimeUtil._dispatch_rules[index]
+        return name, handler, m.groups()[index:index + group_count]
+
+    # 注册新的规则族（如 date_workday 的工作日规则），同名规则会被替换
+    # 默认插到最前面，先于 本月、近N天 这类只匹配前缀的规则；before 为规则名时插到该规则之前
+    # range_func(today, expression, groups) 返回 (起始日, 结束日) 或 None；不传 handler 时按 DateRange 的格式输出文字
+    # period 为结果可能变化的边界类型，见 RULE_PERIODS
+    @staticmethod
+    def register_rule(name: str, pattern, granularity: str, range_func, handler=None, period: str | None = "day",
+                      before: str = None):
+        if isinstance(pattern, str):
+            pattern = LazyPattern(pattern)
+        if handler is None:
+            def handler(now, expression, g):
+                dates = range_func(to_day(now), expression, g)
+                if dates is None:
+                    return None
+                return DateRange(expression, dates[0], dates[1], granularity, name).format()
+
+        rules = [rule for rule in DateTimeUtil.DATE_RULES if rule[0] != name]
+        position = 0
+        if before is not None:
+            names = [rule[0] for rule in rules]
+            if before not in names:
+                raise KeyError(f"规则不存在: {before}")
+            position = names.index(before)
+        rules.insert(position, (name, pattern, handler))
+        # 整体替换，已在解析中的线程仍使用旧的规则表
+        DateTimeUtil.RANGE_RULES = {**DateTimeUtil.RANGE_RULES, name: (granularity, range_func)}
+        DateTimeUtil.RULE_PERIODS = {**DateTimeUtil.RULE_PERIODS, name: period}
+        DateTimeUtil.DATE_RULES = rules
+        DateTimeUtil._dispatch_pattern = None
+        DateTimeUtil._clear_results()
 
-            if DateTimeUtil.GENERAL_YEAR_WEEK_PATTERN.match(expression):
-                year_ex = DateTimeUtil.GENERAL_YEAR_WEEK_PATTERN.match(expression).group(1)
-                week_ex = int(DateTimeUtil.GENERAL_YEAR_WEEK_PATTERN.match(expression).group(2))
-                comment = DateTimeUtil.get_general_year_week_ex(now, year_ex, week_ex)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def unregister_rule(name: str):
+        DateTimeUtil.DATE_RULES = [rule for rule in DateTimeUtil.DATE_RULES if rule[0] != name]
+        DateTimeUtil.RANGE_RULES = {key: value for key, value in DateTimeUtil.RANGE_RULES.items() if key != name}
+        DateTimeUtil.RULE_PERIODS = {key: value for key, value in DateTimeUtil.RULE_PERIODS.items() if key != name}
+        DateTimeUtil._dispatch_pattern = None
+        DateTimeUtil._clear_results()
+
+    # 整个表达式都被某条规则匹配（match_rule 只要求前缀匹配，例如 今年2月 会按 今年 解析）
+    @staticmethod
+    def is_canonical(expression: str) -> bool:
+        if DateTimeUtil._dispatch_pattern is None:
+            DateTimeUtil._build_dispatcher()
+        m = DateTimeUtil._dispatch_pattern.match(expression)
+        return m is not None and m.end() == len(expression)
 
-            if DateTimeUtil.SPECIFIC_YEAR_MONTH_WEEK_PATTERN.match(expression):
-                year_ex = int(DateTimeUtil.SPECIFIC_YEAR_MONTH_WEEK_PATTERN.match(expression).group(1))
-                month_ex = int(DateTimeUtil.SPECIFIC_YEAR_MONTH_WEEK_PATTERN.match(expression).group(2))
-                week_ex = int(DateTimeUtil.SPECIFIC_YEAR_MONTH_WEEK_PATTERN.match(expression).group(3))
-                comment = DateTimeUtil.get_specific_year_month_week_ex(now, year_ex, month_ex, week_ex)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def resolve_expression(expression: str, now: date) -> str | None:
+        if DateTimeUtil._day_table_enabled and DateTimeUtil._calendar is None:
+            table = DateTimeUtil.lookup_day_table(now)
+            comment = table.get(expression) if table is not None else None
+            if comment is not None:
+                return comment
+
+        # 与日表一样只缓存公历结果，自定义日历下直接解析
+        cache = DateTimeUtil._expression_cache
+        if cache is None or DateTimeUtil._calendar is not None:
+            return DateTimeUtil._resolve_expression(expression, now)
+
+        day = to_day(now)
+        comment = cache.get(expression, day)
+        if comment is ExpressionCache.MISSING:
+            comment = DateTimeUtil._resolve_expression(expression, now)
+            cache.put(expression, day, comment)
+        return comment
 
-            if DateTimeUtil.GENERAL_YEAR_MONTH_WEEK_PATTERN.match(expression):
-                year_ex = DateTimeUtil.GENERAL_YEAR_MONTH_WEEK_PATTERN.match(expression).group(1)
-                month_ex = int(DateTimeUtil.GENERAL_YEAR_MONTH_WEEK_PATTERN.match(expression).group(2))
-                week_ex = int(DateTimeUtil.GENERAL_YEAR_MONTH_WEEK_PATTERN.match(expression).group(3))
-                comment = DateTimeUtil.get_general_year_month_week_ex(now, year_ex, month_ex, week_ex)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def _resolve_expression(expression: str, now: date) -> str | None:
+        if DateTimeUtil._metrics is not None:
+            return DateTimeUtil._resolve_instrumented(expression, now)
+        return DateTimeUtil._dispatch_expression(expression, now)
 
-            if DateTimeUtil.SPECIFIC_YEAR_MONTH_LAST_WEEK_PATTERN.match(expression):
-                year_ex = int(DateTimeUtil.SPECIFIC_YEAR_MONTH_LAST_WEEK_PATTERN.match(expression).group(1))
-                month_ex = int(DateTimeUtil.SPECIFIC_YEAR_MONTH_LAST_WEEK_PATTERN.match(expression).group(2))
-                comment = DateTimeUtil.get_specific_year_month_last_week(now, year_ex, month_ex)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def _dispatch_expression(expression: str, now: date) -> str | None:
+        matched = DateTimeUtil.match_rule(expression)
+        if matched is None:
+            return None
+        name, handler, groups = matched
+        return DateTimeUtil._apply_rule(name, handler, now, expression, groups)
 
-            if DateTimeUtil.GENERAL_MONTH_LAST_WEEK_PATTERN.match(expression):
-                month_ex = DateTimeUtil.GENERAL_MONTH_LAST_WEEK_PATTERN.match(expression).group(1)
-                comment = DateTimeUtil.get_general_month_last_week(now, month_ex)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def _apply_rule(name: str, handler, now: date, expression: str, groups: tuple) -> str | None:
+        calendar = DateTimeUtil._calendar
+        if calendar is not None and name in calendar.RANGE_RULES:
+            comment = calendar.resolve(name, now, expression, groups)
+            if comment is not None:
+                return comment
+            # 日历中不存在的期间（如第5季度、第54周）：公历配置下按原规则输出，其余配置不给出区间
+            if not calendar.config.is_gregorian:
+                return ""
+        return handler(now, expression, groups)
 
-            # if DateTimeUtil.GENERAL_MONTH_LAST_COMPLETE_WEEK_PATTERN.match(expression):
-            #     month_ex = DateTimeUtil.GENERAL_MONTH_LAST_COMPLETE_WEEK_PATTERN.match(expression).group(1)
-            #     comment = DateTimeUtil.get_general_month_last_complete_week_ex(now, month_ex)
-            #     date_time_comment_list.append(f"{expression}={comment}")
-            #     continue
+    @staticmethod
+    def _resolve_instrumented(expression: str, now: date) -> str | None:
+        metrics = DateTimeUtil._metrics
+        start = time.perf_counter()
+        matched = DateTimeUtil.match_rule(expression)
+        if matched is None:
+            metrics.record_unmatched(expression)
+            return None
+        name, handler, groups = matched
+        try:
+            comment = DateTimeUtil._apply_rule(name, handler, now, expression, groups)
+        except Exception as e:
+            metrics.record_error(name, expression, e)
+            raise
+        metrics.record(name, (time.perf_counter() - start) * 1e6)
+        return comment
 
-            if DateTimeUtil.RECENT_N_YEAR_PATTERN.match(expression):
-                n = int(DateTimeUtil.RECENT_N_YEAR_PATTERN.match(expression).group(1))
-                comment = DateTimeUtil.get_recent_n_year(now, n)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    # 规则命中与耗时统计，默认关闭，关闭时只多一次属性判断
+    _metrics = None
 
-            if DateTimeUtil.RECENT_N_MONTH_PATTERN.match(expression):
-                n = int(DateTimeUtil.RECENT_N_MONTH_PATTERN.match(expression).group(1))
-                comment = DateTimeUtil.get_recent_n_month(now, n)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    # 财年、零售周历等自定义日历（date_calendar.FiscalCalendar），为 None 时使用公历和周一开始的周
+    _calendar = None
 
-            if DateTimeUtil.RECENT_N_WEEK_PATTERN.match(expression):
-                n = int(DateTimeUtil.RECENT_N_WEEK_PATTERN.match(expression).group(1))
-                comment = DateTimeUtil.get_recent_n_week(now, n)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def set_calendar(calendar=None):
+        DateTimeUtil._calendar = calendar
+        DateTimeUtil._clear_results()
 
-            if DateTimeUtil.RECENT_N_DAY_WITHOUT_TODAY_PATTERN.match(expression):
-                n = int(DateTimeUtil.RECENT_N_DAY_WITHOUT_TODAY_PATTERN.match(expression).group(1))
-                comment = DateTimeUtil.get_recent_n_day_without_today(now, n)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def _clear_results():
+        # 已缓存的结果是按之前的日历、规则算的
+        if DateTimeUtil._expression_cache is not None:
+            DateTimeUtil._expression_cache.clear()
+        DateTimeUtil._day_tables = {}
 
-            if DateTimeUtil.RECENT_N_DAY_PATTERN.match(expression):
-                n = int(DateTimeUtil.RECENT_N_DAY_PATTERN.match(expression).group(1))
-                comment = DateTimeUtil.get_recent_n_day(now, n)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def get_calendar():
+        return DateTimeUtil._calendar
 
-            if DateTimeUtil.RECENT_N_COMPLETE_YEAR_PATTERN.match(expression):
-                n = int(DateTimeUtil.RECENT_N_COMPLETE_YEAR_PATTERN.match(expression).group(1))
-                comment = DateTimeUtil.get_recent_n_complete_year(now, n)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def enable_metrics(metrics=None):
+        if metrics is None:
+            from date_metrics import ResolverMetrics
+            metrics = ResolverMetrics()
+        DateTimeUtil._metrics = metrics
+        return metrics
 
-            if DateTimeUtil.RECENT_N_COMPLETE_QUARTER_PATTERN.match(expression):
-                n = int(DateTimeUtil.RECENT_N_COMPLETE_QUARTER_PATTERN.match(expression).group(1))
-                comment = DateTimeUtil.get_recent_n_complete_quarter(now, n)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def disable_metrics():
+        DateTimeUtil._metrics = None
 
-            if DateTimeUtil.RECENT_N_COMPLETE_MONTH_PATTERN.match(expression):
-                n = int(DateTimeUtil.RECENT_N_COMPLETE_MONTH_PATTERN.match(expression).group(1))
-                comment = DateTimeUtil.get_recent_n_complete_month(now, n)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def report_error(rule: str, expression: str, error: Exception):
+        if DateTimeUtil._metrics is not None:
+            DateTimeUtil._metrics.record_error(rule, expression, error)
+        else:
+            get_logger().warning("Error convert %s: %s, %s", rule, expression, error)
 
-            if DateTimeUtil.RECENT_N_COMPLETE_WEEK_PATTERN.match(expression):
-                n = int(DateTimeUtil.RECENT_N_COMPLETE_WEEK_PATTERN.match(expression).group(1))
-                comment = DateTimeUtil.get_recent_n_complete_week(now, n)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    # 解析结果缓存，默认关闭，通过 enable_cache 开启
+    _expression_cache = None
 
-            if DateTimeUtil.RECENT_N_QUARTER_WITH_CURRENT_PATTERN.match(expression):
-                n = int(DateTimeUtil.RECENT_N_QUARTER_WITH_CURRENT_PATTERN.match(expression).group(1))
-                comment = DateTimeUtil.get_recent_n_quarter_with_current(now, n)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def enable_cache(maxsize: int = 4096) -> ExpressionCache:
+        DateTimeUtil._expression_cache = ExpressionCache(maxsize)
+        return DateTimeUtil._expression_cache
 
-            if DateTimeUtil.SPECIFIC_YEAR_MONTH_PATTERN.match(expression):
-                date_time_comment_list.append(f"{expression}={expression}")
-                continue
+    @staticmethod
+    def disable_cache():
+        DateTimeUtil._expression_cache = None
 
-            if DateTimeUtil.GENERAL_YEAR_MONTH_PATTERN.match(expression):
-                year_ex = DateTimeUtil.GENERAL_YEAR_MONTH_PATTERN.match(expression).group(1)
-                comment = DateTimeUtil.get_year_ex(now, year_ex) + DateTimeUtil.GENERAL_YEAR_MONTH_PATTERN.match(expression).group(2)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def cache_info() -> dict | None:
+        cache = DateTimeUtil._expression_cache
+        return cache.info() if cache is not None else None
 
-            if DateTimeUtil.GENERAL_DAY_PATTERN.match(expression):
-                day_ex = DateTimeUtil.GENERAL_DAY_PATTERN.match(expression).group(1)
-                comment = DateTimeUtil.get_day_ex(now, day_ex)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    # 不带数字参数的表达式，给定日期后结果是有限集合，可以一次性算出
+    DAY_WORDS = ["今天", "昨天", "前天", "明天", "后天", "上月今天", "上上月今天"]
+    WEEK_WORDS = ["本周", "上周", "上上周", "下周", "下下周"]
+    MONTH_WORDS = ["本月", "上月", "上上月", "下月", "去年本月"]
+    QUARTER_WORDS = ["本季度", "上季度", "下季度", "去年本季度"]
+    YEAR_WORDS = ["今年", "去年", "前年", "明年", "后年"]
 
-            if DateTimeUtil.GENERAL_MONTH_PATTERN.match(expression):
-                month_ex = DateTimeUtil.GENERAL_MONTH_PATTERN.match(expression).group(1)
-                comment = DateTimeUtil.get_month_ex(now, month_ex)
-                date_time_comment_list.append(f"{expression}={comment}")
+    @staticmethod
+    def build_day_table(now: date) -> dict[str, str]:
+        entries = []
+        entries += [(day_ex, DateTimeUtil.get_day_ex, day_ex) for day_ex in DateTimeUtil.DAY_WORDS]
+        entries += [(week_ex, DateTimeUtil.get_week_ex, week_ex) for week_ex in DateTimeUtil.WEEK_WORDS]
+        entries += [(month_ex, DateTimeUtil.get_month_ex, month_ex) for month_ex in DateTimeUtil.MONTH_WORDS]
+        entries += [(quarter_ex, DateTimeUtil.get_quarter_ex, quarter_ex) for quarter_ex in DateTimeUtil.QUARTER_WORDS]
+        entries += [(year_ex, DateTimeUtil.get_year_ex, year_ex) for year_ex in DateTimeUtil.YEAR_WORDS]
+        entries += [(f"{month_ex}最后一天", DateTimeUtil.get_month_last_day_ex, month_ex)
+                    for month_ex in ["本月", "上月"]]
+        entries += [(f"{month_ex}最后一周", DateTimeUtil.get_general_month_last_week, month_ex)
+                    for month_ex in ["本月", "上月", "上上月"]]
+
+        table = {}
+        for expression, helper, word in entries:
+            try:
+                table[expression] = helper(now, word)
+            except ValueError:
+                # 例如 2月29日的"去年本月"，交给正则路径按原逻辑处理
                 continue
+        for half_year_ex in ["上", "下"]:
+            table[f"{half_year_ex}半年"] = DateTimeUtil.get_specific_year_half_year_ex(now, now.year, half_year_ex)
+            for year_ex in ["今年", "去年"]:
+                table[f"{year_ex}{half_year_ex}半年"] = DateTimeUtil.get_general_year_half_year_ex(
+                    now, year_ex, half_year_ex)
+        return table
+
+    # 当天的预计算表 (日期, 表)，开启后按日期自动重建
+    # 当地日期 -> 预计算表，保留最近 DAY_TABLE_DAYS 天，同一当地日期的各时区共用一张表
+    DAY_TABLE_DAYS = 3
+    _day_tables = {}
+    _day_table_enabled = False
 
-            if DateTimeUtil.SPECIFIC_YEAR_PATTERN.match(expression):
-                year_ex = int(DateTimeUtil.SPECIFIC_YEAR_PATTERN.match(expression).group(1))
-                comment = f"{year_ex}年"
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def get_day_table(now: date) -> dict[str, str]:
+        day = to_day(now)
+        tables = DateTimeUtil._day_tables
+        table = tables.get(day)
+        if table is not None:
+            return table
+        table = DateTimeUtil.build_day_table(now)
+        # 回溯比保留的日期都早的历史日期时不替换；整体替换字典，读取时不需要加锁
+        if len(tables) < DateTimeUtil.DAY_TABLE_DAYS or day > min(tables):
+            tables = dict(tables)
+            tables[day] = table
+            if len(tables) > DateTimeUtil.DAY_TABLE_DAYS:
+                del tables[min(tables)]
+            DateTimeUtil._day_tables = tables
+        return table
 
-            if DateTimeUtil.GENERAL_YEAR_PATTERN.match(expression):
-                year_ex = DateTimeUtil.GENERAL_YEAR_PATTERN.match(expression).group(1)
-                comment = DateTimeUtil.get_year_ex(now, year_ex)
-                date_time_comment_list.append(f"{expression}={comment}")
-                continue
+    @staticmethod
+    def lookup_day_table(now: date) -> dict[str, str] | None:
+        # 解析时只用已建好的表，没有时只为当前日期建表（各时区的当地日期与本地相差不超过一天）
+        # 回溯历史日期直接走正则路径，不为每个日期建一张用不上几次的表
+        day = to_day(now)
+        table = DateTimeUtil._day_tables.get(day)
+        if table is None and abs(day.toordinal() - date.today().toordinal()) <= 1:
+            table = DateTimeUtil.get_day_table(now)
+        return table
 
+    @staticmethod
+    def enable_day_table(now: date = None, tz=None) -> dict[str, str]:
+        DateTimeUtil._day_table_enabled = True
+        return DateTimeUtil.get_day_table(reference_day(now, tz))
 
+    @staticmethod
+    def disable_day_table():
+        DateTimeUtil._day_table_enabled = False
+        DateTimeUtil._day_tables = {}
 
+    @staticmethod
+    def build_date_expressions(expressions: list[str], now: date) -> list[str]:
+        date_time_comment_list = []
+
+        for expression in expressions:
+            comment = DateTimeUtil.resolve_expression(expression, now)
+            if comment is not None:
+                date_time_comment_list.append(f"{expression}={comment}")
 
         return date_time_comment_list
 
+    @staticmethod
+    def resolve_range(expression: str, now: date) -> DateRange | None:
+        matched = DateTimeUtil.match_rule(expression)
+        if matched is None:
+            return None
+        name, handler, groups = matched
+        calendar = DateTimeUtil._calendar
+        if calendar is not None and name in calendar.RANGE_RULES:
+            try:
+                date_range = calendar.resolve_range(name, now, expression, groups)
+            except (ValueError, OverflowError):
+                return None
+            # 与 _apply_rule 相同：公历配置下日历给不出的期间按原规则计算
+            if date_range is not None or not calendar.config.is_gregorian:
+                return date_range
+        granularity, range_func = DateTimeUtil.RANGE_RULES[name]
+        try:
+            dates = range_func(to_day(now), expression, groups)
+        except (ValueError, OverflowError):
+            # 不存在的日期，如 2023年02月29日；或 N 过大超出日期范围
+            return None
+        if dates is None:
+            return None
+        return DateRange(expression, dates[0], dates[1], granularity, name)
+
+    @staticmethod
+    def build_date_ranges(expressions: list[str], now: date) -> list[DateRange]:
+        date_ranges = []
+        for expression in expressions:
+            date_range = DateTimeUtil.resolve_range(expression, now)
+            if date_range is not None:
+                date_ranges.append(date_range)
+        return date_ranges
+
+    @staticmethod
+    def next_boundary(day: date, period: str) -> date:
+        if period == "day":
+            return day + timedelta(days=1)
+        if period == "week":
+            return day + timedelta(days=7 - day.weekday())
+        if period == "sunday":
+            return day + timedelta(days=6 - day.weekday() or 7)
+        if period == "month":
+            return DateTimeUtil.month_end(day.year, day.month) + timedelta(days=1)
+        if period == "month_edge":
+            month_end = DateTimeUtil.month_end(day.year, day.month)
+            return month_end if day < month_end else day + timedelta(days=1)
+        if period == "quarter":
+            return DateTimeUtil.month_end(day.year, (day.month - 1) // 3 * 3 + 3) + timedelta(days=1)
+        if period == "year":
+            return date(day.year + 1, 1, 1)
+        raise ValueError(f"未知的边界类型: {period}")
+
+    @staticmethod
+    def _resolve_or_error(expression: str, now: date):
+        try:
+            return DateTimeUtil._dispatch_expression(expression, now)
+        except ValueError as e:
+            return e.__class__
+
+    # 返回表达式解析结果下一次发生变化的时刻（当天零点），结果与日期无关或无法解析时返回 None
+    @staticmethod
+    def next_change(expression: str, now: date, max_steps: int = 1000) -> datetime | None:
+        matched = DateTimeUtil.match_rule(expression)
+        if matched is None:
+            return None
+        period = DateTimeUtil.RULE_PERIODS[matched[0]]
+        if period is None:
+            return None
+        if DateTimeUtil._calendar is not None and matched[0] in DateTimeUtil._calendar.RANGE_RULES:
+            # 自定义日历的期间边界与公历不同，逐天检查
+            period = "day"
+
+        day = to_day(now)
+        current = DateTimeUtil._resolve_or_error(expression, day)
+        candidate = day
+        # 按边界逐个检查，真正变化的那个边界才是失效时刻（如 2月29日 这类特殊日期可能跳过边界）
+        for _ in range(max_steps):
+            candidate = DateTimeUtil.next_boundary(candidate, period)
+            if DateTimeUtil._resolve_or_error(expression, candidate) != current:
+                return datetime(candidate.year, candidate.month, candidate.day)
+        return None
+
+    # 以下 get_* 在 ordinal 上计算起止日，输出时才转成文字；now 可以是 date 或 datetime
     @staticmethod
     def get_year_ex(now: datetime, year_ex: str) -> str:
         year = now.year
@@ -368,310 +1168,127 @@ class DateTimeUtil:
 
     @staticmethod
     def get_month_ex(now: datetime, month_ex: str) -> str:
-        date_format = "%Y年%m月"
         if month_ex == "本月":
-            return now.strftime(date_format)
-        elif month_ex == "上月":
-            last_month = now - timedelta(days=30)
-            return last_month.strftime(date_format.replace("%Y", "%Y").replace("%m", "%m").replace("30", "01"))
-        elif month_ex == "上上月":
-            last_month = now - timedelta(days=60)
-            return last_month.strftime(date_format.replace("%Y", "%Y").replace("%m", "%m").replace("30", "01"))
-        elif month_ex == "下月":
-            next_month = now + timedelta(days=30)
-            return next_month.strftime(date_format.replace("%Y", "%Y").replace("%m", "%m").replace("30", "01"))
+            return f"{now.year}年{now.month:02d}月"
+        elif month_ex in ("上月", "上上月", "下月"):
+            # 按前后 30/60 天取所在月份
+            return OrdinalCalendar.format_month(now.toordinal() + DateTimeUtil.MONTH_DAY_SHIFTS[month_ex])
         elif month_ex == "去年本月":
-            last_year = now.replace(year=now.year - 1)
-            return last_year.strftime(date_format)
+            # 2月29日 时去年没有这一天，与 now.replace(year=...) 一样抛出 ValueError
+            OrdinalCalendar.ordinal(now.year - 1, now.month, now.day)
+            return f"{now.year - 1}年{now.month:02d}月"
         return ""
 
     @staticmethod
     def get_day_ex(now: datetime, day_ex: str) -> str:
-        date_format = "%Y年%m月%d日"
+        offsets = {"今天": 0, "昨天": -1, "前天": -2, "明天": 1, "后天": 2}
         comment = ""
         try:
-            if day_ex == "今天":
-                comment = now.strftime(date_format)
-            elif day_ex == "昨天":
-                comment = (now - timedelta(days=1)).strftime(date_format)
-            elif day_ex == "前天":
-                comment = (now - timedelta(days=2)).strftime(date_format)
-            elif day_ex == "明天":
-                comment = (now + timedelta(days=1)).strftime(date_format)
-            elif day_ex == "后天":
-                comment = (now + timedelta(days=2)).strftime(date_format)
-            elif day_ex == "上月今天":
-                previous_month = now + relativedelta(months=-1)
-                comment = (previous_month.replace(day=now.day)).strftime(date_format)
-            elif day_ex == "上上月今天":
-                two_months_ago = now + relativedelta(months=-2)
-                comment = (two_months_ago.replace(day=now.day)).strftime(date_format)
+            if day_ex in offsets:
+                comment = OrdinalCalendar.format_day(now.toordinal() + offsets[day_ex])
+            elif day_ex == "上月今天" or day_ex == "上上月今天":
+                year, month = DateTimeUtil.month_of(now, "上月" if day_ex == "上月今天" else "上上月")
+                comment = OrdinalCalendar.format_day(OrdinalCalendar.ordinal(year, month, now.day))
 
         except Exception as e:
-            print(f"Error convert dayEx: {day_ex}, {e}")
+            DateTimeUtil.report_error("GENERAL_DAY", day_ex, e)
 
         return comment
 
     @staticmethod
     def get_week_day_ex(now: datetime, x: int) -> str:
-        # 计算本周第一天（周一）的日期
-        monday = now - timedelta(days=now.weekday())
-        # 通过加上(x - 1)天来得到本周第x天的日期
-        desired_day = monday + timedelta(days=x - 1)
-        return desired_day.strftime("%Y年%m月%d日")
+        # 本周第一天（周一）加上 x - 1 天
+        return OrdinalCalendar.format_day(OrdinalCalendar.monday(now.toordinal()) + x - 1)
 
     @staticmethod
     def get_general_week_day_ex(now: datetime, week_ex: str, day: int) -> str:
-        this_monday = now - timedelta(days=now.weekday())
-        desired_day = this_monday + timedelta(days=day - 1)
-
-        if week_ex == "上周":
-            desired_day -= timedelta(weeks=1)
-        elif week_ex == "上上周":
-            desired_day -= timedelta(weeks=2)
-        elif week_ex == "下周":
-            desired_day += timedelta(weeks=1)
-        elif week_ex == "下下周":
-            desired_day += timedelta(weeks=2)
-
-        return desired_day.strftime("%Y年%m月%d日")
+        monday = OrdinalCalendar.monday(now.toordinal()) + 7 * DateTimeUtil.WEEK_OFFSETS.get(week_ex, 0)
+        return OrdinalCalendar.format_day(monday + day - 1)
 
     @staticmethod
     def get_week_ex(now: datetime, week_ex: str) -> str:
-        desire_monday = now - timedelta(days=now.weekday())
-        desire_sunday = desire_monday + timedelta(days=6)
-
-        if week_ex == "上周":
-            desire_monday -= timedelta(weeks=1)
-            desire_sunday -= timedelta(weeks=1)
-        elif week_ex == "上上周":
-            desire_monday -= timedelta(weeks=2)
-            desire_sunday -= timedelta(weeks=2)
-        elif week_ex == "下周":
-            desire_monday += timedelta(weeks=1)
-            desire_sunday += timedelta(weeks=1)
-        elif week_ex == "下下周":
-            desire_monday += timedelta(weeks=2)
-            desire_sunday += timedelta(weeks=2)
-
-        return f"{desire_monday.strftime('%Y年%m月%d日')}至{desire_sunday.strftime('%Y年%m月%d日')}"
+        monday = OrdinalCalendar.monday(now.toordinal()) + 7 * DateTimeUtil.WEEK_OFFSETS.get(week_ex, 0)
+        return OrdinalCalendar.format_range(monday, monday + 6)
 
     @staticmethod
     def get_specific_year_week_ex(now: datetime, year: int, week: int) -> str:
-        first_day_of_year = datetime(year, 1, 1)
-        target_week_first_day = first_day_of_year + timedelta(weeks=week - 1)
-        target_week_last_day = target_week_first_day + timedelta(days=6)
-        last_day_of_year = first_day_of_year.replace(month=12, day=31)
-
-        if last_day_of_year < target_week_last_day:
-            target_week_last_day = last_day_of_year
-
-        return f"{target_week_first_day.strftime('%Y年%m月%d日')}至{target_week_last_day.strftime('%Y年%m月%d日')}"
+        # 从 1月1日 起每 7 天一周，最后一周截断到年底（第54周会得到起始日晚于结束日的结果）
+        start = OrdinalCalendar.year_start(year) + 7 * (week - 1)
+        end = min(start + 6, OrdinalCalendar.year_end(year))
+        return OrdinalCalendar.format_range(start, end)
 
     @staticmethod
     def get_general_year_week_ex(now: datetime, year_ex: str, week: int) -> str:
-        year = now.year
-        if year_ex == "去年":
-            year -= 1
-        elif year_ex == "前年":
-            year -= 2
-        elif year_ex == "明年":
-            year += 1
-        elif year_ex == "后年":
-            year += 2
+        year = now.year + DateTimeUtil.YEAR_OFFSETS.get(year_ex, 0)
         return DateTimeUtil.get_specific_year_week_ex(now, year, week)
 
     @staticmethod
     def get_specific_year_month_week_ex(now: datetime, year: int, month: int, week: int) -> str:
-        first_day_of_month = datetime(year, month, 1)
-        target_week_first_day = first_day_of_month + timedelta(weeks=week - 1)
-        target_week_last_day = target_week_first_day + timedelta(days=6)
-        last_day_of_month = first_day_of_month + relativedelta(months=1, days=-1)
-
-        if last_day_of_month < target_week_last_day:
-            target_week_last_day = last_day_of_month
-
-        return f"{target_week_first_day.strftime('%Y年%m月%d日')}至{target_week_last_day.strftime('%Y年%m月%d日')}"
+        start = OrdinalCalendar.month_start(year, month) + 7 * (week - 1)
+        end = min(start + 6, OrdinalCalendar.month_end(year, month))
+        return OrdinalCalendar.format_range(start, end)
 
     @staticmethod
     def get_general_year_month_week_ex(now: datetime, year_ex: str, month: int, week: int) -> str:
-        year = now.year
-        if year_ex == "去年":
-            year -= 1
-        elif year_ex == "前年":
-            year -= 2
-        elif year_ex == "明年":
-            year += 1
-        elif year_ex == "后年":
-            year += 2
+        year = now.year + DateTimeUtil.YEAR_OFFSETS.get(year_ex, 0)
         return DateTimeUtil.get_specific_year_month_week_ex(now, year, month, week)
 
     @staticmethod
     def get_general_month_week_ex(now: datetime, month_ex: str, week: int) -> str:
-        year = now.year
-        month = now.month
-
-        if month_ex == "上月":
-            month -= 1
-            if month <= 0:
-                year -= 1
-                month = 12
-        elif month_ex == "上上月":
-            month -= 2
-            if month <= 0:
-                year -= 1
-                month += 12
-        elif month_ex == "下月":
-            month += 1
-            if month > 12:
-                year += 1
-                month -= 12
-
-        first_day_of_month = datetime(year, month, 1)
-        target_week_first_day = first_day_of_month + timedelta(weeks=week - 1)
-        target_week_last_day = target_week_first_day + timedelta(days=6)
-        last_day_of_month = first_day_of_month + relativedelta(months=1, days=-1)
-
-        if last_day_of_month < target_week_last_day:
-            target_week_last_day = last_day_of_month
-
-        return f"{target_week_first_day.strftime('%Y年%m月%d日')}至{target_week_last_day.strftime('%Y年%m月%d日')}"
+        year, month = DateTimeUtil.month_of(now, month_ex)
+        return DateTimeUtil.get_specific_year_month_week_ex(now, year, month, week)
 
     @staticmethod
     def get_specific_year_month_complete_week_ex(now: datetime, year: int, month: int, week: int) -> str:
-        first_day_of_month = datetime(year, month, 1)
-        first_monday = first_day_of_month + timedelta(days=(-first_day_of_month.weekday()) % 7)
-        target_start_date = first_monday + timedelta(weeks=week - 1)
-        target_end_date = target_start_date + timedelta(days=6)
-        last_day_of_month = first_day_of_month + relativedelta(months=1, days=-1)
-
-        if last_day_of_month < target_end_date:
+        month_start = OrdinalCalendar.month_start(year, month)
+        start = month_start + -OrdinalCalendar.weekday(month_start) % 7 + 7 * (week - 1)
+        if OrdinalCalendar.month_end(year, month) < start + 6:
             return ""  # Return empty string as per the original Java method behavior
 
-        return f"{target_start_date.strftime('%Y年%m月%d日')}至{target_end_date.strftime('%Y年%m月%d日')}"
+        return OrdinalCalendar.format_range(start, start + 6)
 
     @staticmethod
     def get_general_year_month_complete_week_ex(now: datetime, year_ex: str, month: int, week: int) -> str:
-        year = now.year
-        if year_ex == "去年":
-            year -= 1
-        elif year_ex == "前年":
-            year -= 2
-        elif year_ex == "明年":
-            year += 1
-        elif year_ex == "后年":
-            year += 2
+        year = now.year + DateTimeUtil.YEAR_OFFSETS.get(year_ex, 0)
         return DateTimeUtil.get_specific_year_month_complete_week_ex(now, year, month, week)
 
     @staticmethod
     def get_general_month_complete_week_ex(now: datetime, month_ex: str, week: int) -> str:
-        year = now.year
-        month = now.month
-
-        if month_ex == "上月":
-            month -= 1
-            if month <= 0:
-                year -= 1
-                month = 12
-        elif month_ex == "上上月":
-            month -= 2
-            if month <= 0:
-                year -= 1
-                month += 12
-        elif month_ex == "下月":
-            month += 1
-            if month > 12:
-                year += 1
-                month -= 12
-
+        year, month = DateTimeUtil.month_of(now, month_ex)
         return DateTimeUtil.get_specific_year_month_complete_week_ex(now, year, month, week)
 
     @staticmethod
     def get_specific_year_complete_week_ex(now: datetime, year: int, week: int) -> str:
-        first_day_of_year = datetime(year, 1, 1)
-        first_monday = first_day_of_year + timedelta(days=(-first_day_of_year.weekday()) % 7)
-        target_start_date = first_monday + timedelta(weeks=week - 1)
-        target_end_date = target_start_date + timedelta(days=6)
-        last_day_of_year = first_day_of_year + relativedelta(years=1, days=-1)
-
-        if last_day_of_year < target_end_date:
+        start = OrdinalCalendar.first_monday(year) + 7 * (week - 1)
+        if OrdinalCalendar.year_end(year) < start + 6:
             return ""
 
-        return f"{target_start_date.strftime('%Y年%m月%d日')}至{target_end_date.strftime('%Y年%m月%d日')}"
+        return OrdinalCalendar.format_range(start, start + 6)
 
     @staticmethod
     def get_general_year_complete_week_ex(now: datetime, year_ex: str, week: int) -> str:
-        year = now.year
-        if year_ex == "去年":
-            year -= 1
-        elif year_ex == "前年":
-            year -= 2
-        elif year_ex == "明年":
-            year += 1
-        elif year_ex == "后年":
-            year += 2
+        year = now.year + DateTimeUtil.YEAR_OFFSETS.get(year_ex, 0)
         return DateTimeUtil.get_specific_year_complete_week_ex(now, year, week)
 
     @staticmethod
     def get_specific_year_month_last_week(now: datetime, year: int, month: int) -> str:
-        last_day_of_month = calendar.monthrange(year, month)[1]
-        last_date = datetime(year, month, last_day_of_month)
-        last_day_of_month = datetime(year, month, last_day_of_month)
-        while last_date.weekday() != 0:
-            last_date -= timedelta(days=1)
-        return f"{last_date.strftime('%Y年%m月%d日')}至{last_day_of_month.strftime('%Y年%m月%d日')}"
+        # 月末所在周的周一至月末
+        month_end = OrdinalCalendar.month_end(year, month)
+        return OrdinalCalendar.format_range(OrdinalCalendar.monday(month_end), month_end)
 
     @staticmethod
     def get_general_month_last_week(now: datetime, month_ex: str) -> str:
-        year = now.year
-        month = now.month
-
-        if month_ex == "上月":
-            month -= 1
-            if month <= 0:
-                year -= 1
-                month = 12
-        elif month_ex == "上上月":
-            month -= 2
-            if month <= 0:
-                year -= 1
-                month += 12
-        elif month_ex == "下月":
-            month += 1
-            if month > 12:
-                year += 1
-                month -= 12
-
+        year, month = DateTimeUtil.month_of(now, month_ex)
         return DateTimeUtil.get_specific_year_month_last_week(now, year, month)
 
     @staticmethod
     def get_specific_year_month_last_complete_week_ex(now: datetime, year: int, month: int) -> str:
-        first_day_of_month = datetime(year, month, 1)
-        last_sunday = first_day_of_month + relativedelta(months=1, days=-1)
-        last_monday = last_sunday - timedelta(days=6)
-        return f"{last_monday.strftime('%Y年%m月%d日')}至{last_sunday.strftime('%Y年%m月%d日')}"
+        last_sunday = OrdinalCalendar.month_end(year, month)
+        return OrdinalCalendar.format_range(last_sunday - 6, last_sunday)
 
     @staticmethod
     def get_general_month_last_complete_week_ex(now: datetime, month_ex: str) -> str:
-        year = now.year
-        month = now.month
-
-        if month_ex == "上月":
-            month -= 1
-            if month <= 0:
-                year -= 1
-                month = 12
-        elif month_ex == "上上月":
-            month -= 2
-            if month <= 0:
-                year -= 1
-                month += 12
-        elif month_ex == "下月":
-            month += 1
-            if month > 12:
-                year += 1
-                month -= 12
-
+        year, month = DateTimeUtil.month_of(now, month_ex)
         return DateTimeUtil.get_specific_year_month_last_complete_week_ex(now, year, month)
 
     @staticmethod
@@ -698,283 +1315,340 @@ class DateTimeUtil:
 
     @staticmethod
     def get_recent_n_year(now: datetime, n: int) -> str:
-        start_date = now - relativedelta(years=n)
-        return f"{start_date.strftime('%Y年%m月%d日')}至{now.strftime('%Y年%m月%d日')}"
+        start = OrdinalCalendar.add_months(now.year, now.month, now.day, -12 * n)
+        return OrdinalCalendar.format_range(start, now.toordinal())
 
     @staticmethod
     def get_recent_n_month(now: datetime, n: int) -> str:
-        start_date = now - relativedelta(months=n)
-        return f"{start_date.strftime('%Y年%m月%d日')}至{now.strftime('%Y年%m月%d日')}"
+        start = OrdinalCalendar.add_months(now.year, now.month, now.day, -n)
+        return OrdinalCalendar.format_range(start, now.toordinal())
 
     @staticmethod
     def get_recent_n_week(now: datetime, n: int) -> str:
-        start_date = now - timedelta(weeks=n)
-        return f"{start_date.strftime('%Y年%m月%d日')}至{now.strftime('%Y年%m月%d日')}"
+        today = now.toordinal()
+        return OrdinalCalendar.format_range(today - 7 * n, today)
 
     @staticmethod
     def get_recent_n_day(now: datetime, n: int) -> str:
-        start_date = now - timedelta(days=n)
-        return f"{start_date.strftime('%Y年%m月%d日')}至{now.strftime('%Y年%m月%d日')}"
+        today = now.toordinal()
+        return OrdinalCalendar.format_range(today - n, today)
 
     @staticmethod
     def get_recent_n_complete_year(now: datetime, n: int) -> str:
-        if now.month == 12 and now.day == 31:
-            end_date = now
-        else:
-            end_date = datetime(now.year, 12, 31) - relativedelta(years=1)
-        start_date = end_date - relativedelta(years=n) + timedelta(days=1)
-        return f"{start_date.strftime('%Y年%m月%d日')}至{end_date.strftime('%Y年%m月%d日')}"
+        # 12月31日 当天今年算完整年，否则截至去年年底
+        end_year = now.year if now.month == 12 and now.day == 31 else now.year - 1
+        start = OrdinalCalendar.add_months(end_year, 12, 31, -12 * n) + 1
+        return OrdinalCalendar.format_range(start, OrdinalCalendar.year_end(end_year))
 
     @staticmethod
     def get_recent_n_complete_month(now: datetime, n: int) -> str:
-        current_month = now.month
-        current_year = now.year
-        if current_month > 2:
-            start_month = current_month - 2
-            start_year = current_year
-        else:
-            start_month = 12 + (current_month - 2)
-            start_year = current_year - 1
-
-        start_date = datetime(start_year, start_month, 1)
-
-        end_month = current_month - 1
-        end_year = current_year
-
-        if end_month == 0:
-            end_month = 12
-            end_year -= 1
-
-        end_date = datetime(end_year, end_month, calendar.monthrange(end_year, end_month)[1])
-
-        return f"{start_date.strftime('%Y年%m月%d日')}至{end_date.strftime('%Y年%m月%d日')}"
+        # 固定为前两个完整月
+        start_year, start_month = DateTimeUtil.month_of(now, "上上月")
+        end_year, end_month = DateTimeUtil.month_of(now, "上月")
+        return OrdinalCalendar.format_range(OrdinalCalendar.month_start(start_year, start_month),
+                                            OrdinalCalendar.month_end(end_year, end_month))
 
     @staticmethod
     def get_recent_n_complete_quarter(now: datetime, n: int) -> str:
         if now.month % 3 == 0 and now.day == 31:
-            end_date = now
+            end_year, end_month, end_day = now.year, now.month, now.day
         else:
-            if now.month < 4:
-                end_date = datetime(now.year - 1, 12, 31)
-            elif now.month < 7:
-                end_date = datetime(now.year, 3, 31)
-            elif now.month < 10:
-                end_date = datetime(now.year, 6, 30)
-            else:
-                end_date = datetime(now.year, 9, 30)
+            # 上个季度的最后一天
+            end_year, end_month = divmod(now.year * 12 + (now.month - 1) // 3 * 3 - 1, 12)
+            end_month += 1
+            end_day = OrdinalCalendar.days_in_month(end_year, end_month)
 
-        start_date = end_date - relativedelta(months=n * 3) + timedelta(days=2)
-        return f"{start_date.strftime('%Y年%m月%d日')}至{end_date.strftime('%Y年%m月%d日')}"
+        start = OrdinalCalendar.add_months(end_year, end_month, end_day, -n * 3) + 2
+        return OrdinalCalendar.format_range(start, OrdinalCalendar.month_start(end_year, end_month) + end_day - 1)
 
     @staticmethod
     def get_recent_n_complete_week(now: datetime, n: int) -> str:
-        if now.weekday() == 6:  # Sunday
-            end_date = now
-        else:
-            end_date = now - timedelta(weeks=1) + timedelta(days=(6 - now.weekday()))
-
-        start_date = end_date - timedelta(weeks=n) + timedelta(days=1)
-        return f"{start_date.strftime('%Y年%m月%d日')}至{end_date.strftime('%Y年%m月%d日')}"
+        # 周日当天本周算完整周，否则截至上周日
+        today = now.toordinal()
+        weekday = OrdinalCalendar.weekday(today)
+        end = today if weekday == 6 else today - weekday - 1
+        return OrdinalCalendar.format_range(end - 7 * n + 1, end)
 
     @staticmethod
     def get_recent_n_day_without_today(now: datetime, n: int) -> str:
-        start_date = now - timedelta(days=n)
-        end_date = now - timedelta(days=1)
-        return f"{start_date.strftime('%Y年%m月%d日')}至{end_date.strftime('%Y年%m月%d日')}"
+        today = now.toordinal()
+        return OrdinalCalendar.format_range(today - n, today - 1)
 
     @staticmethod
     def get_recent_n_quarter_with_current(now: datetime, n: int) -> str:
-        if now.month < 4:
-            end_date = datetime(now.year, 3, 31)
-        elif now.month < 7:
-            end_date = datetime(now.year, 6, 30)
-        elif now.month < 10:
-            end_date = datetime(now.year, 9, 30)
-        else:
-            end_date = datetime(now.year, 12, 31)
-
-        start_date = end_date - relativedelta(months=n * 3 - 1)
-        start_date = datetime(start_date.year, start_date.month, 1)
-        return f"{start_date.strftime('%Y年%m月%d日')}至{end_date.strftime('%Y年%m月%d日')}"
+        end_month = (now.month - 1) // 3 * 3 + 3
+        start = OrdinalCalendar.add_months(now.year, end_month, 1, -(n * 3 - 1))
+        return OrdinalCalendar.format_range(start, OrdinalCalendar.month_end(now.year, end_month))
 
     @staticmethod
     def get_month_last_day_ex(now: datetime, month_ex: str) -> str:
-        month = now.month
-        year = now.year
         if month_ex == "本月":
-            next_month = month + 1 if month < 12 else 1
-            next_year = year if month < 12 else year + 1
-            first_of_next_month = datetime(year=next_year, month=next_month, day=1)
-            last_day_of_this_month = first_of_next_month - relativedelta(days=1)
-            comment = last_day_of_this_month.strftime('%Y年%m月%d日')
+            comment = OrdinalCalendar.format_day(OrdinalCalendar.month_end(now.year, now.month))
         elif month_ex == "上月":
-            first_of_this_month = datetime(year=year, month=month, day=1)
-            last_day_of_last_month = first_of_this_month - relativedelta(days=1)
-            comment = last_day_of_last_month.strftime('%Y年%m月%d日')
-        # if month_ex == "本月":
-        #     comment = (now + relativedelta(day=1, months=1, days=-1)).strftime('%Y年%m月%d日')
+            comment = OrdinalCalendar.format_day(OrdinalCalendar.month_start(now.year, now.month) - 1)
 
         return comment
 
     @staticmethod
     def get_general_year_month_last_day_ex(now: datetime, year_ex: str, month: int) -> str:
-        year = now.year
-        if year_ex == "去年":
-            year -= 1
-        elif year_ex == "前年":
-            year -= 2
-        elif year_ex == "明年":
-            year += 1
-        elif year_ex == "后年":
-            year += 2
-
-        comment = (datetime(year, month, 1) + relativedelta(months=1, days=-1)).strftime('%Y年%m月%d日')
-        return comment
+        year = now.year + DateTimeUtil.YEAR_OFFSETS.get(year_ex, 0)
+        return OrdinalCalendar.format_day(OrdinalCalendar.month_end(year, month))
 
     @staticmethod
     def get_specific_year_half_year_ex(now: datetime, year: int, half_year_ex: str) -> str:
         if half_year_ex == "上":
-            start_date = datetime(year, 1, 1)
-            end_date = datetime(year, 6, 30)
+            start = OrdinalCalendar.year_start(year)
+            end = OrdinalCalendar.month_end(year, 6)
         else:
-            start_date = datetime(year, 7, 1)
-            end_date = datetime(year, 12, 31)
+            start = OrdinalCalendar.month_start(year, 7)
+            end = OrdinalCalendar.year_end(year)
 
-        return f"{start_date.strftime('%Y年%m月%d日')}至{end_date.strftime('%Y年%m月%d日')}"
+        return OrdinalCalendar.format_range(start, end)
 
     @staticmethod
     def get_general_year_half_year_ex(now: datetime, year_ex: str, half_year_ex: str) -> str:
-        year = now.year
-        if year_ex == "去年":
-            year -= 1
-        elif year_ex == "前年":
-            year -= 2
-        elif year_ex == "明年":
-            year += 1
-        elif year_ex == "后年":
-            year += 2
+        year = now.year + DateTimeUtil.YEAR_OFFSETS.get(year_ex, 0)
         return DateTimeUtil.get_specific_year_half_year_ex(now, year, half_year_ex)
 
+    # ---------- 区间计算：返回 (起始日, 结束日) 的 date，供结构化结果使用 ----------
+
+    YEAR_OFFSETS = {"今年": 0, "去年": -1, "前年": -2, "明年": 1, "后年": 2}
+    WEEK_OFFSETS = {"本周": 0, "上周": -1, "上上周": -2, "下周": 1, "下下周": 2}
+    MONTH_OFFSETS = {"本月": 0, "上月": -1, "上上月": -2, "下月": 1}
+    # get_month_ex 中上月/上上月/下月是按前后 30/60 天取所在月份
+    MONTH_DAY_SHIFTS = {"本月": 0, "上月": -30, "上上月": -60, "下月": 30}
+
+    @staticmethod
+    def year_of(today: date, year_ex: str) -> int:
+        return today.year + DateTimeUtil.YEAR_OFFSETS[year_ex]
+
+    @staticmethod
+    def month_of(today: date, month_ex: str) -> tuple:
+        index = today.year * 12 + today.month - 1 + DateTimeUtil.MONTH_OFFSETS[month_ex]
+        return index // 12, index % 12 + 1
+
+    @staticmethod
+    def shifted_month_of(today: date, month_ex: str) -> tuple:
+        # get_month_ex 的取法：前后 30/60 天所在的月份
+        return OrdinalCalendar.year_month(today.toordinal() + DateTimeUtil.MONTH_DAY_SHIFTS[month_ex])
+
+    @staticmethod
+    def month_end(year: int, month: int) -> date:
+        return date.fromordinal(OrdinalCalendar.month_end(year, month))
+
+    DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+    @staticmethod
+    def days_in_month(year: int, month: int) -> int:
+        if not 1 <= month <= 12:
+            raise ValueError(f"bad month number {month}; must be 1-12")
+        if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+            return 29
+        return DateTimeUtil.DAYS_IN_MONTH[month - 1]
+
+    @staticmethod
+    def add_months(day: date, months: int) -> date:
+        # 与 relativedelta(months=n) 一致：目标月没有这一天时取月末，date/datetime 类型保持不变
+        index = day.year * 12 + day.month - 1 + months
+        year, month = index // 12, index % 12 + 1
+        return day.replace(year=year, month=month, day=min(day.day, DateTimeUtil.days_in_month(year, month)))
+
+    # 以下区间函数在 ordinal 上计算，返回前才转换成 (起始日, 结束日) 的 date
+    @staticmethod
+    def day_range(year: int, month: int, day: int) -> tuple:
+        ordinal = OrdinalCalendar.ordinal(year, month, day)
+        return OrdinalCalendar.to_range(ordinal, ordinal)
+
+    @staticmethod
+    def week_start(today: date, week_ex: str) -> int:
+        return OrdinalCalendar.monday(today.toordinal()) + 7 * DateTimeUtil.WEEK_OFFSETS[week_ex]
+
+    @staticmethod
+    def week_range(today: date, week_ex: str) -> tuple:
+        monday = DateTimeUtil.week_start(today, week_ex)
+        return OrdinalCalendar.to_range(monday, monday + 6)
+
+    @staticmethod
+    def week_day_range(today: date, week_ex: str, day: int) -> tuple:
+        ordinal = DateTimeUtil.week_start(today, week_ex) + day - 1
+        return OrdinalCalendar.to_range(ordinal, ordinal)
+
+    @staticmethod
+    def month_range(year: int, month: int) -> tuple:
+        return OrdinalCalendar.to_range(OrdinalCalendar.month_start(year, month), OrdinalCalendar.month_end(year, month))
+
+    @staticmethod
+    def month_last_day_range(year: int, month: int) -> tuple:
+        ordinal = OrdinalCalendar.month_end(year, month)
+        return OrdinalCalendar.to_range(ordinal, ordinal)
+
+    @staticmethod
+    def quarter_range(year: int, quarter: int) -> tuple:
+        return OrdinalCalendar.to_range(OrdinalCalendar.month_start(year, quarter * 3 - 2),
+                                        OrdinalCalendar.month_end(year, quarter * 3))
+
+    @staticmethod
+    def half_year_range(year: int, half_year_ex: str) -> tuple:
+        if half_year_ex == "上":
+            return OrdinalCalendar.to_range(OrdinalCalendar.year_start(year), OrdinalCalendar.month_end(year, 6))
+        return OrdinalCalendar.to_range(OrdinalCalendar.month_start(year, 7), OrdinalCalendar.year_end(year))
+
+    @staticmethod
+    def year_range(year: int) -> tuple:
+        return OrdinalCalendar.to_range(OrdinalCalendar.year_start(year), OrdinalCalendar.year_end(year))
+
+    @staticmethod
+    def general_day_range(today: date, day_ex: str) -> tuple | None:
+        offsets = {"今天": 0, "昨天": -1, "前天": -2, "明天": 1, "后天": 2}
+        if day_ex in offsets:
+            ordinal = today.toordinal() + offsets[day_ex]
+            return OrdinalCalendar.to_range(ordinal, ordinal)
+        year, month = DateTimeUtil.month_of(today, "上月" if day_ex == "上月今天" else "上上月")
+        # 目标月没有同一天时 get_day_ex 返回空
+        if today.day > OrdinalCalendar.days_in_month(year, month):
+            return None
+        return DateTimeUtil.day_range(year, month, today.day)
+
+    @staticmethod
+    def general_month_range(today: date, month_ex: str) -> tuple:
+        if month_ex == "去年本月":
+            # 2月29日 时与 get_month_ex 一样抛出 ValueError
+            OrdinalCalendar.ordinal(today.year - 1, today.month, today.day)
+            return DateTimeUtil.month_range(today.year - 1, today.month)
+        return DateTimeUtil.month_range(*DateTimeUtil.shifted_month_of(today, month_ex))
+
+    @staticmethod
+    def general_quarter_range(today: date, quarter_ex: str) -> tuple:
+        offsets = {"本季度": 0, "上季度": -1, "下季度": 1, "去年本季度": -4}
+        index = today.year * 4 + (today.month - 1) // 3 + offsets[quarter_ex]
+        return DateTimeUtil.quarter_range(index // 4, index % 4 + 1)
+
+    @staticmethod
+    def year_week_range(year: int, week: int) -> tuple | None:
+        # 从 1月1日 起每 7 天一周，最后一周截断到年底
+        start = OrdinalCalendar.year_start(year) + 7 * (week - 1)
+        end = min(start + 6, OrdinalCalendar.year_end(year))
+        return OrdinalCalendar.to_range(start, end) if start <= end else None
+
+    @staticmethod
+    def month_week_range(year: int, month: int, week: int) -> tuple | None:
+        start = OrdinalCalendar.month_start(year, month) + 7 * (week - 1)
+        end = min(start + 6, OrdinalCalendar.month_end(year, month))
+        return OrdinalCalendar.to_range(start, end) if start <= end else None
+
+    @staticmethod
+    def complete_week_range(first_day: int, last_day: int, week: int) -> tuple | None:
+        # 从第一个周一开始计算完整周，超出范围时没有结果；first_day、last_day 为 ordinal
+        start = first_day + -OrdinalCalendar.weekday(first_day) % 7 + 7 * (week - 1)
+        return OrdinalCalendar.to_range(start, start + 6) if start + 6 <= last_day else None
+
+    @staticmethod
+    def month_complete_week_range(year: int, month: int, week: int) -> tuple | None:
+        return DateTimeUtil.complete_week_range(
+            OrdinalCalendar.month_start(year, month), OrdinalCalendar.month_end(year, month), week)
+
+    @staticmethod
+    def year_complete_week_range(year: int, week: int) -> tuple | None:
+        return DateTimeUtil.complete_week_range(OrdinalCalendar.year_start(year), OrdinalCalendar.year_end(year), week)
+
+    @staticmethod
+    def month_last_week_range(year: int, month: int) -> tuple:
+        end = OrdinalCalendar.month_end(year, month)
+        return OrdinalCalendar.to_range(OrdinalCalendar.monday(end), end)
+
+    @staticmethod
+    def recent_n_month_range(today: date, months: int) -> tuple:
+        start = OrdinalCalendar.add_months(today.year, today.month, today.day, -months)
+        return OrdinalCalendar.to_range(start, today.toordinal())
+
+    @staticmethod
+    def recent_n_day_range(today: date, days: int, include_today: bool = True) -> tuple:
+        ordinal = today.toordinal()
+        return OrdinalCalendar.to_range(ordinal - days, ordinal if include_today else ordinal - 1)
+
+    @staticmethod
+    def recent_n_complete_year_range(today: date, n: int) -> tuple:
+        end_year = today.year if (today.month, today.day) == (12, 31) else today.year - 1
+        return OrdinalCalendar.to_range(OrdinalCalendar.year_start(end_year - n + 1), OrdinalCalendar.year_end(end_year))
+
+    @staticmethod
+    def recent_n_complete_quarter_range(today: date, n: int) -> tuple:
+        # 与 get_recent_n_complete_quarter 保持一致
+        if today.month % 3 == 0 and today.day == 31:
+            end_year, end_month, end_day = today.year, today.month, today.day
+        else:
+            end_year, end_month = divmod(today.year * 12 + (today.month - 1) // 3 * 3 - 1, 12)
+            end_month += 1
+            end_day = OrdinalCalendar.days_in_month(end_year, end_month)
+        start = OrdinalCalendar.add_months(end_year, end_month, end_day, -3 * n) + 2
+        return OrdinalCalendar.to_range(start, OrdinalCalendar.month_start(end_year, end_month) + end_day - 1)
+
+    @staticmethod
+    def recent_n_complete_month_range(today: date, n: int) -> tuple:
+        # 与 get_recent_n_complete_month 保持一致：固定为前两个完整月
+        start_year, start_month = DateTimeUtil.month_of(today, "上上月")
+        end_year, end_month = DateTimeUtil.month_of(today, "上月")
+        return OrdinalCalendar.to_range(OrdinalCalendar.month_start(start_year, start_month),
+                                        OrdinalCalendar.month_end(end_year, end_month))
+
+    @staticmethod
+    def recent_n_complete_week_range(today: date, n: int) -> tuple:
+        ordinal = today.toordinal()
+        weekday = OrdinalCalendar.weekday(ordinal)
+        end = ordinal if weekday == 6 else ordinal - weekday - 1
+        return OrdinalCalendar.to_range(end - 7 * n + 1, end)
+
+    @staticmethod
+    def recent_n_quarter_with_current_range(today: date, n: int) -> tuple:
+        quarter_end_month = (today.month - 1) // 3 * 3 + 3
+        start = OrdinalCalendar.add_months(today.year, quarter_end_month, 1, -(n * 3 - 1))
+        return OrdinalCalendar.to_range(start, OrdinalCalendar.month_end(today.year, quarter_end_month))
+
     @staticmethod
     def main():
-        expressions = [
-            "2024年02月29日",
-            # "2023年02月29日",
-            # "24年02月29日",
-            # "今年2月29日",
-            # "去年02月29日",
-            "今年02月29日",
-            "去年02月28日",
-            "前年02月28日",
-            "明年02月28日",
-            "后年02月28日",
-            # "本月31日",
-            "本月30日",
-            "上月31日",
-            "上上月30日",
-            "下月30日",
-            "上月今天",
-            "上上月今天",
-            "今天",
-            "昨天",
-            "前天",
-            "明天",
-            "后天",
-            "本周第1天",
-            "本月最后一天",
-            "上月最后一天",
-            "今年02月最后一天",
-            "2024年02月",
-            "今年02月",
-            "去年02月",
-            "前年02月",
-            "明年02月",
-            "后年02月",
-            "本月",
-            "上月",
-            "上上月",
-            "下月",
-            "去年本月",
-            "2023年",
-            "今年",
-            "去年",
-            "前年",
-            "明年",
-            "后年",
-            "2024年第1季度",
-            "今年第1季度",
-            "去年第1季度",
-            "前年第1季度",
-            "明年第1季度",
-            "后年第1季度",
-            "本季度",
-            "上季度",
-            "下季度",
-            "去年本季度",
-            "2024年上半年",
-            "2024年下半年",
-            "今年上半年",
-            "今年下半年",
-            "去年上半年",
-            "去年下半年",
-            "上半年",
-            "下半年",
-            "本周星期3",
-            "上周星期3",
-            "上上周星期3",
-            "下周星期3",
-            "下下周星期3",
-            "本周",
-            "上周",
-            "上上周",
-            "下周",
-            "下下周",
-            "2024年第01周",
-            "今年第01周",
-            "今年第53周",
-            "去年第01周",
-            "前年第01周",
-            "本月第2周",
-            "上月第1周",
-            "2024年02月最后一周",
-            "2023年02月最后一周",
-            "本月最后一周",
-            "上月最后一周",
-            "上上月最后一周",
-            "2024年02月第4周",
-            "今年02月第4周",
-            "去年02月第4周",
-            "前年02月第4周",
-            "2024年02月第3个完整周",
-            "今年02月第3个完整周",
-            "去年02月第3个完整周",
-            "前年02月第3个完整周",
-            "2024年第01个完整周",
-            "今年第01个完整周",
-            "去年第01个完整周",
-            "前年第01个完整周",
-            "本月第1个完整周",
-            "上月第1个完整周",
-            "近2年",
-            "近3个月",
-            "近3周",
-            "近3天",
-            "近2个完整年",
-            "近2个完整季度",
-            "近2个完整月",
-            "近2个完整周",
-            "不包含今天的近3天",
-            "包含当前季度的近2个季度"
-        ]
+        expressions = DateTimeUtil.EXAMPLE_EXPRESSIONS
 
         # print(DateTimeUtil.build_date_time_comment(expressions))
 
     @staticmethod
-    def run(date_list):
-        return DateTimeUtil.build_date_time_comment(date_list)
+    def run(date_list, now: date = None, tz=None):
+        # now 为参考日期，tz 为 IANA 时区名（如 "America/Los_Angeles"）或 tzinfo，都不传时用服务器本地的今天
+        return DateTimeUtil.build_date_time_comment(date_list, now, tz)
+
+    @staticmethod
+    def run_ranges(date_list, now: date = None, tz=None) -> list[DateRange]:
+        return DateTimeUtil.build_date_ranges(date_list, reference_day(now, tz))
+
+    @staticmethod
+    def run_fingerprints(date_list, now: date = None, tz=None) -> dict[str, tuple]:
+        # 表达式 -> 区间指纹，见 DateRange.fingerprint
+        return {date_range.expression: date_range.fingerprint for date_range in DateTimeUtil.run_ranges(date_list, now, tz)}
+
+    @staticmethod
+    def run_batch(date_lists: list[list[str]], now: date = None, tz=None) -> list[list[str]]:
+        # 整批共用一个参考日期，每个不同的表达式只解析一次，再按原顺序分发回各请求
+        now = reference_day(now, tz)
+
+        resolved = {}
+        for date_list in date_lists:
+            for expression in date_list:
+                if expression in resolved:
+                    continue
+                try:
+                    comment = DateTimeUtil.resolve_expression(expression, now)
+                except (ValueError, OverflowError) as e:
+                    # 非法日期（如 2023年13月第1周）或超出范围的 N（近99999999999999999999天）只丢弃该表达式，不影响同批其他请求
+                    # 开启指标时异常已由 _resolve_instrumented 按规则记录，这里只在关闭时写日志
+                    if DateTimeUtil._metrics is None:
+                        DateTimeUtil.report_error("BATCH", expression, e)
+                    comment = None
+                resolved[expression] = None if comment is None else f"{expression}={comment}"
+
+        return [[resolved[expression] for expression in date_list if resolved[expression] is not None]
+                for date_list in date_lists]
 
 
 if __name__ == "__main__":
-    # DateTimeUtil.main()
-    # DateTimeUtil.run()
-    pass
+    # 批量解析 JSONL/CSV 文件，参数见 python date_convert.py --help
+    from date_bulk import main
+    main()
@@ -0,0 +1,134 @@
+import re
+from datetime import date
+from typing import Callable, List, Optional
+
+from date_convert import DateTimeUtil, reference_day
+from date_normalize import DateNormalizeUtil
+
+
+class Extraction:
+    # confident 为 False 表示问题里还有没覆盖到的时间线索，应交给模型抽取
+    __slots__ = ("question", "expressions", "confident", "residual")
+
+    def __init__(self, question: str, expressions: List[str], confident: bool, residual: List[str]):
+        self.question = question
+        self.expressions = expressions
+        self.confident = confident
+        self.residual = residual
+
+    def __repr__(self):
+        return f"Extraction({self.expressions!r}, confident={self.confident}, residual={self.residual!r})"
+
+
+class DateExtractUtil:
+    # 不经过模型，直接从问题中找出时间表达式：
+    # 1. 用词典树从每个位置找最长的锚点词（上周、去年、本季度、近 等），或以年份开头的数字
+    # 2. 锚点后面按 TAIL_PATTERN 向后延伸（三、3月5日、第2季度、7天 等）
+    # 3. 候选片段经 DateNormalizeUtil 改写后必须被某条规则完整匹配才采用
+    # 剩余文本里仍有时间线索（3月、星期、月底、近、至今、节假日、2023-05-01 等），表达式后面紧跟着改变含义的内容（上月底、今年前三个月），
+    # 或者有像日期的数字却一个表达式也没抽出来时，confident 为 False
+
+    ANCHOR_WORDS = (DateTimeUtil.DAY_WORDS + DateTimeUtil.WEEK_WORDS + DateTimeUtil.MONTH_WORDS
+                    + DateTimeUtil.QUARTER_WORDS + DateTimeUtil.YEAR_WORDS
+                    + ["上半年", "下半年", "近", "第", "不包含今天的近", "不含今天的近", "不包括今天的近",
+                       "包含当前季度的近", "包括当前季度的近", "包含本季度的近"])
+    NUMBER = r'[0-9零〇一二两三四五六七八九十百]+'
+    WEEKDAY = r'[1-7一二三四五六日天]'
+    TAIL_PATTERN = re.compile(
+        rf'(?:{NUMBER}月份?)?'
+        rf'(?:{NUMBER}[日号]|最后一天|最后一周|第{NUMBER}(?:个完整)?周|第{NUMBER}天|第?{NUMBER}季度|[Qq][1-4]|[Hh][12]'
+        rf'|[上下]半年|{NUMBER}个?(?:完整)?(?:年|季度|月|周|星期|礼拜|天|日)'
+        rf'|(?:星期|礼拜|周){WEEKDAY}|(?<=星期|礼拜){WEEKDAY}|[1-7一二三四五六日](?![共起直样般些次个点下]))?')
+    YEAR_START_PATTERN = re.compile(r'(?:\d{4}|\d{2}|[〇零一二三四五六七八九]{4})年')
+    YEAR_START_CHARS = frozenset("0123456789〇零一二三四五六七八九")
+    HOLIDAYS = r'国庆|春节|元旦|清明|劳动节|五一|端午|中秋|元宵|除夕|七夕|圣诞|双十一|双11|双十二|双12|618|节假日|假期|节前|节后|寒假|暑假'
+    RESIDUAL_PATTERN = re.compile(rf'{NUMBER}\s*(?:年|月|日|号|周|天|季度)|星期|礼拜|周末|周[1-7一二三四五六日天]|季度'
+                                  rf'|[年月季][初底末中]|[上中下]旬|前{NUMBER}个?(?:天|日|周|星期|月|季度|年)'
+                                  r'|\d{4}\s*[-/.]\s*\d{1,2}(?:\s*[-/.]\s*\d{1,2})?|(?<!\d)(?:19|20)\d{6}(?!\d)'
+                                  rf'|{HOLIDAYS}|今|昨|明天|前天|后天|近|以来|至|到|截止|同比|环比')
+    # 紧跟在表达式后面、会改变其含义的内容，例如 上月底、本周末、今年前三个月、去年以来
+    FOLLOW_PATTERN = re.compile(rf'的?(?:前|后|头|最后){NUMBER}个?(?:天|日|周|星期|月|季度|年)|[初底末旬]'
+                                r'|以来|至今|之前|之后|以前|以后|前后|期间')
+    # 像日期的数字（年份、2023-05-01、20240501），没有抽取出任何表达式时说明规则没有看懂
+    DATE_DIGITS_PATTERN = re.compile(r'(?<!\d)(?:19|20)\d{2}(?:\d{4})?(?!\d)|\d{1,4}\s*[-/.]\s*\d{1,2}')
+
+    _trie = None
+
+    @staticmethod
+    def build_trie() -> dict:
+        # 字符级词典树，结点上 None 键表示到此为一个完整的词
+        trie = {}
+        for word in DateExtractUtil.ANCHOR_WORDS + list(DateNormalizeUtil.SYNONYMS):
+            node = trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node[None] = True
+        return trie
+
+    @staticmethod
+    def longest_word(text: str, start: int) -> int:
+        # 返回从 start 开始最长锚点词的结束位置，没有时返回 -1
+        node = DateExtractUtil._trie
+        if node is None:
+            node = DateExtractUtil._trie = DateExtractUtil.build_trie()
+        end = -1
+        for i in range(start, len(text)):
+            node = node.get(text[i])
+            if node is None:
+                break
+            if None in node:
+                end = i + 1
+        return end
+
+    @staticmethod
+    def extract(question: str) -> Extraction:
+        text = question.translate(DateNormalizeUtil.FULL_WIDTH)
+        expressions, spans = [], []
+        uncertain = False
+        i = 0
+        while i < len(text):
+            word_end = DateExtractUtil.longest_word(text, i)
+            if word_end < 0 and text[i] in DateExtractUtil.YEAR_START_CHARS and (i == 0 or not text[i - 1].isdigit()):
+                m = DateExtractUtil.YEAR_START_PATTERN.match(text, i)
+                word_end = m.end() if m else -1
+            if word_end < 0:
+                i += 1
+                continue
+
+            tail_end = DateExtractUtil.TAIL_PATTERN.match(text, word_end).end()
+            for end in dict.fromkeys((tail_end, word_end)):
+                expression = DateNormalizeUtil.normalize(text[i:end])
+                if DateTimeUtil.is_canonical(expression):
+                    if expression not in expressions:
+                        expressions.append(expression)
+                    spans.append((i, end))
+                    i = end
+                    break
+            else:
+                # 锚点词后面还有时间相关的内容，但拼不成合法表达式，交给模型
+                uncertain = uncertain or tail_end > word_end
+                i += 1
+
+        residual_text, last = [], 0
+        for start, end in spans:
+            residual_text.append(text[last:start])
+            last = end
+        residual_text.append(text[last:])
+        residual = DateExtractUtil.RESIDUAL_PATTERN.findall(" ".join(residual_text))
+        for start, end in spans:
+            follow = DateExtractUtil.FOLLOW_PATTERN.match(text, end)
+            if follow:
+                residual.append(text[start:follow.end()])
+        if not expressions and DateExtractUtil.DATE_DIGITS_PATTERN.search(text):
+            uncertain = True
+        return Extraction(question, expressions, not uncertain and not residual, residual)
+
+    @staticmethod
+    def run(question: str, fallback: Optional[Callable[[str], List[str]]] = None, now: date = None,
+            tz=None) -> List[str]:
+        # 规则抽取有把握时直接解析；否则调用 fallback（通常是模型抽取，返回表达式列表），没有 fallback 时用规则结果
+        now = reference_day(now, tz)
+        extraction = DateExtractUtil.extract(question)
+        if extraction.confident or fallback is None:
+            return DateTimeUtil.build_date_expressions(extraction.expressions, now)
+        return DateNormalizeUtil.build_date_expressions(fallback(question), now)
@@ -0,0 +1,97 @@
+import logging
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ResolverMetrics:
+    # 规则命中次数、耗时直方图、未命中和异常计数；未命中和异常事件交给 callback，没有 callback 时写日志
+    # callback 签名为 callback(event, expression, error)，event 为 "unmatched" 或 "error"
+    LATENCY_BUCKETS_US = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+
+    def __init__(self, callback: Optional[Callable] = None):
+        self.callback = callback
+        self.total = 0
+        self.unmatched = 0
+        self.rules = {}
+        self._lock = threading.Lock()
+
+    def _rule(self, rule: str) -> dict:
+        stats = self.rules.get(rule)
+        if stats is None:
+            stats = {"count": 0, "errors": 0, "latency_sum_us": 0.0,
+                     "buckets": [0] * (len(ResolverMetrics.LATENCY_BUCKETS_US) + 1)}
+            self.rules[rule] = stats
+        return stats
+
+    def record(self, rule: str, elapsed_us: float):
+        with self._lock:
+            self.total += 1
+            stats = self._rule(rule)
+            stats["count"] += 1
+            stats["latency_sum_us"] += elapsed_us
+            for i, bucket in enumerate(ResolverMetrics.LATENCY_BUCKETS_US):
+                if elapsed_us <= bucket:
+                    stats["buckets"][i] += 1
+                    break
+            else:
+                stats["buckets"][-1] += 1
+
+    def record_unmatched(self, expression: str):
+        with self._lock:
+            self.total += 1
+            self.unmatched += 1
+        if self.callback is not None:
+            self.callback("unmatched", expression, None)
+        else:
+            logger.debug("未匹配的时间表达式: %s", expression)
+
+    def record_error(self, rule: str, expression: str, error: Exception):
+        with self._lock:
+            self.total += 1
+            self._rule(rule)["errors"] += 1
+        if self.callback is not None:
+            self.callback("error", expression, error)
+        else:
+            logger.warning("时间表达式解析异常: %s (%s), %s", expression, rule, error)
+
+    def reset(self):
+        with self._lock:
+            self.total = 0
+            self.unmatched = 0
+            self.rules = {}
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            rules = {}
+            for rule, stats in self.rules.items():
+                cumulative, buckets = 0, {}
+                for bucket, count in zip(ResolverMetrics.LATENCY_BUCKETS_US + ("+Inf",), stats["buckets"]):
+                    cumulative += count
+                    buckets[str(bucket)] = cumulative
+                rules[rule] = {"count": stats["count"], "errors": stats["errors"],
+                               "latency_sum_us": stats["latency_sum_us"], "latency_buckets_us": buckets}
+            return {"total": self.total, "unmatched": self.unmatched,
+                    "errors": sum(stats["errors"] for stats in self.rules.values()), "rules": rules}
+
+    def prometheus(self, prefix: str = "date_resolver") -> str:
+        snapshot = self.snapshot()
+        lines = [f"# TYPE {prefix}_expressions_total counter",
+                 f"{prefix}_expressions_total {snapshot['total']}",
+                 f"# TYPE {prefix}_unmatched_total counter",
+                 f"{prefix}_unmatched_total {snapshot['unmatched']}",
+                 f"# TYPE {prefix}_rule_hits_total counter"]
+        lines += [f'{prefix}_rule_hits_total{{rule="{rule}"}} {stats["count"]}'
+                  for rule, stats in snapshot["rules"].items()]
+        lines.append(f"# TYPE {prefix}_rule_errors_total counter")
+        lines += [f'{prefix}_rule_errors_total{{rule="{rule}"}} {stats["errors"]}'
+                  for rule, stats in snapshot["rules"].items()]
+        lines.append(f"# TYPE {prefix}_rule_latency_seconds histogram")
+        for rule, stats in snapshot["rules"].items():
+            for bucket, count in stats["latency_buckets_us"].items():
+                le = bucket if bucket == "+Inf" else repr(int(bucket) / 1e6)
+                lines.append(f'{prefix}_rule_latency_seconds_bucket{{rule="{rule}",le="{le}"}} {count}')
+            lines.append(f'{prefix}_rule_latency_seconds_sum{{rule="{rule}"}} {stats["latency_sum_us"] / 1e6!r}')
+            lines.append(f'{prefix}_rule_latency_seconds_count{{rule="{rule}"}} {stats["count"]}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,131 @@
+import re
+from datetime import date
+from typing import Dict, List
+
+from date_convert import DateTimeUtil, reference_day
+
+
+class DateNormalizeUtil:
+    # 把模型输出的近似写法改写成规则能识别的标准写法，避免因格式问题再调用一次模型，例如
+    # 24年2月29日 -> 2024年02月29日，上个月 -> 上月，近三天 -> 近3天，Q2 -> 第2季度，上周一 -> 上周星期1
+    # 标准写法本身改写后不变
+
+    # 同义词，按最长优先替换；标准写法也放进来（映射到自身），避免被更短的同义词拆开，例如 本季度 不会被当成 本季
+    SYNONYMS = {
+        "今日": "今天", "昨日": "昨天", "前日": "前天", "明日": "明天", "后日": "后天",
+        "当天": "今天", "今儿": "今天", "昨儿": "昨天",
+        "上个月": "上月", "上一个月": "上月", "上一月": "上月", "上上个月": "上上月",
+        "下个月": "下月", "下一个月": "下月", "下一月": "下月",
+        "这个月": "本月", "这月": "本月", "当月": "本月", "本月份": "本月",
+        "上个月今天": "上月今天", "上上个月今天": "上上月今天",
+        "本年度": "今年", "今年度": "今年", "本年": "今年", "当年": "今年", "这一年": "今年",
+        "上一年": "去年", "上年度": "去年", "去年度": "去年", "上年": "去年",
+        "下一年": "明年", "明年度": "明年", "来年": "明年", "下年": "明年",
+        "前一年": "前年",
+        "本季": "本季度", "这个季度": "本季度", "这季度": "本季度", "当季度": "本季度", "当季": "本季度",
+        "上季": "上季度", "上个季度": "上季度", "上一季度": "上季度", "上一个季度": "上季度",
+        "下季": "下季度", "下个季度": "下季度", "下一季度": "下季度", "下一个季度": "下季度",
+        "本周": "本周", "这周": "本周", "这个星期": "本周", "这星期": "本周", "本星期": "本周",
+        "这个礼拜": "本周", "本礼拜": "本周",
+        "上周": "上周", "上个星期": "上周", "上星期": "上周", "上一周": "上周", "上个礼拜": "上周", "上礼拜": "上周",
+        "上上周": "上上周", "上上个星期": "上上周", "上上星期": "上上周",
+        "下周": "下周", "下个星期": "下周", "下星期": "下周", "下一周": "下周", "下个礼拜": "下周", "下礼拜": "下周",
+        "下下周": "下下周", "下下个星期": "下下周", "下下星期": "下下周",
+        "本季度": "本季度", "上季度": "上季度", "下季度": "下季度",
+        "最近": "近", "过去": "近",
+        "不含今天的": "不包含今天的", "不包括今天的": "不包含今天的",
+        "个完整星期": "个完整周", "个完整自然周": "个完整周", "个完整自然月": "个完整月",
+        "包含本季度的": "包含当前季度的", "包括当前季度的": "包含当前季度的",
+    }
+
+    DIGITS = {"零": 0, "〇": 0, "一": 1, "二": 2, "两": 2, "三": 3, "四": 4, "五": 5,
+              "六": 6, "七": 7, "八": 8, "九": 9}
+    WEEKDAYS = {"一": "1", "二": "2", "三": "3", "四": "4", "五": "5", "六": "6", "日": "7", "天": "7"}
+    FULL_WIDTH = str.maketrans("０１２３４５６７８９ＱｑＳｓ", "0123456789QqSs", " \t　")
+
+    SYNONYM_PATTERN = re.compile("|".join(re.escape(word) for word in sorted(SYNONYMS, key=len, reverse=True)))
+    # 第/近/年 之后或开头的中文数字，以及 二〇二四年 这样逐位写的年份
+    CHINESE_NUMBER_PATTERN = re.compile(r'(?:(?<=[第近年])|^)([零〇一二两三四五六七八九十百]+)(?=个|天|日|周|星期|礼拜|年|月|季度)')
+    CHINESE_YEAR_PATTERN = re.compile(r'^([零〇一二三四五六七八九]{4})年')
+    WEEKDAY_PATTERN = re.compile(r'(本周|上上周|上周|下下周|下周)(?:星期|周|礼拜)?([1-7一二三四五六日天])$')
+    # 按顺序执行的正则改写
+    NORMALIZE_RULES = [
+        (re.compile(r'^(\d{2})年'), r'20\1年'),
+        (re.compile(r'(?<=年)(\d)(?=月)'), r'0\1'),
+        (re.compile(r'(?<=月)(\d)(?=[日号])'), r'0\1'),
+        (re.compile(r'(?<=月\d{2})号'), r'日'),
+        (re.compile(r'(?<=年第)(\d)(?=周|个完整周)'), r'0\1'),
+        (re.compile(r'(?<=年)第?(\d)季度'), r'第\1季度'),
+        (re.compile(r'(?<=年)[Qq]([1-4])$'), r'第\1季度'),
+        (re.compile(r'^第?(\d)季度$'), r'今年第\1季度'),
+        (re.compile(r'^[Qq]([1-4])$'), r'今年第\1季度'),
+        (re.compile(r'(?<=年)[Hh]1$'), r'上半年'),
+        (re.compile(r'(?<=年)[Hh]2$'), r'下半年'),
+        (re.compile(r'^近(\d+)(?:个)?(?:星期|礼拜)$'), r'近\1周'),
+        (re.compile(r'^近(\d+)个周$'), r'近\1周'),
+        (re.compile(r'^近(\d+)日$'), r'近\1天'),
+        (re.compile(r'^近(\d+)月$'), r'近\1个月'),
+        (re.compile(r'^近(\d+)个年$'), r'近\1年'),
+        (re.compile(r'^近半年$'), r'近6个月'),
+    ]
+
+    CACHE_SIZE = 4096
+    _cache: Dict[str, str] = {}
+
+    @staticmethod
+    def chinese_to_int(text: str) -> int:
+        # 支持 三、十二、二十、一百零五 这类写法
+        total, current = 0, 0
+        for char in text:
+            if char == "百":
+                total += (current or 1) * 100
+                current = 0
+            elif char == "十":
+                total += (current or 1) * 10
+                current = 0
+            else:
+                current = DateNormalizeUtil.DIGITS[char]
+        return total + current
+
+    @staticmethod
+    def _normalize(expression: str) -> str:
+        text = expression.translate(DateNormalizeUtil.FULL_WIDTH)
+        text = DateNormalizeUtil.SYNONYM_PATTERN.sub(lambda m: DateNormalizeUtil.SYNONYMS[m.group(0)], text)
+        text = DateNormalizeUtil.CHINESE_YEAR_PATTERN.sub(
+            lambda m: "".join(str(DateNormalizeUtil.DIGITS[char]) for char in m.group(1)) + "年", text)
+        text = DateNormalizeUtil.CHINESE_NUMBER_PATTERN.sub(
+            lambda m: str(DateNormalizeUtil.chinese_to_int(m.group(1))), text)
+        text = DateNormalizeUtil.WEEKDAY_PATTERN.sub(
+            lambda m: f"{m.group(1)}星期{DateNormalizeUtil.WEEKDAYS.get(m.group(2), m.group(2))}", text)
+        for pattern, replacement in DateNormalizeUtil.NORMALIZE_RULES:
+            text = pattern.sub(replacement, text)
+        return text
+
+    @staticmethod
+    def normalize(expression: str) -> str:
+        cache = DateNormalizeUtil._cache
+        text = cache.get(expression)
+        if text is None:
+            text = DateNormalizeUtil._normalize(expression)
+            if len(cache) >= DateNormalizeUtil.CACHE_SIZE:
+                cache.clear()
+            cache[expression] = text
+        return text
+
+    @staticmethod
+    def normalize_list(expressions: List[str]) -> List[str]:
+        return [DateNormalizeUtil.normalize(expression) for expression in expressions]
+
+    @staticmethod
+    def build_date_expressions(expressions: List[str], now: date) -> List[str]:
+        # 用改写后的表达式解析，输出里保留模型的原始写法，方便和问题中的字面对应
+        date_time_comment_list = []
+        for expression in expressions:
+            comment = DateTimeUtil.resolve_expression(DateNormalizeUtil.normalize(expression), now)
+            if comment is not None:
+                date_time_comment_list.append(f"{expression}={comment}")
+        return date_time_comment_list
+
+    @staticmethod
+    def run(date_list, now: date = None, tz=None) -> List[str]:
+        return DateNormalizeUtil.build_date_expressions(date_list, reference_day(now, tz))
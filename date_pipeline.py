@@ -0,0 +1,162 @@
+import sys
+import json
+import time
+import argparse
+from datetime import datetime, date
+from typing import List
+
+from date_cache import ExtractionCache
+from date_convert import DateTimeUtil
+from date_extract import DateExtractUtil
+from date_normalize import DateNormalizeUtil
+from date_stream import StreamingListParser
+
+SYSTEM_PROMPT = "You are a helpful assistant."
+PROMPT_TEMPLATE = "给你一个用户的问题，请你提取出该用户所提问的时间，结果以list格式输出。\n\n【用户问题】\n{question}\n\n【回答】\n"
+
+
+class TransformersBackend:
+    # 批量调用 DateResolver-Qwen2-7B-Instruct；chat 模板只渲染一次，之后每个问题只做字符串拼接
+    def __init__(self, model_name: str = "XGenerationLab/DateResolver-Qwen2-7B-Instruct", device: str = "cuda",
+                 max_new_tokens: int = 64):
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
+        self.device = device
+        self.max_new_tokens = max_new_tokens
+        self.model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype="auto", device_map="auto")
+        # decoder-only 模型批量生成需要左侧 padding
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name, padding_side="left")
+        sentinel = "\x00QUESTION\x00"
+        text = self.tokenizer.apply_chat_template(
+            [{"role": "system", "content": SYSTEM_PROMPT},
+             {"role": "user", "content": PROMPT_TEMPLATE.format(question=sentinel)}],
+            tokenize=False, add_generation_prompt=True)
+        self.prefix, self.suffix = text.split(sentinel)
+
+    def generate(self, questions: List[str]) -> List[str]:
+        texts = [f"{self.prefix}{question}{self.suffix}" for question in questions]
+        inputs = self.tokenizer(texts, return_tensors="pt", padding=True).to(self.device)
+        generated_ids = self.model.generate(**inputs, max_new_tokens=self.max_new_tokens, do_sample=False)
+        return self.tokenizer.batch_decode(generated_ids[:, inputs.input_ids.shape[1]:], skip_special_tokens=True)
+
+
+class RuleBackend:
+    # 确定性的本地替身：用规则抽取生成与模型相同格式的输出，便于在只有 CPU 的机器上测试和压测批处理逻辑
+    # latency_ms / per_char_us 模拟一次前向的固定开销和按最长输入 padding 后的开销
+    def __init__(self, latency_ms: float = 0.0, per_char_us: float = 0.0):
+        self.latency_ms = latency_ms
+        self.per_char_us = per_char_us
+        self.calls = 0
+        self.padded_chars = 0
+
+    def generate(self, questions: List[str]) -> List[str]:
+        self.calls += 1
+        padded = max(len(question) for question in questions) * len(questions)
+        self.padded_chars += padded
+        if self.latency_ms or self.per_char_us:
+            time.sleep(self.latency_ms / 1000 + padded * self.per_char_us / 1e6)
+        return [json.dumps(DateExtractUtil.extract(question).expressions, ensure_ascii=False)
+                for question in questions]
+
+
+class ExtractionPipeline:
+    # 问题 -> 时间表达式 -> 解析结果，按批调用生成后端
+    # 按长度排序后分批以减少 padding；每批最多 batch_size 个问题、max_batch_chars 个字符（padding 后）
+    # use_rules 为 True 时规则抽取有把握的问题不进入模型；cache 为 date_cache.ExtractionCache 时命中的问题也不进入模型
+    def __init__(self, backend, batch_size: int = 16, max_batch_chars: int = 4096, use_rules: bool = False,
+                 normalize: bool = True, cache=None):
+        self.backend = backend
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_batch_chars = max_batch_chars
+        self.use_rules = use_rules
+        self.normalize = normalize
+        self.batches = 0
+        self.generated = 0
+        self.skipped = 0
+
+    def make_batches(self, questions: List[str], indexes: List[int]) -> List[List[int]]:
+        batches, batch, longest = [], [], 0
+        for index in sorted(indexes, key=lambda i: len(questions[i])):
+            length = len(questions[index])
+            if batch and (len(batch) >= self.batch_size or max(longest, length) * (len(batch) + 1) > self.max_batch_chars):
+                batches.append(batch)
+                batch, longest = [], 0
+            batch.append(index)
+            longest = max(longest, length)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    @staticmethod
+    def parse_output(text: str) -> List[str]:
+        return StreamingListParser().feed(text)
+
+    def extract(self, questions: List[str]) -> List[List[str]]:
+        expressions = [None] * len(questions)
+        pending = []
+        for index, question in enumerate(questions):
+            if self.use_rules:
+                extraction = DateExtractUtil.extract(question)
+                if extraction.confident:
+                    expressions[index] = extraction.expressions
+                    self.skipped += 1
+                    continue
+            pending.append(index)
+
+        if self.cache is not None and pending:
+            cached = self.cache.get_many([questions[i] for i in pending])
+            for index, items in zip(pending, cached):
+                expressions[index] = items
+            pending = [index for index, items in zip(pending, cached) if items is None]
+
+        for batch in self.make_batches(questions, pending):
+            outputs = self.backend.generate([questions[i] for i in batch])
+            self.batches += 1
+            self.generated += len(batch)
+            for index, output in zip(batch, outputs):
+                expressions[index] = ExtractionPipeline.parse_output(output)
+            if self.cache is not None:
+                self.cache.put_many([questions[i] for i in batch], [expressions[i] for i in batch])
+        return expressions
+
+    def run(self, questions: List[str], now: date = None, tz=None) -> List[List[str]]:
+        expressions = self.extract(questions)
+        if self.normalize:
+            expressions = [DateNormalizeUtil.normalize_list(items) for items in expressions]
+        return DateTimeUtil.run_batch(expressions, now, tz)
+
+    def stats(self) -> dict:
+        stats = {"batches": self.batches, "generated": self.generated, "skipped": self.skipped,
+                 "avg_batch_size": self.generated / self.batches if self.batches else 0.0}
+        if self.cache is not None:
+            stats["cache"] = self.cache.info()
+        return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="批量抽取并解析问题中的时间表达式")
+    parser.add_argument("input", help="每行一个问题的文本文件，- 表示标准输入")
+    parser.add_argument("--backend", choices=["rule", "transformers"], default="rule",
+                        help="rule 为本地确定性替身，transformers 为 DateResolver 模型")
+    parser.add_argument("--model", default="XGenerationLab/DateResolver-Qwen2-7B-Instruct")
+    parser.add_argument("--device", default="cuda")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--max-batch-chars", type=int, default=4096)
+    parser.add_argument("--use-rules", action="store_true", help="规则抽取有把握的问题不调用模型")
+    parser.add_argument("--cache", default=None, help="抽取结果缓存的 SQLite 文件路径")
+    parser.add_argument("--cache-size", type=int, default=100000, help="缓存的最大条数")
+    parser.add_argument("--now", default=None, help="参考日期，格式 YYYY-MM-DD")
+    parser.add_argument("--tz", default=None, help="IANA 时区名，不传 --now 时决定今天是哪一天")
+    args = parser.parse_args()
+
+    input_stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    with input_stream:
+        questions = [line.strip() for line in input_stream if line.strip()]
+    backend = TransformersBackend(args.model, args.device) if args.backend == "transformers" else RuleBackend()
+    cache = ExtractionCache(args.cache, args.cache_size) if args.cache else None
+    pipeline = ExtractionPipeline(backend, args.batch_size, args.max_batch_chars, args.use_rules, cache=cache)
+    now = datetime.strptime(args.now, "%Y-%m-%d") if args.now else None
+    for question, result in zip(questions, pipeline.run(questions, now, args.tz)):
+        print(json.dumps({"question": question, "result": result}, ensure_ascii=False))
+    sys.stderr.write(json.dumps(pipeline.stats(), ensure_ascii=False) + "\n")
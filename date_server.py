@@ -0,0 +1,221 @@
+import json
+import asyncio
+import argparse
+from datetime import date
+from typing import List
+
+from date_convert import DateTimeUtil, reference_day
+
+
+class MicroBatcher:
+    # 把并发到达的请求在一个时间窗口内（或攒满 max_batch 个）合并成一批，交给 run_batch 一次解析
+    BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+    def __init__(self, window_ms: float = 1.0, max_batch: int = 256):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.requests = 0
+        self.batches = 0
+        self.max_queue_depth = 0
+        self.max_batch_size = 0
+        self.batch_size_histogram = {bucket: 0 for bucket in MicroBatcher.BATCH_SIZE_BUCKETS}
+        self._queue = None
+        self._worker = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def resolve(self, expressions: List[str], now: date = None, tz=None) -> List[str]:
+        # 参考日期在入队时确定，同一批中不同当地日期的请求分组解析
+        day = reference_day(now, tz)
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((expressions, day, future))
+        self.requests += 1
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return await future
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.window
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            self._record(len(batch))
+            groups = {}
+            for expressions, day, future in batch:
+                groups.setdefault(day, []).append((expressions, future))
+            for day, items in groups.items():
+                try:
+                    results = DateTimeUtil.run_batch([expressions for expressions, future in items], day)
+                except Exception:
+                    # 整组失败时逐个请求重新解析，异常只影响出错的请求
+                    self._resolve_each(items, day)
+                    continue
+                for (expressions, future), result in zip(items, results):
+                    if not future.done():
+                        future.set_result(result)
+
+    @staticmethod
+    def _resolve_each(items: list, day: date):
+        for expressions, future in items:
+            if future.done():
+                continue
+            try:
+                future.set_result(DateTimeUtil.run_batch([expressions], day)[0])
+            except Exception as e:
+                future.set_exception(e)
+
+    def _record(self, size: int):
+        self.batches += 1
+        self.max_batch_size = max(self.max_batch_size, size)
+        for bucket in MicroBatcher.BATCH_SIZE_BUCKETS:
+            if size <= bucket:
+                self.batch_size_histogram[bucket] += 1
+                break
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "batch_size_histogram": {f"le_{bucket}": count for bucket, count in self.batch_size_histogram.items()},
+        }
+
+
+class DateResolverServer:
+    # 基于 asyncio 的极简 HTTP/1.1 服务，只依赖标准库：
+    #   POST /resolve  {"expressions": ["上周", ...], "now": "2024-12-06", "tz": "Asia/Tokyo"}  ->  {"result": ["上周=...", ...]}
+    #                  now 和 tz 可选，都不传时使用服务器本地的今天
+    #   GET  /stats    ->  批处理统计
+    # 请求体超过 max_body 字节时返回 413；单个请求解析出错只返回该请求的 400/500，连接上的其他请求不受影响
+    MAX_BODY = 1 << 20
+
+    def __init__(self, batcher: MicroBatcher, max_body: int = MAX_BODY):
+        self.batcher = batcher
+        self.max_body = max_body
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                keep_alive = False
+                try:
+                    method, path, version = request_line.decode("latin-1").split(" ", 2)
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                    length = int(headers.get("content-length", 0))
+                    if length < 0:
+                        raise ValueError(f"Content-Length 不合法: {length}")
+                    if length > self.max_body:
+                        # 不读取请求体，回复后关闭连接
+                        status, payload = "413 Payload Too Large", {"error": f"请求体超过 {self.max_body} 字节"}
+                    else:
+                        body = await reader.readexactly(length)
+                        keep_alive = headers.get("connection", "").lower() != "close" and version.strip() == "HTTP/1.1"
+                        status, payload = await self.route(method, path, body)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except ValueError as e:
+                    status, payload = "400 Bad Request", {"error": f"请求格式错误: {e}"}
+                except Exception as e:
+                    status, payload = "500 Internal Server Error", {"error": f"{type(e).__name__}: {e}"}
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def respond(writer: asyncio.StreamWriter, status: str, payload: dict, keep_alive: bool):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+            .encode("latin-1") + data)
+        await writer.drain()
+
+    async def route(self, method: str, path: str, body: bytes) -> tuple:
+        if method == "GET" and path == "/stats":
+            return "200 OK", self.batcher.stats()
+        if method == "POST" and path == "/resolve":
+            try:
+                request = json.loads(body or b"{}")
+                expressions = request["expressions"]
+            except (ValueError, KeyError, TypeError):
+                return "400 Bad Request", {"error": "请求体需要是 {\"expressions\": [...]}"}
+            if not isinstance(expressions, list):
+                return "400 Bad Request", {"error": "expressions 需要是列表"}
+            try:
+                now = date.fromisoformat(request["now"]) if request.get("now") else None
+                day = reference_day(now, request.get("tz") or None)
+            except (ValueError, KeyError, TypeError) as e:
+                # 日期格式错误或未知的时区名（ZoneInfoNotFoundError 是 KeyError 的子类）
+                return "400 Bad Request", {"error": f"now 或 tz 不合法: {e}"}
+            try:
+                result = await self.batcher.resolve([str(e) for e in expressions], day)
+            except (ValueError, OverflowError) as e:
+                return "400 Bad Request", {"error": f"表达式无法解析: {e}"}
+            except Exception as e:
+                return "500 Internal Server Error", {"error": f"{type(e).__name__}: {e}"}
+            return "200 OK", {"result": result}
+        return "404 Not Found", {"error": f"未知路径: {method} {path}"}
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765, unix_path: str = None):
+        self.batcher.start()
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle, path=unix_path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="时间表达式解析服务（asyncio 微批处理）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="监听本地 unix socket 路径，设置后忽略 host/port")
+    parser.add_argument("--window-ms", type=float, default=1.0, help="攒批的时间窗口（毫秒）")
+    parser.add_argument("--max-batch", type=int, default=256, help="每批最多合并的请求数")
+    parser.add_argument("--max-body", type=int, default=DateResolverServer.MAX_BODY, help="请求体的最大字节数")
+    args = parser.parse_args()
+    server = DateResolverServer(MicroBatcher(args.window_ms, args.max_batch), args.max_body)
+    asyncio.run(server.serve(args.host, args.port, args.unix))
@@ -0,0 +1,166 @@
+import re
+from datetime import datetime, timedelta, date, time, tzinfo
+from typing import Dict, List, Tuple, Union
+
+from date_convert import DateTimeUtil, DateRange, get_zone
+
+
+class DateSqlUtil:
+    # 把解析出的日期区间转成左闭右开、不对列做函数包装的 SQL 条件，
+    # 例如 col >= '2024-11-25' AND col < '2024-12-02'，可直接走索引和分区裁剪
+    DIALECTS = ("mysql", "postgresql", "sqlite", "hive", "odps", "epoch", "epoch_ms")
+    PLACEHOLDER_PATTERN = re.compile(r'\{\{\s*([^{}]+?)\s*\}\}')
+    # 按天、月、小时分区的表的默认分区值格式
+    PARTITION_FORMATS = {"day": "%Y%m%d", "month": "%Y%m", "hour": "%Y%m%d%H"}
+
+    @staticmethod
+    def literal(day: date, dialect: str, partition_format: str = "%Y%m%d", tz: Union[str, tzinfo] = None) -> str:
+        if dialect in ("mysql", "sqlite"):
+            return f"'{day.isoformat()}'"
+        if dialect == "postgresql":
+            return f"DATE '{day.isoformat()}'"
+        if dialect in ("hive", "odps"):
+            # 分区字段 ds 是定长字符串，字典序与日期序一致
+            return f"'{day.strftime(partition_format)}'"
+        if dialect in ("epoch", "epoch_ms"):
+            # tz 为 IANA 时区名或 tzinfo，为空时按本地时区的零点计算
+            seconds = int(datetime(day.year, day.month, day.day, tzinfo=get_zone(tz)).timestamp())
+            return str(seconds * 1000 if dialect == "epoch_ms" else seconds)
+        raise ValueError(f"不支持的 SQL 方言: {dialect}，可选 {', '.join(DateSqlUtil.DIALECTS)}")
+
+    @staticmethod
+    def predicate(date_range: DateRange, column: str, dialect: str = "mysql",
+                  partition_format: str = "%Y%m%d", tz: Union[str, tzinfo] = None) -> str:
+        return DateSqlUtil.interval_predicate(date_range.start, date_range.end, column, dialect, partition_format, tz)
+
+    @staticmethod
+    def interval_predicate(start: date, end: date, column: str, dialect: str = "mysql",
+                           partition_format: str = "%Y%m%d", tz: Union[str, tzinfo] = None) -> str:
+        start = DateSqlUtil.literal(start, dialect, partition_format, tz)
+        end = DateSqlUtil.literal(end + timedelta(days=1), dialect, partition_format, tz)
+        return f"{column} >= {start} AND {column} < {end}"
+
+    @staticmethod
+    def coalesce(date_ranges: List[Union[DateRange, Tuple[date, date]]]) -> List[Tuple[date, date]]:
+        # 合并重叠或首尾相接的区间，例如 本周、上周、近7天 合并成一段，按起始日期排序
+        intervals = sorted((r.start, r.end) if isinstance(r, DateRange) else tuple(r) for r in date_ranges)
+        merged = []
+        for start, end in intervals:
+            if merged and start.toordinal() <= merged[-1][1].toordinal() + 1:
+                if end > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], end)
+            else:
+                merged.append((start, end))
+        return merged
+
+    @staticmethod
+    def _period_runs(intervals: List[Tuple[date, date]], granularity: str) -> List[Tuple[int, int]]:
+        # 把日期区间换成分区序号（天为 ordinal，月为 年*12+月-1，小时为 ordinal*24+时），合并相接的序号段
+        if granularity == "day":
+            periods = [(start.toordinal(), end.toordinal()) for start, end in intervals]
+        elif granularity == "month":
+            periods = [(start.year * 12 + start.month - 1, end.year * 12 + end.month - 1) for start, end in intervals]
+        elif granularity == "hour":
+            periods = [(start.toordinal() * 24, end.toordinal() * 24 + 23) for start, end in intervals]
+        else:
+            raise ValueError(f"不支持的分区粒度: {granularity}，可选 {', '.join(DateSqlUtil.PARTITION_FORMATS)}")
+        runs = []
+        for first, last in sorted(periods):
+            if runs and first <= runs[-1][1] + 1:
+                runs[-1] = (runs[-1][0], max(runs[-1][1], last))
+            else:
+                runs.append((first, last))
+        return runs
+
+    @staticmethod
+    def _partition_key(period: int, granularity: str, partition_format: str) -> str:
+        if granularity == "day":
+            return date.fromordinal(period).strftime(partition_format)
+        if granularity == "month":
+            return date(period // 12, period % 12 + 1, 1).strftime(partition_format)
+        return datetime.combine(date.fromordinal(period // 24), time(period % 24)).strftime(partition_format)
+
+    @staticmethod
+    def partition_runs(date_ranges: List[Union[DateRange, Tuple[date, date]]], granularity: str = "day",
+                       partition_format: str = None) -> List[Tuple[str, str]]:
+        # 需要扫描的分区，压缩成连续段 (第一个分区, 最后一个分区)；按月分区时部分覆盖的月份也要扫描
+        partition_format = partition_format or DateSqlUtil.PARTITION_FORMATS.get(granularity)
+        return [(DateSqlUtil._partition_key(first, granularity, partition_format),
+                 DateSqlUtil._partition_key(last, granularity, partition_format))
+                for first, last in DateSqlUtil._period_runs(DateSqlUtil.coalesce(date_ranges), granularity)]
+
+    @staticmethod
+    def partition_keys(date_ranges: List[Union[DateRange, Tuple[date, date]]], granularity: str = "day",
+                       partition_format: str = None) -> List[str]:
+        # 展开后的完整分区列表，每个分区只出现一次
+        partition_format = partition_format or DateSqlUtil.PARTITION_FORMATS.get(granularity)
+        return [DateSqlUtil._partition_key(period, granularity, partition_format)
+                for first, last in DateSqlUtil._period_runs(DateSqlUtil.coalesce(date_ranges), granularity)
+                for period in range(first, last + 1)]
+
+    @staticmethod
+    def partition_predicate(date_ranges: List[Union[DateRange, Tuple[date, date]]], column: str,
+                            granularity: str = "day", partition_format: str = None) -> str:
+        # 每段连续分区一个左闭右开条件，只有一个分区时用等值条件，多段之间用 OR 连接
+        partition_format = partition_format or DateSqlUtil.PARTITION_FORMATS.get(granularity)
+        conditions = []
+        for first, last in DateSqlUtil._period_runs(DateSqlUtil.coalesce(date_ranges), granularity):
+            start = DateSqlUtil._partition_key(first, granularity, partition_format)
+            if first == last:
+                conditions.append(f"{column} = '{start}'")
+            else:
+                end = DateSqlUtil._partition_key(last + 1, granularity, partition_format)
+                conditions.append(f"{column} >= '{start}' AND {column} < '{end}'")
+        return DateSqlUtil._join_conditions(conditions)
+
+    @staticmethod
+    def coalesced_predicate(date_ranges: List[Union[DateRange, Tuple[date, date]]], column: str,
+                            dialect: str = "mysql", partition_format: str = "%Y%m%d",
+                            tz: Union[str, tzinfo] = None) -> str:
+        # 多个表达式合并后的一个条件，重叠的日期只扫描一次
+        return DateSqlUtil._join_conditions(
+            [DateSqlUtil.interval_predicate(start, end, column, dialect, partition_format, tz)
+             for start, end in DateSqlUtil.coalesce(date_ranges)])
+
+    @staticmethod
+    def _join_conditions(conditions: List[str]) -> str:
+        if not conditions:
+            return "1 = 0"
+        if len(conditions) == 1:
+            return conditions[0]
+        return " OR ".join(f"({condition})" for condition in conditions)
+
+    @staticmethod
+    def build_predicates(date_ranges: List[DateRange], column: str, dialect: str = "mysql",
+                         partition_format: str = "%Y%m%d", tz: Union[str, tzinfo] = None) -> Dict[str, str]:
+        return {date_range.expression: DateSqlUtil.predicate(date_range, column, dialect, partition_format, tz)
+                for date_range in date_ranges}
+
+    @staticmethod
+    def build_prompt_comment(date_ranges: List[DateRange], column: str, dialect: str = "mysql",
+                             partition_format: str = "%Y%m%d", tz: Union[str, tzinfo] = None) -> List[str]:
+        # 与 DateTimeUtil.run 的输出并列放进 SQL 生成的 prompt，模型直接照抄条件即可
+        predicates = DateSqlUtil.build_predicates(date_ranges, column, dialect, partition_format, tz)
+        return [f"{date_range}，SQL条件：{predicates[date_range.expression]}" for date_range in date_ranges]
+
+    @staticmethod
+    def fill_template(template: str, date_ranges: List[DateRange], column: str, dialect: str = "mysql",
+                      partition_format: str = "%Y%m%d", tz: Union[str, tzinfo] = None) -> str:
+        # 把模板中的 {{上周}} 之类占位符替换为对应条件，未解析出的占位符保持原样
+        predicates = DateSqlUtil.build_predicates(date_ranges, column, dialect, partition_format, tz)
+        return DateSqlUtil.PLACEHOLDER_PATTERN.sub(
+            lambda m: f"({predicates[m.group(1)]})" if m.group(1) in predicates else m.group(0), template)
+
+    @staticmethod
+    def run(date_list, column: str, dialect: str = "mysql", now: date = None,
+            partition_format: str = "%Y%m%d", tz: Union[str, tzinfo] = None) -> Dict[str, str]:
+        # tz（IANA 时区名或 tzinfo）同时决定参考日期（未传 now 时）和 epoch 方言的零点
+        date_ranges = DateTimeUtil.run_ranges(date_list, now, tz)
+        return DateSqlUtil.build_predicates(date_ranges, column, dialect, partition_format, tz)
+
+    @staticmethod
+    def run_partitions(date_list, column: str, granularity: str = "day", now: date = None,
+                       partition_format: str = None, tz=None) -> str:
+        # 一个问题中的所有表达式合并成一个分区条件
+        return DateSqlUtil.partition_predicate(DateTimeUtil.run_ranges(date_list, now, tz), column, granularity,
+                                               partition_format)
@@ -0,0 +1,89 @@
+from datetime import date
+from typing import Iterable, Iterator, List
+
+from date_convert import DateTimeUtil, reference_day
+from date_normalize import DateNormalizeUtil
+
+
+class StreamingListParser:
+    # 增量解析模型流式输出的 ["上周星期5", "上周星期3"]，不使用 eval：
+    # 每次 feed 一段文本，返回这段文本中闭合的字符串元素；列表之前的文字（如 ```python）会被忽略
+    ESCAPES = {"n": "\n", "t": "\t", "r": "\r"}
+
+    def __init__(self):
+        self.started = False
+        self.finished = False
+        self.quote = None
+        self.escape = False
+        self.buffer = []
+
+    def feed(self, chunk: str) -> List[str]:
+        elements = []
+        i, n = 0, len(chunk)
+        while i < n and not self.finished:
+            if self.quote is not None:
+                if self.escape:
+                    self.buffer.append(StreamingListParser.ESCAPES.get(chunk[i], chunk[i]))
+                    self.escape = False
+                    i += 1
+                    continue
+                # 字符串内部按块查找，直到引号或转义符
+                end = i
+                while end < n and chunk[end] != self.quote and chunk[end] != "\\":
+                    end += 1
+                self.buffer.append(chunk[i:end])
+                if end < n:
+                    if chunk[end] == "\\":
+                        self.escape = True
+                    else:
+                        elements.append("".join(self.buffer))
+                        self.buffer = []
+                        self.quote = None
+                i = end + 1
+                continue
+
+            char = chunk[i]
+            if not self.started:
+                self.started = char == "["
+            elif char in "'\"":
+                self.quote = char
+            elif char == "]":
+                self.finished = True
+            i += 1
+        return elements
+
+
+class StreamingResolver:
+    # 边生成边解析：每个元素闭合时立即解析，生成结束时结果已就绪
+    def __init__(self, now: date = None, normalize: bool = False, tz=None):
+        self.now = reference_day(now, tz)
+        self.normalize = normalize
+        self.parser = StreamingListParser()
+        self.expressions = []
+        self.results = []
+
+    def feed(self, chunk: str) -> List[str]:
+        resolved = []
+        for expression in self.parser.feed(chunk):
+            self.expressions.append(expression)
+            if self.normalize:
+                resolved += DateNormalizeUtil.build_date_expressions([expression], self.now)
+            else:
+                resolved += DateTimeUtil.build_date_expressions([expression], self.now)
+        self.results += resolved
+        return resolved
+
+    @property
+    def finished(self) -> bool:
+        return self.parser.finished
+
+    @staticmethod
+    def iter_resolve(chunks: Iterable[str], now: date = None, normalize: bool = False, tz=None) -> Iterator[str]:
+        # chunks 可以是 transformers 的 TextIteratorStreamer
+        resolver = StreamingResolver(now, normalize, tz)
+        for chunk in chunks:
+            yield from resolver.feed(chunk)
+
+    @staticmethod
+    def run(chunks: Iterable[str], now: date = None, normalize: bool = False, tz=None) -> List[str]:
+        return list(StreamingResolver.iter_resolve(chunks, now, normalize, tz))
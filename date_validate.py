@@ -0,0 +1,349 @@
+import os
+import re
+import sys
+import json
+import time
+import logging
+import zipfile
+import argparse
+import tempfile
+import contextlib
+import subprocess
+import importlib.util
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, date, timedelta
+from itertools import product
+from typing import Dict, List, Tuple
+
+from date_convert import DateTimeUtil, DateRange
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SPREADSHEET = os.path.join(ROOT, "时间表达式.xlsx")
+SHEET_NS = {"m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+# 表格中的分组标题行
+FAMILIES = ("日", "月", "年", "半年", "季度", "周", "时间段")
+
+# 占位符的取值，偏向边界：闰年与世纪年、月末、第53周、越界的月/日/周（两边都应报错或返回相同结果）
+YEARS = ("1999", "2000", "2024", "2100")
+MONTHS = tuple(f"{m:02d}" for m in range(0, 14))
+DAYS = ("00", "01", "15", "28", "29", "30", "31")
+YEAR_WEEKS = ("00", "01", "02", "52", "53", "54")
+MONTH_WEEKS = tuple(str(w) for w in range(0, 7))
+WEEKDAYS = tuple(str(d) for d in range(0, 9))
+QUARTERS = tuple(str(q) for q in range(0, 6))
+COUNTS = ("0", "1", "2", "3", "4", "12", "13", "53", "100", "1000")
+PLACEHOLDER_PATTERN = re.compile(r'\{(%4d|%2d|%1d|%d|\\d\+)\}')
+# 参考实现始终用 build_date_expressions 解析，当前实现按模式走不同的路径：
+#   comments   build_date_expressions
+#   day_table  先查当天的预计算表（get_day_table），不在表中的再走规则
+#   cache      开启 ExpressionCache，每个表达式解析两次，第二次必须命中缓存且结果相同
+#   ranges     resolve_range 得到 DateRange 再 format，没有区间的规则走 build_date_expressions
+#   vectorize  VectorDateUtil 对整块参考日期一次性求区间，不支持向量化或为 NaT 的走 build_date_expressions
+#   fiscal     设置默认配置的 FiscalCalendar（公历、周一开始），结果应与内置规则完全相同
+MODES = ("comments", "day_table", "cache", "ranges", "vectorize", "fiscal")
+
+CorpusEntry = namedtuple("CorpusEntry", ["family", "template", "note", "expressions"])
+
+
+def read_sheet(path: str) -> List[List[str]]:
+    # 只用标准库读取 xlsx 第一个工作表，共享字符串按序号查表
+    with zipfile.ZipFile(path) as workbook:
+        shared = []
+        if "xl/sharedStrings.xml" in workbook.namelist():
+            root = ET.fromstring(workbook.read("xl/sharedStrings.xml"))
+            shared = ["".join(t.text or "" for t in si.iter(f"{{{SHEET_NS['m']}}}t"))
+                      for si in root.findall("m:si", SHEET_NS)]
+        root = ET.fromstring(workbook.read("xl/worksheets/sheet1.xml"))
+    rows = []
+    for row in root.iter(f"{{{SHEET_NS['m']}}}row"):
+        values = []
+        for cell in row.findall("m:c", SHEET_NS):
+            value = cell.find("m:v", SHEET_NS)
+            if value is None:
+                text = "".join(t.text or "" for t in cell.iter(f"{{{SHEET_NS['m']}}}t"))
+            elif cell.get("t") == "s":
+                text = shared[int(value.text)]
+            else:
+                text = value.text or ""
+            values.append(text.strip())
+        rows.append(values)
+    return rows
+
+
+def placeholder_values(kind: str, before: str, after: str) -> Tuple[str, ...]:
+    # 按占位符前后的文字决定取值，表格中的位宽不总是与规则一致（{%4d}年第{%1d}个完整周 实际为两位）
+    if kind == "%4d":
+        return YEARS
+    if kind == "\\d+":
+        return COUNTS
+    if after.startswith("月"):
+        return MONTHS
+    if after.startswith("日"):
+        return DAYS
+    if after.startswith("季度"):
+        return QUARTERS
+    if after.startswith("天") or before.endswith("星期"):
+        return WEEKDAYS
+    if after.startswith("周") or after.startswith("个完整周"):
+        return MONTH_WEEKS if "月" in before else YEAR_WEEKS
+    raise ValueError(f"无法展开的占位符: {before}{{{kind}}}{after}")
+
+
+def expand(template: str) -> List[str]:
+    parts = PLACEHOLDER_PATTERN.split(template)
+    texts, kinds = parts[0::2], parts[1::2]
+    choices = [placeholder_values(kind, texts[i], texts[i + 1]) for i, kind in enumerate(kinds)]
+    expressions = []
+    for values in product(*choices):
+        expressions.append("".join(text + value for text, value in zip(texts, values)) + texts[-1])
+    return expressions
+
+
+def load_corpus(path: str = DEFAULT_SPREADSHEET) -> List[CorpusEntry]:
+    # 第一列为匹配规则（模板），第二列为示例问法和说明
+    corpus = []
+    family = ""
+    for values in read_sheet(path)[1:]:
+        template = values[0] if values else ""
+        note = values[1] if len(values) > 1 else ""
+        if not template:
+            continue
+        if template in FAMILIES:
+            family = template
+            continue
+        corpus.append(CorpusEntry(family, template, note, expand(template)))
+    return corpus
+
+
+def load_reference(reference: str, workdir: str, log=sys.stderr) -> str:
+    # reference 为文件路径或 git 版本号，返回冻结的参考实现文件路径
+    if os.path.isfile(reference):
+        path = os.path.abspath(reference)
+        with open(path, "rb") as f:
+            source = f.read()
+    else:
+        source = subprocess.run(["git", "show", f"{reference}:date_convert.py"], cwd=ROOT, check=True,
+                                capture_output=True).stdout
+        path = os.path.join(workdir, "date_convert_reference.py")
+        with open(path, "wb") as f:
+            f.write(source)
+    with open(os.path.join(ROOT, "date_convert.py"), "rb") as f:
+        if f.read() == source:
+            log.write(f"警告: 参考实现 {reference} 与工作区的 date_convert.py 相同，对比不会发现任何差异\n")
+    return path
+
+
+def import_reference(path: str):
+    spec = importlib.util.spec_from_file_location("date_convert_reference", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.DateTimeUtil
+
+
+def evaluate(util, expression: str, now: datetime) -> str:
+    # 统一为一个字符串，异常也作为结果比较；ValueError 的子类（calendar.IllegalMonthError 等）视为相同
+    try:
+        comments = util.build_date_expressions([expression], now)
+    except ValueError:
+        return "!ValueError"
+    except Exception as e:
+        return f"!{type(e).__name__}"
+    return comments[0] if comments else ""
+
+
+_worker = {}
+
+
+def init_worker(reference_path: str, corpus: List[CorpusEntry], mode: str = "comments"):
+    # 两边的 Error convert 输出和日志对比较没有意义
+    logging.disable(logging.CRITICAL)
+    _worker["devnull"] = open(os.devnull, "w")
+    _worker["reference"] = import_reference(reference_path)
+    _worker["corpus"] = corpus
+    _worker["mode"] = mode
+    DateTimeUtil.set_calendar(None)
+    DateTimeUtil.disable_cache()
+    if mode == "cache":
+        DateTimeUtil.enable_cache()
+    elif mode == "fiscal":
+        from date_calendar import FiscalCalendar
+        DateTimeUtil.set_calendar(FiscalCalendar())
+
+
+def evaluate_current(mode: str, expression: str, now: datetime, vector: dict) -> str:
+    # 按模式用当前实现解析；vector 为 vectorize 模式下该块预先算好的
+    # 表达式 -> (规则, 粒度, 起始日列表, 结束日列表, 块的第一个 ordinal)
+    if mode == "day_table":
+        comment = DateTimeUtil.get_day_table(now).get(expression)
+        if comment is not None:
+            return f"{expression}={comment}"
+    elif mode == "cache":
+        first = evaluate(DateTimeUtil, expression, now)
+        second = evaluate(DateTimeUtil, expression, now)
+        return first if second == first else f"!cache {second!r}"
+    elif mode == "ranges":
+        try:
+            date_range = DateTimeUtil.resolve_range(expression, now)
+        except Exception as e:
+            return f"!{type(e).__name__}"
+        if date_range is not None:
+            return str(date_range)
+    elif mode == "vectorize" and expression in vector:
+        name, granularity, starts, ends, first = vector[expression]
+        i = now.toordinal() - first
+        if starts[i] is not None:
+            return str(DateRange(expression, starts[i], ends[i], granularity, name))
+    return evaluate(DateTimeUtil, expression, now)
+
+
+def vectorize_chunk(corpus: List[CorpusEntry], first: int, last: int) -> dict:
+    import numpy as np
+    from date_vectorize import VectorDateUtil
+
+    anchors = np.datetime64(date.fromordinal(first), "D") + np.arange(last - first + 1)
+    vector = {}
+    for entry in corpus:
+        for expression in entry.expressions:
+            matched = DateTimeUtil.match_rule(expression)
+            if matched is None or matched[0] not in DateTimeUtil.RANGE_RULES:
+                continue
+            try:
+                starts, ends = VectorDateUtil.resolve(expression, anchors)
+            except (ValueError, OverflowError):
+                continue
+            # NaT 转换后为 None
+            vector[expression] = (matched[0], DateTimeUtil.RANGE_RULES[matched[0]][0], starts.astype(object).tolist(),
+                                  ends.astype(object).tolist(), first)
+    return vector
+
+
+def sweep_chunk(first: int, last: int, absolute_step: int, anchor_start: int, max_diffs: int) -> tuple:
+    # 对 [first, last] 内的每个参考日期解析整个语料；含 {%4d} 的绝对表达式与参考日期无关，每 absolute_step 天取一次
+    reference, corpus, mode = _worker["reference"], _worker["corpus"], _worker["mode"]
+    stats = [[0, 0, 0] for _ in corpus]  # 每个模板的 用例数、差异数、解析出结果数
+    diffs = []
+    with contextlib.redirect_stdout(_worker["devnull"]):
+        vector = vectorize_chunk(corpus, first, last) if mode == "vectorize" else {}
+        for ordinal in range(first, last + 1):
+            now = datetime.fromordinal(ordinal)
+            sample_absolute = (ordinal - anchor_start) % absolute_step == 0
+            for i, entry in enumerate(corpus):
+                if not sample_absolute and "{%4d}" in entry.template:
+                    continue
+                stat = stats[i]
+                for expression in entry.expressions:
+                    expected = evaluate(reference, expression, now)
+                    actual = evaluate_current(mode, expression, now, vector)
+                    stat[0] += 1
+                    if actual != expected:
+                        stat[1] += 1
+                        if len(diffs) < max_diffs:
+                            diffs.append({"mode": mode, "anchor_date": now.date().isoformat(), "family": entry.family,
+                                          "template": entry.template, "expression": expression,
+                                          "expected": expected, "actual": actual})
+                    elif actual and not actual.startswith("!"):
+                        stat[2] += 1
+    return stats, diffs
+
+
+def run_sweep(corpus: List[CorpusEntry], reference_path: str, start: date, end: date, workers: int,
+              chunk_days: int, absolute_step: int, max_diffs: int, log=sys.stderr, mode: str = "comments") -> tuple:
+    first, last = start.toordinal(), end.toordinal()
+    chunks = [(s, min(s + chunk_days - 1, last)) for s in range(first, last + 1, chunk_days)]
+    stats = [[0, 0, 0] for _ in corpus]
+    diffs = []
+    began = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(reference_path, corpus, mode)) as executor:
+        futures = [executor.submit(sweep_chunk, s, e, absolute_step, first, max_diffs) for s, e in chunks]
+        for done, future in enumerate(futures, 1):
+            chunk_stats, chunk_diffs = future.result()
+            for total, chunk in zip(stats, chunk_stats):
+                for k in range(3):
+                    total[k] += chunk[k]
+            diffs.extend(chunk_diffs[:max_diffs - len(diffs)])
+            cases = sum(stat[0] for stat in stats)
+            elapsed = time.perf_counter() - began
+            log.write(f"\r{mode}: {done}/{len(chunks)} 块，{cases} 个用例，{cases / elapsed:.0f} 个/秒")
+    log.write("\n")
+    return stats, diffs
+
+
+def report(corpus: List[CorpusEntry], stats: List[list], diffs: List[dict], out=sys.stdout, mode: str = "comments"):
+    out.write(f"== {mode} ==\n")
+    families: Dict[str, list] = {}
+    for entry, (cases, diff_count, resolved) in zip(corpus, stats):
+        family = families.setdefault(entry.family, [0, 0, 0])
+        family[0] += cases
+        family[1] += diff_count
+        family[2] += resolved
+    out.write(f"{'family':<10}{'cases':>12}{'diffs':>10}{'resolved':>10}\n")
+    for name, (cases, diff_count, resolved) in families.items():
+        out.write(f"{name:<10}{cases:>12}{diff_count:>10}{resolved / cases if cases else 0:>10.1%}\n")
+    # 两边都解析不出结果的模板说明表格与规则已经不一致
+    for entry, (cases, diff_count, resolved) in zip(corpus, stats):
+        if cases and not resolved:
+            out.write(f"未覆盖的模板: {entry.family} {entry.template}\n")
+    for diff in diffs:
+        out.write(f"{diff['anchor_date']} {diff['expression']}: 参考 {diff['expected']!r}，当前 {diff['actual']!r}\n")
+    total_cases = sum(stat[0] for stat in stats)
+    total_diffs = sum(stat[1] for stat in stats)
+    out.write(f"共 {total_cases} 个用例，{total_diffs} 个差异\n")
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="用时间表达式.xlsx 中的全部表达式逐日对比当前实现与参考实现")
+    # 没有默认值：git 版本号只在原始历史中存在，改写或压缩历史后需要自己指定优化前的实现
+    parser.add_argument("--reference", default=None, help="参考实现：date_convert.py 的文件路径或 git 版本号，必填")
+    parser.add_argument("--modes", default="comments",
+                        help=f"逗号分隔的对比模式，all 为全部：{', '.join(MODES)}，默认 comments")
+    parser.add_argument("--spreadsheet", default=DEFAULT_SPREADSHEET, help="表达式表格，默认仓库中的 时间表达式.xlsx")
+    parser.add_argument("--start", default="1990-01-01", help="第一个参考日期")
+    parser.add_argument("--end", default="2039-12-31", help="最后一个参考日期")
+    parser.add_argument("--absolute-step", type=int, default=11,
+                        help="含具体年份的表达式每隔几天取一个参考日期，与 7 互质以轮换星期几")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="进程数，默认 CPU 核数")
+    parser.add_argument("--chunk-days", type=int, default=92, help="每个任务块的参考日期天数")
+    parser.add_argument("--max-diffs", type=int, default=50, help="最多输出的差异条数")
+    parser.add_argument("--output", default=None, help="把差异写入 JSONL 文件")
+    parser.add_argument("--list", action="store_true", help="只列出展开后的表达式")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.spreadsheet)
+    if args.list:
+        for entry in corpus:
+            for expression in entry.expressions:
+                print(f"{entry.family}\t{entry.template}\t{expression}")
+        return
+
+    if args.reference is None:
+        parser.error("需要指定 --reference（优化前 date_convert.py 的文件路径或 git 版本号）")
+    modes = list(MODES) if args.modes == "all" else args.modes.split(",")
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f"未知的对比模式: {', '.join(unknown)}，可选 {', '.join(MODES)}")
+    if "vectorize" in modes and importlib.util.find_spec("numpy") is None:
+        parser.error("vectorize 模式需要 numpy")
+
+    failed = False
+    all_diffs = []
+    with tempfile.TemporaryDirectory() as workdir:
+        reference_path = load_reference(args.reference, workdir)
+        for mode in modes:
+            stats, diffs = run_sweep(corpus, reference_path, date.fromisoformat(args.start),
+                                     date.fromisoformat(args.end), args.workers, args.chunk_days, args.absolute_step,
+                                     args.max_diffs, mode=mode)
+            report(corpus, stats, diffs, mode=mode)
+            failed = failed or any(stat[1] for stat in stats)
+            all_diffs += diffs
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for diff in all_diffs:
+                f.write(json.dumps(diff, ensure_ascii=False) + "\n")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import numpy as np
+
+from date_convert import DateTimeUtil
+
+DAY = np.timedelta64(1, "D")
+NAT = np.datetime64("NaT", "D")
+
+
+class VectorDateUtil:
+    # 同一个表达式对一批参考日期（numpy datetime64[D] 数组）一次性求 (起始日, 结束日)，
+    # 结果与 DateTimeUtil 对每个日期逐条解析的区间一致；无法得到合法日期的位置为 NaT
+
+    @staticmethod
+    def resolve(expression: str, anchors) -> tuple:
+        anchors = np.asarray(anchors, dtype="datetime64[D]")
+        matched = DateTimeUtil.match_rule(expression)
+        if matched is None:
+            raise ValueError(f"无法解析的时间表达式: {expression}")
+        name, handler, groups = matched
+        calendar = DateTimeUtil.get_calendar()
+        if calendar is not None and name in calendar.RANGE_RULES:
+            # 设置了日历时季度、年、周等按日历计算，逐个不同的参考日期走标量路径
+            return VectorDateUtil.resolve_scalar(expression, anchors)
+        resolver = VectorDateUtil.RESOLVERS.get(name)
+        if resolver is None:
+            raise ValueError(f"表达式不支持向量化计算: {expression}")
+        return resolver(anchors, groups)
+
+    @staticmethod
+    def resolve_scalar(expression: str, anchors) -> tuple:
+        days, inverse = np.unique(anchors, return_inverse=True)
+        starts = np.full(len(days), NAT)
+        ends = np.full(len(days), NAT)
+        for i, day in enumerate(days):
+            if np.isnat(day):
+                continue
+            date_range = DateTimeUtil.resolve_range(expression, day.astype(object))
+            if date_range is not None:
+                starts[i], ends[i] = date_range.start, date_range.end
+        return starts[inverse].reshape(anchors.shape), ends[inverse].reshape(anchors.shape)
+
+    # ---------- 基础运算 ----------
+
+    @staticmethod
+    def weekday(days):
+        # 1970-01-01 是星期四，周一为 0
+        return (days.astype("int64") + 3) % 7
+
+    @staticmethod
+    def month_of(days):
+        return days.astype("datetime64[M]")
+
+    @staticmethod
+    def day_of_month(days):
+        return (days - VectorDateUtil.month_of(days).astype("datetime64[D]")).astype("int64") + 1
+
+    @staticmethod
+    def month_start(months):
+        return months.astype("datetime64[D]")
+
+    @staticmethod
+    def month_end(months):
+        return (months + 1).astype("datetime64[D]") - DAY
+
+    @staticmethod
+    def add_months(days, n):
+        # 与 relativedelta(months=n) 一致：日超出目标月天数时取月末
+        target = VectorDateUtil.month_of(days) + n
+        length = (VectorDateUtil.month_end(target) - VectorDateUtil.month_start(target)).astype("int64") + 1
+        day = np.minimum(VectorDateUtil.day_of_month(days), length)
+        return VectorDateUtil.month_start(target) + (day - 1).astype("timedelta64[D]")
+
+    @staticmethod
+    def quarter_of(days):
+        months = VectorDateUtil.month_of(days)
+        return months - months.astype("int64") % 3
+
+    @staticmethod
+    def year_of(days):
+        return days.astype("datetime64[Y]")
+
+    @staticmethod
+    def year_start(years):
+        return years.astype("datetime64[D]")
+
+    @staticmethod
+    def year_end(years):
+        return (years + 1).astype("datetime64[D]") - DAY
+
+    # ---------- 近N天/周/个月/年 ----------
+
+    @staticmethod
+    def recent_n_day(anchors, groups):
+        return anchors - int(groups[0]) * DAY, anchors
+
+    @staticmethod
+    def recent_n_day_without_today(anchors, groups):
+        return anchors - int(groups[0]) * DAY, anchors - DAY
+
+    @staticmethod
+    def recent_n_week(anchors, groups):
+        return anchors - 7 * int(groups[0]) * DAY, anchors
+
+    @staticmethod
+    def recent_n_month(anchors, groups):
+        return VectorDateUtil.add_months(anchors, -int(groups[0])), anchors
+
+    @staticmethod
+    def recent_n_year(anchors, groups):
+        return VectorDateUtil.add_months(anchors, -12 * int(groups[0])), anchors
+
+    # ---------- 日 / 周 ----------
+
+    @staticmethod
+    def general_day(anchors, groups):
+        offsets = {"今天": 0, "昨天": -1, "前天": -2, "明天": 1, "后天": 2}
+        day_ex = groups[0]
+        if day_ex in offsets:
+            days = anchors + offsets[day_ex] * DAY
+            return days, days
+        # 上月今天 / 上上月今天：目标月没有同一天时原逻辑返回空，这里为 NaT
+        months = 1 if day_ex == "上月今天" else 2
+        days = VectorDateUtil.add_months(anchors, -months)
+        days = np.where(VectorDateUtil.day_of_month(days) == VectorDateUtil.day_of_month(anchors), days, NAT)
+        return days, days
+
+    WEEK_OFFSETS = {"本周": 0, "上周": -1, "上上周": -2, "下周": 1, "下下周": 2}
+
+    @staticmethod
+    def general_week(anchors, groups):
+        monday = anchors - VectorDateUtil.weekday(anchors) * DAY + 7 * VectorDateUtil.WEEK_OFFSETS[groups[0]] * DAY
+        return monday, monday + 6 * DAY
+
+    @staticmethod
+    def general_week_specific_day(anchors, groups):
+        monday = anchors - VectorDateUtil.weekday(anchors) * DAY + 7 * VectorDateUtil.WEEK_OFFSETS[groups[0]] * DAY
+        days = monday + (int(groups[1]) - 1) * DAY
+        return days, days
+
+    @staticmethod
+    def week_day(anchors, groups):
+        days = anchors - VectorDateUtil.weekday(anchors) * DAY + (int(groups[0]) - 1) * DAY
+        return days, days
+
+    # ---------- 月 / 季度 / 半年 / 年 ----------
+
+    @staticmethod
+    def general_month(anchors, groups):
+        # 与 get_month_ex 一致：上月/上上月/下月按前后 30/60 天取所在月份
+        month_ex = groups[0]
+        if month_ex == "去年本月":
+            months = VectorDateUtil.month_of(anchors) - 12
+            # 2月29日时原逻辑 replace(year=...) 会失败
+            valid = VectorDateUtil.day_of_month(VectorDateUtil.add_months(anchors, -12)) == \
+                VectorDateUtil.day_of_month(anchors)
+            return (np.where(valid, VectorDateUtil.month_start(months), NAT),
+                    np.where(valid, VectorDateUtil.month_end(months), NAT))
+        shift = {"本月": 0, "上月": -30, "上上月": -60, "下月": 30}[month_ex]
+        months = VectorDateUtil.month_of(anchors + shift * DAY)
+        return VectorDateUtil.month_start(months), VectorDateUtil.month_end(months)
+
+    @staticmethod
+    def general_quarter(anchors, groups):
+        shift = {"本季度": 0, "上季度": -3, "下季度": 3, "去年本季度": -12}[groups[0]]
+        quarters = VectorDateUtil.quarter_of(anchors) + shift
+        return VectorDateUtil.month_start(quarters), VectorDateUtil.month_end(quarters + 2)
+
+    YEAR_OFFSETS = {"今年": 0, "去年": -1, "前年": -2, "明年": 1, "后年": 2}
+
+    @staticmethod
+    def general_year_quarter(anchors, groups):
+        quarter = int(groups[1][1:-2])
+        if not 1 <= quarter <= 4:
+            # 第0季度、第5季度 没有区间，不能滚动到相邻年份的季度
+            days = np.full(anchors.shape, NAT)
+            return days, days
+        quarters = (VectorDateUtil.year_of(anchors) + VectorDateUtil.YEAR_OFFSETS[groups[0]]).astype(
+            "datetime64[M]") + 3 * (quarter - 1)
+        return VectorDateUtil.month_start(quarters), VectorDateUtil.month_end(quarters + 2)
+
+    @staticmethod
+    def general_year(anchors, groups):
+        years = VectorDateUtil.year_of(anchors) + VectorDateUtil.YEAR_OFFSETS[groups[0]]
+        return VectorDateUtil.year_start(years), VectorDateUtil.year_end(years)
+
+    @staticmethod
+    def half_year_of(years, half_year_ex):
+        months = years.astype("datetime64[M]") + (0 if half_year_ex == "上" else 6)
+        return VectorDateUtil.month_start(months), VectorDateUtil.month_end(months + 5)
+
+    @staticmethod
+    def half_year(anchors, groups):
+        return VectorDateUtil.half_year_of(VectorDateUtil.year_of(anchors), groups[0])
+
+    @staticmethod
+    def general_year_half_year(anchors, groups):
+        years = VectorDateUtil.year_of(anchors) + VectorDateUtil.YEAR_OFFSETS[groups[0]]
+        return VectorDateUtil.half_year_of(years, groups[1])
+
+    # ---------- 近N个完整周/月/季度/年 ----------
+
+    @staticmethod
+    def recent_n_complete_week(anchors, groups):
+        weekday = VectorDateUtil.weekday(anchors)
+        end = np.where(weekday == 6, anchors, anchors - (weekday + 1) * DAY)
+        return end - 7 * int(groups[0]) * DAY + DAY, end
+
+    @staticmethod
+    def recent_n_complete_month(anchors, groups):
+        # 与 get_recent_n_complete_month 一致：固定为前两个完整月
+        months = VectorDateUtil.month_of(anchors)
+        return VectorDateUtil.month_start(months - 2), VectorDateUtil.month_end(months - 1)
+
+    @staticmethod
+    def recent_n_complete_quarter(anchors, groups):
+        months = VectorDateUtil.month_of(anchors)
+        is_end = (months.astype("int64") % 3 == 2) & (VectorDateUtil.day_of_month(anchors) == 31)
+        end = np.where(is_end, anchors, VectorDateUtil.month_start(VectorDateUtil.quarter_of(anchors)) - DAY)
+        return VectorDateUtil.add_months(end, -3 * int(groups[0])) + 2 * DAY, end
+
+    @staticmethod
+    def recent_n_complete_year(anchors, groups):
+        years = VectorDateUtil.year_of(anchors)
+        is_end = anchors == VectorDateUtil.year_end(years)
+        end = np.where(is_end, anchors, VectorDateUtil.year_start(years) - DAY)
+        return VectorDateUtil.year_start(VectorDateUtil.year_of(end) - int(groups[0]) + 1), end
+
+    @staticmethod
+    def recent_n_quarter_with_current(anchors, groups):
+        quarters = VectorDateUtil.quarter_of(anchors)
+        return VectorDateUtil.month_start(quarters + 2 - (3 * int(groups[0]) - 1)), VectorDateUtil.month_end(quarters + 2)
+
+
+VectorDateUtil.RESOLVERS = {
+    "RECENT_N_DAY": VectorDateUtil.recent_n_day,
+    "RECENT_N_DAY_WITHOUT_TODAY": VectorDateUtil.recent_n_day_without_today,
+    "RECENT_N_WEEK": VectorDateUtil.recent_n_week,
+    "RECENT_N_MONTH": VectorDateUtil.recent_n_month,
+    "RECENT_N_YEAR": VectorDateUtil.recent_n_year,
+    "GENERAL_DAY": VectorDateUtil.general_day,
+    "GENERAL_WEEK": VectorDateUtil.general_week,
+    "GENERAL_WEEK_SPECIFIC_DAY": VectorDateUtil.general_week_specific_day,
+    "WEEK_DAY": VectorDateUtil.week_day,
+    "GENERAL_MONTH": VectorDateUtil.general_month,
+    "GENERAL_QUARTER": VectorDateUtil.general_quarter,
+    "GENERAL_YEAR_QUARTER": VectorDateUtil.general_year_quarter,
+    "GENERAL_YEAR": VectorDateUtil.general_year,
+    "HALF_YEAR": VectorDateUtil.half_year,
+    "GENERAL_YEAR_HALF_YEAR": VectorDateUtil.general_year_half_year,
+    "RECENT_N_COMPLETE_WEEK": VectorDateUtil.recent_n_complete_week,
+    "RECENT_N_COMPLETE_MONTH": VectorDateUtil.recent_n_complete_month,
+    "RECENT_N_COMPLETE_QUARTER": VectorDateUtil.recent_n_complete_quarter,
+    "RECENT_N_COMPLETE_YEAR": VectorDateUtil.recent_n_complete_year,
+    "RECENT_N_QUARTER_WITH_CURRENT": VectorDateUtil.recent_n_quarter_with_current,
+}
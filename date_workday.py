@@ -0,0 +1,147 @@
+import os
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Iterable, List, Optional, Tuple
+
+from date_convert import DateTimeUtil, to_day
+
+DEFAULT_HOLIDAY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "holidays_cn.txt")
+
+
+class WorkdayCalendar:
+    # 工作日历：周一至周五上班，法定节假日（休）放假，调休的周末（班）上班
+    # 创建时把 first_year-last_year 展开成两个数组，之后区间内的工作日数、前后第N个工作日都是 O(1) 查表：
+    #   cumulative[i] 为 [first, first + i) 内的工作日数
+    #   workdays[k] 为第 k 个工作日的 ordinal
+    GENERAL_OFFSETS = {"上上": -2, "上": -1, "下": 1, "下下": 2}
+
+    def __init__(self, holidays: Iterable[date] = (), workdays: Iterable[date] = (), first_year: int = 1990,
+                 last_year: int = 2100):
+        self.first_year = first_year
+        self.last_year = last_year
+        self.first = date(first_year, 1, 1).toordinal()
+        self.last = date(last_year, 12, 31).toordinal()
+        holidays = {to_day(day).toordinal() for day in holidays}
+        extra_workdays = {to_day(day).toordinal() for day in workdays}
+        # date.fromordinal(1) 是周一，(ordinal - 1) % 7 即 weekday()
+        flags = [ordinal in extra_workdays or (ordinal not in holidays and (ordinal - 1) % 7 < 5)
+                 for ordinal in range(self.first, self.last + 1)]
+        self.cumulative: List[int] = [0] + list(accumulate(flags))
+        self.workdays: List[int] = [ordinal for ordinal, flag in zip(range(self.first, self.last + 1), flags) if flag]
+
+    @staticmethod
+    def parse(lines: Iterable[str]) -> Tuple[List[date], List[date]]:
+        # 每行一个日期或日期区间和类型，# 之后为注释：
+        #   2024-10-01~2024-10-07 休
+        #   2024-09-29 班
+        holidays, workdays = [], []
+        for number, line in enumerate(lines, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            parts = line.split()
+            if len(parts) != 2 or parts[1] not in ("休", "班"):
+                raise ValueError(f"第{number}行格式错误，应为 日期[~日期] 休/班: {line}")
+            first, _, last = parts[0].partition("~")
+            start = date.fromisoformat(first)
+            end = date.fromisoformat(last) if last else start
+            days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+            (holidays if parts[1] == "休" else workdays).extend(days)
+        return holidays, workdays
+
+    @staticmethod
+    def load(path: str = DEFAULT_HOLIDAY_FILE, first_year: int = 1990, last_year: int = 2100) -> "WorkdayCalendar":
+        with open(path, encoding="utf-8") as f:
+            holidays, workdays = WorkdayCalendar.parse(f)
+        return WorkdayCalendar(holidays, workdays, first_year, last_year)
+
+    def _position(self, day: date) -> int:
+        ordinal = to_day(day).toordinal()
+        if not self.first <= ordinal <= self.last:
+            raise ValueError(f"{day} 超出工作日历范围 {self.first_year}-{self.last_year}")
+        return ordinal - self.first
+
+    def _workday(self, k: int) -> date:
+        if not 0 <= k < len(self.workdays):
+            raise ValueError(f"超出工作日历范围 {self.first_year}-{self.last_year}")
+        return date.fromordinal(self.workdays[k])
+
+    def is_workday(self, day: date) -> bool:
+        i = self._position(day)
+        return self.cumulative[i + 1] > self.cumulative[i]
+
+    def count(self, start: date, end: date) -> int:
+        # start~end（含两端）内的工作日数
+        return max(self.cumulative[self._position(end) + 1] - self.cumulative[self._position(start)], 0)
+
+    def shift(self, day: date, n: int) -> date:
+        # day 之后第 n 个工作日（n < 0 时为之前），不含 day 本身
+        i = self._position(day)
+        if n < 0:
+            return self._workday(self.cumulative[i] + n)
+        return self._workday(self.cumulative[i + 1] + n - 1)
+
+    def recent(self, day: date, n: int, include_today: bool = True) -> Optional[Tuple[date, date]]:
+        # 截至 day 的最近 n 个工作日：day 是工作日且 include_today 时包含 day
+        if n < 1:
+            return None
+        i = self._position(day)
+        end = self.cumulative[i + 1] if include_today else self.cumulative[i]
+        return self._workday(end - n), self._workday(end - 1)
+
+    def month_workdays(self, year: int, month: int) -> Tuple[int, int]:
+        # 该月第一个工作日的序号和该月工作日数
+        first = self.cumulative[self._position(date(year, month, 1))]
+        return first, self.cumulative[self._position(DateTimeUtil.month_end(year, month)) + 1] - first
+
+    def month_nth(self, year: int, month: int, n: int) -> Optional[Tuple[date, date]]:
+        first, total = self.month_workdays(year, month)
+        if not 1 <= n <= total:
+            return None
+        day = self._workday(first + n - 1)
+        return day, day
+
+    def month_last(self, year: int, month: int) -> Optional[Tuple[date, date]]:
+        first, total = self.month_workdays(year, month)
+        return None if total == 0 else self.month_nth(year, month, total)
+
+    def month_range(self, year: int, month: int) -> Optional[Tuple[date, date]]:
+        first, total = self.month_workdays(year, month)
+        if total == 0:
+            return None
+        return self._workday(first), self._workday(first + total - 1)
+
+    def month_comment(self, now: date, expression: str, g: tuple) -> Optional[str]:
+        year, month = DateTimeUtil.month_of(to_day(now), g[0])
+        dates = self.month_range(year, month)
+        if dates is None:
+            return None
+        _, total = self.month_workdays(year, month)
+        return f"{dates[0].strftime('%Y年%m月%d日')}至{dates[1].strftime('%Y年%m月%d日')}，共{total}个工作日"
+
+    def register(self):
+        # 把工作日规则注册到 DateTimeUtil，之后 run / run_ranges / build_date_expressions 都能解析；重复注册会替换为新的日历
+        month_words = "|".join(DateTimeUtil.MONTH_OFFSETS)
+        rules = [
+            ("RECENT_N_WORKDAY_WITHOUT_TODAY", r'不包含今天的近(\d+)个工作日', "range",
+             lambda today, expression, g: self.recent(today, int(g[0]), include_today=False), None),
+            ("RECENT_N_WORKDAY", r'近(\d+)个工作日', "range",
+             lambda today, expression, g: self.recent(today, int(g[0])), None),
+            ("GENERAL_WORKDAY", r'(上上|上|下下|下)个工作日', "day",
+             lambda today, expression, g: (self.shift(today, WorkdayCalendar.GENERAL_OFFSETS[g[0]]),) * 2, None),
+            ("GENERAL_MONTH_NTH_WORKDAY", rf'({month_words})第(\d+)个工作日', "day",
+             lambda today, expression, g: self.month_nth(*DateTimeUtil.month_of(today, g[0]), int(g[1])), None),
+            ("GENERAL_MONTH_LAST_WORKDAY", rf'({month_words})最后一个工作日', "day",
+             lambda today, expression, g: self.month_last(*DateTimeUtil.month_of(today, g[0])), None),
+            ("GENERAL_MONTH_WORKDAY", rf'({month_words})工作日', "range",
+             lambda today, expression, g: self.month_range(*DateTimeUtil.month_of(today, g[0])), self.month_comment),
+        ]
+        # 每条都插到最前面，倒序注册以保持上面的优先级
+        for name, pattern, granularity, range_func, handler in reversed(rules):
+            DateTimeUtil.register_rule(name, pattern, granularity, range_func, handler)
+
+    @staticmethod
+    def unregister():
+        for name in ["RECENT_N_WORKDAY_WITHOUT_TODAY", "RECENT_N_WORKDAY", "GENERAL_WORKDAY",
+                     "GENERAL_MONTH_NTH_WORKDAY", "GENERAL_MONTH_LAST_WORKDAY", "GENERAL_MONTH_WORKDAY"]:
+            DateTimeUtil.unregister_rule(name)
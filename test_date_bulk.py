@@ -0,0 +1,73 @@
+import io
+import json
+
+from date_bulk import BulkWriter, read_csv, read_jsonl, resolve_chunk, run_bulk
+from date_convert import DateTimeUtil
+
+RECORDS = [
+    (1, "2024-12-06", ["上周"], None),
+    (2, "2024-13-45", ["上周"], None),
+    (3, "2024-12-06", ["近99999999999999999999天", "今天"], None),
+    (4, "2024-12-06T23:30:00+00:00", ["今天"], None),
+]
+
+
+def test_resolve_chunk_isolates_bad_records():
+    results = resolve_chunk(RECORDS, tz="Asia/Shanghai")
+    assert results[0] == (1, "2024-12-06", ["上周=2024年11月25日至2024年12月01日"], None)
+    assert results[1][:3] == (2, "2024-13-45", [])
+    assert results[1][3].startswith("anchor_date 不合法")
+    assert results[2] == (3, "2024-12-06", ["今天=2024年12月06日"], None)
+    assert results[3] == (4, "2024-12-06T23:30:00+00:00", ["今天=2024年12月07日"], None)
+
+
+def test_resolve_chunk_retries_records_when_group_fails(monkeypatch):
+    run_batch = DateTimeUtil.run_batch
+
+    def failing_run_batch(date_lists, now=None, tz=None):
+        if any("坏" in expression for date_list in date_lists for expression in date_list):
+            raise RuntimeError("boom")
+        return run_batch(date_lists, now, tz)
+
+    monkeypatch.setattr(DateTimeUtil, "run_batch", staticmethod(failing_run_batch))
+    results = resolve_chunk([(1, "2024-12-06", ["坏"], None), (2, "2024-12-06", ["今天"], None)])
+    assert results == [(1, "2024-12-06", [], "RuntimeError: boom"), (2, "2024-12-06", ["今天=2024年12月06日"], None)]
+
+
+def test_run_bulk_writes_every_record():
+    lines = [json.dumps({"id": i, "anchor_date": anchor, "expressions": expressions}, ensure_ascii=False)
+             for i, anchor, expressions, _ in RECORDS]
+    output, log = io.StringIO(), io.StringIO()
+    total = run_bulk(read_jsonl(io.StringIO("\n".join(lines))), BulkWriter(output, "jsonl"), workers=1, chunk_size=2,
+                     max_inflight=2, report_every=0, log=log, tz="Asia/Shanghai")
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert total == 4
+    assert [record["id"] for record in records] == [1, 2, 3, 4]
+    assert "error" in records[1] and "error" not in records[0]
+    assert "1 条出错" in log.getvalue()
+
+
+def test_malformed_lines_are_reported():
+    lines = ['{"id": 1, "anchor_date": "2024-12-06", "expressions": ["今天"]}', "{bad json", "[1, 2]", "",
+             '{"id": 5, "expressions": "上周"}', '{"id": 6, "anchor_date": "2024-12-06", "expressions": ["昨天"]}']
+    records = list(read_jsonl(io.StringIO("\n".join(lines))))
+    assert [record[0] for record in records] == [1, None, None, 5, 6]
+    assert [record[3] is None for record in records] == [True, False, False, False, True]
+    assert records[1][3].startswith("第2行") and records[2][3].startswith("第3行") and records[3][3].startswith("第5行")
+
+    output, log = io.StringIO(), io.StringIO()
+    total = run_bulk(iter(records), BulkWriter(output, "jsonl"), workers=1, chunk_size=2, max_inflight=2,
+                     report_every=0, log=log)
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert total == 5
+    assert results[0]["result"] == ["今天=2024年12月06日"] and results[4]["result"] == ["昨天=2024年12月05日"]
+    assert all("error" in result for result in results[1:4])
+    assert "3 条出错" in log.getvalue()
+
+
+def test_csv_bad_expressions_column():
+    text = 'id,anchor_date,expressions\n1,2024-12-06,"[""今天""]"\n2,2024-12-06,"[bad"\n3,2024-12-06,昨天|今天\n'
+    records = list(read_csv(io.StringIO(text)))
+    assert records[0] == ("1", "2024-12-06", ["今天"], None)
+    assert records[1][:3] == ("2", "2024-12-06", []) and records[1][3].startswith("第3行")
+    assert records[2] == ("3", "2024-12-06", ["昨天", "今天"], None)
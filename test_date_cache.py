@@ -0,0 +1,42 @@
+import pytest
+
+from date_cache import ExtractionCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "cache.db"), max_entries=10)
+    yield cache
+    cache.close()
+
+
+def test_get_put_normalizes_question(cache):
+    cache.put("上周的销量是多少？", ["上周"])
+    assert cache.get(" 上周的销量是多少? ") == ["上周"]
+    assert cache.get("今年的销量") is None
+    assert cache.info()["hits"] == 1 and cache.info()["misses"] == 1
+
+
+def test_eviction_keeps_recently_used(cache):
+    cache.put_many([f"问题{i}" for i in range(10)], [["今天"]] * 10)
+    cache.get("问题0")
+    cache.put("问题10", ["昨天"])
+    assert cache.info()["size"] <= 10
+    assert cache.get("问题0") == ["今天"]
+
+
+def test_failed_put_rolls_back(cache, monkeypatch):
+    cache.put_many([f"问题{i}" for i in range(10)], [["今天"]] * 10)
+
+    def failing_evict():
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(cache, "_evict", failing_evict)
+    with pytest.raises(RuntimeError):
+        cache.put_many(["新问题1", "新问题2"], [["上周"], ["本月"]])
+    monkeypatch.undo()
+
+    assert cache.get("新问题1") is None
+    assert cache.info()["size"] == 10
+    cache.put("新问题3", ["明天"])
+    assert cache.get("新问题3") == ["明天"]
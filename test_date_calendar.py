@@ -0,0 +1,58 @@
+from datetime import date
+
+import pytest
+
+from date_calendar import CalendarConfig, FiscalCalendar
+from date_convert import DateTimeUtil
+
+NOW = date(2020, 1, 1)
+
+
+@pytest.fixture
+def use_calendar():
+    def use(calendar):
+        DateTimeUtil.set_calendar(calendar)
+    yield use
+    DateTimeUtil.set_calendar(None)
+
+
+@pytest.mark.parametrize("expression", [
+    "1899年", "2200年", "2101年第1季度", "1899年上半年", "2101年第01周", "2101年第01个完整周", "2101年01月第1个完整周",
+    "1899年12月最后一周", "上周星期0", "本周星期8", "下周星期7", "本季度", "今年", "上周", "近2个完整季度",
+    "近1个完整季度",
+])
+def test_default_calendar_matches_builtin(use_calendar, expression):
+    builtin = DateTimeUtil.run([expression], now=NOW)
+    builtin_range = DateTimeUtil.resolve_range(expression, NOW)
+    use_calendar(FiscalCalendar())
+    assert DateTimeUtil.run([expression], now=NOW) == builtin
+    date_range = DateTimeUtil.resolve_range(expression, NOW)
+    assert (date_range.start, date_range.end) == (builtin_range.start, builtin_range.end)
+
+
+def test_weekday_zero_is_day_before_monday(use_calendar):
+    use_calendar(FiscalCalendar())
+    assert DateTimeUtil.run(["上周星期0"], now=NOW) == ["上周星期0=2019年12月22日"]
+
+
+def test_fiscal_year(use_calendar):
+    use_calendar(FiscalCalendar(CalendarConfig(fiscal_start_month=4)))
+    assert DateTimeUtil.run(["本季度", "今年"], now=date(2024, 5, 15)) == [
+        "本季度=2024年04月01日至2024年06月30日", "今年=2024年04月01日至2025年03月31日"]
+
+
+def test_fiscal_year_outside_index_has_no_range(use_calendar):
+    use_calendar(FiscalCalendar(CalendarConfig(fiscal_start_month=4)))
+    assert DateTimeUtil.run(["2200年"], now=NOW) == ["2200年="]
+    assert DateTimeUtil.resolve_range("2200年", NOW) is None
+
+
+def test_sunday_week_start(use_calendar):
+    use_calendar(FiscalCalendar(CalendarConfig(week_start=6)))
+    assert DateTimeUtil.run(["本周", "上周星期1", "上周星期7"], now=NOW) == [
+        "本周=2019年12月29日至2020年01月04日", "上周星期1=2019年12月23日", "上周星期7=2019年12月22日"]
+
+
+def test_invalid_config():
+    with pytest.raises(ValueError):
+        CalendarConfig(fiscal_start_month=13)
@@ -0,0 +1,56 @@
+from datetime import date
+
+import pytest
+
+from date_calendar import CalendarConfig, FiscalCalendar
+from date_canonical import DateCanonicalUtil
+from date_convert import DateTimeUtil
+
+NOW = date(2024, 12, 3)
+
+
+@pytest.fixture(autouse=True)
+def clear_indexes():
+    DateCanonicalUtil.clear()
+    yield
+    DateTimeUtil.set_calendar(None)
+    DateCanonicalUtil.clear()
+
+
+def test_readme_example():
+    assert DateCanonicalUtil.run(["上周", "近1个完整周", "本季度", "近7天"], now=NOW) == {
+        "上周": "2024年第48个完整周", "近1个完整周": "2024年第48个完整周", "本季度": "2024年第4季度", "近7天": "近7天"}
+
+
+@pytest.mark.parametrize("expression", ["今天", "上月", "去年", "今年上半年", "近3天", "近2个完整季度", "上周星期3",
+                                        "本月第1周", "2024年02月最后一周", "近1年"])
+def test_canonical_resolves_to_same_range(expression):
+    canonical = DateCanonicalUtil.run([expression], now=NOW)[expression]
+    assert canonical is not None
+    original = DateTimeUtil.resolve_range(expression, NOW)
+    assert DateTimeUtil.resolve_range(canonical, NOW).fingerprint == original.fingerprint
+
+
+def test_index_rebuilt_after_calendar_change():
+    index = DateCanonicalUtil.get_index(NOW)
+    assert DateCanonicalUtil.get_index(NOW) is index
+    DateTimeUtil.set_calendar(FiscalCalendar(CalendarConfig(fiscal_start_month=4)))
+    assert DateCanonicalUtil.get_index(NOW) is not index
+    canonical = DateCanonicalUtil.run(["本季度"], now=NOW)["本季度"]
+    assert DateTimeUtil.resolve_range(canonical, NOW).fingerprint == ("2024-10-01", "2024-12-31", "quarter")
+
+
+def test_keeps_recent_days():
+    for offset in range(DateCanonicalUtil.INDEX_DAYS + 2):
+        DateCanonicalUtil.get_index(date(2024, 12, 1 + offset))
+    assert len(DateCanonicalUtil._indexes) == DateCanonicalUtil.INDEX_DAYS
+
+
+def test_annotations_not_evaluated_at_import():
+    # python 3.9 不支持运行时求值 str | None
+    import ast
+    import date_canonical
+    with open(date_canonical.__file__, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    future = [node for node in tree.body if isinstance(node, ast.ImportFrom) and node.module == "__future__"]
+    assert any(alias.name == "annotations" for node in future for alias in node.names)
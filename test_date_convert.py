@@ -0,0 +1,194 @@
+from datetime import date
+
+import pytest
+
+from date_convert import DateTimeUtil
+
+NOW = date(2024, 12, 6)
+
+
+def test_run_resolves_examples():
+    assert DateTimeUtil.run(["上周星期3", "不包含今天的近3天"], now=NOW) == [
+        "上周星期3=2024年11月27日", "不包含今天的近3天=2024年12月03日至2024年12月05日"]
+
+
+def test_run_batch_drops_only_invalid_expressions():
+    results = DateTimeUtil.run_batch([["2023年13月第1周", "今天"], ["上周"]], NOW)
+    assert results == [["今天=2024年12月06日"], ["上周=2024年11月25日至2024年12月01日"]]
+
+
+@pytest.mark.parametrize("expression", ["近99999999999999999999天", "近99999999999999999999周",
+                                        "不包含今天的近99999999999999999999天"])
+def test_run_batch_drops_overflowing_expressions(expression):
+    results = DateTimeUtil.run_batch([[expression, "今天"], ["明天"]], NOW)
+    assert results == [["今天=2024年12月06日"], ["明天=2024年12月07日"]]
+
+
+@pytest.mark.parametrize("expression", ["近99999999999999999999天", "近99999999999999999999周", "2023年02月29日"])
+def test_resolve_range_returns_none_for_out_of_range(expression):
+    assert DateTimeUtil.resolve_range(expression, NOW) is None
+
+
+def test_resolve_range_bounds():
+    date_range = DateTimeUtil.resolve_range("上周", NOW)
+    assert (date_range.start, date_range.end, date_range.granularity) == (date(2024, 11, 25), date(2024, 12, 1), "week")
+
+
+@pytest.fixture
+def day_table():
+    DateTimeUtil.enable_day_table()
+    yield
+    DateTimeUtil.disable_day_table()
+
+
+def test_day_table_matches_rules(day_table):
+    today = date.today()
+    expressions = list(DateTimeUtil.get_day_table(today))
+    DateTimeUtil.disable_day_table()
+    expected = DateTimeUtil.build_date_expressions(expressions, today)
+    DateTimeUtil.enable_day_table()
+    assert DateTimeUtil.build_date_expressions(expressions, today) == expected
+
+
+def test_day_table_not_built_for_past_days(day_table, monkeypatch):
+    built = []
+    build_day_table = DateTimeUtil.build_day_table
+    monkeypatch.setattr(DateTimeUtil, "build_day_table",
+                        staticmethod(lambda now: built.append(now) or build_day_table(now)))
+    for offset in range(30):
+        day = date(2015, 1, 1 + offset)
+        assert DateTimeUtil.run(["上周", "本月"], now=day) == [
+            f"上周={DateTimeUtil.get_week_ex(day, '上周')}", f"本月={DateTimeUtil.get_month_ex(day, '本月')}"]
+    assert built == []
+    assert date(2015, 1, 1) not in DateTimeUtil._day_tables
+
+
+def test_run_batch_counts_each_error_once():
+    metrics = DateTimeUtil.enable_metrics()
+    try:
+        DateTimeUtil.run_batch([["近99999999999999999999天", "今天"]], NOW)
+        snapshot = metrics.snapshot()
+    finally:
+        DateTimeUtil.disable_metrics()
+    assert snapshot["errors"] == 1
+    assert "BATCH" not in snapshot["rules"]
+    assert snapshot["rules"]["RECENT_N_DAY"]["errors"] == 1
+
+
+@pytest.mark.parametrize("year", [1, 4, 100, 1600, 1899, 1900, 2000, 2023, 2024, 2100, 9999])
+def test_ordinal_calendar_matches_datetime(year):
+    from datetime import timedelta
+    from date_convert import OrdinalCalendar
+    jan1 = date(year, 1, 1)
+    assert OrdinalCalendar.year_start(year) == jan1.toordinal()
+    assert OrdinalCalendar.year_end(year) == date(year, 12, 31).toordinal()
+    assert OrdinalCalendar.first_monday(year) == (jan1 + timedelta(days=-jan1.weekday() % 7)).toordinal()
+    for month in range(1, 13):
+        assert OrdinalCalendar.month_start(year, month) == date(year, month, 1).toordinal()
+        assert OrdinalCalendar.year_month(OrdinalCalendar.month_end(year, month)) == (year, month)
+
+
+def test_ordinal_calendar_builds_only_used_years(monkeypatch):
+    from date_convert import OrdinalCalendar
+    monkeypatch.setattr(OrdinalCalendar, "_years", {})
+    DateTimeUtil.run(["上周", "本季度", "去年"], now=NOW)
+    assert set(OrdinalCalendar._years) <= {2023, 2024, 2025}
+    with pytest.raises(ValueError):
+        OrdinalCalendar.year_start(10000)
+
+
+@pytest.fixture
+def expression_cache():
+    cache = DateTimeUtil.enable_cache()
+    yield cache
+    DateTimeUtil.disable_cache()
+
+
+def test_cache_keyed_by_expression_and_day(expression_cache):
+    assert DateTimeUtil.resolve_expression("本月", NOW) == DateTimeUtil.resolve_expression("本月", NOW)
+    assert DateTimeUtil.resolve_expression("本月", date(2025, 1, 6)) == "2025年01月"
+    DateTimeUtil.resolve_expression("上月", NOW)
+    info = DateTimeUtil.cache_info()
+    assert (info["hits"], info["misses"], info["size"]) == (1, 3, 3)
+    assert info["days"] == [NOW, date(2025, 1, 6)]
+
+
+def test_cache_evicts_oldest_day_on_rollover(expression_cache):
+    for offset in range(4):
+        DateTimeUtil.resolve_expression("本周", date(2024, 12, 1 + offset))
+    info = DateTimeUtil.cache_info()
+    assert info["days"] == [date(2024, 12, 2), date(2024, 12, 3), date(2024, 12, 4)]
+    assert info["size"] == 3
+    # 比保留的日期都早的请求照常解析，但不进入缓存
+    assert DateTimeUtil.resolve_expression("本周", date(2024, 12, 1)) == "2024年11月25日至2024年12月01日"
+    assert DateTimeUtil.cache_info()["days"] == info["days"]
+    assert DateTimeUtil.cache_info()["size"] == 3
+
+
+def test_cache_evicts_least_recently_used():
+    from date_convert import ExpressionCache
+    cache = ExpressionCache(maxsize=2)
+    cache.put("今天", NOW, "2024年12月06日")
+    cache.put("昨天", NOW, "2024年12月05日")
+    assert cache.get("今天", NOW) == "2024年12月06日"
+    cache.put("明天", NOW, "2024年12月07日")
+    assert cache.get("昨天", NOW) is ExpressionCache.MISSING
+    assert cache.get("今天", NOW) == "2024年12月06日"
+
+
+def test_cache_bypassed_under_calendar(expression_cache):
+    from date_calendar import CalendarConfig, FiscalCalendar
+    DateTimeUtil.resolve_expression("本季度", NOW)
+    DateTimeUtil.set_calendar(FiscalCalendar(CalendarConfig(fiscal_start_month=4)))
+    try:
+        fiscal = DateTimeUtil.resolve_expression("本季度", NOW)
+        assert DateTimeUtil.resolve_expression("本季度", NOW) == fiscal
+        info = DateTimeUtil.cache_info()
+        assert (info["hits"], info["misses"], info["size"]) == (0, 0, 0)
+    finally:
+        DateTimeUtil.set_calendar(None)
+    assert DateTimeUtil.resolve_expression("本季度", NOW) == DateTimeUtil.get_quarter_ex(NOW, "本季度")
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("今天", date(2024, 12, 7)),
+    ("本周", date(2024, 12, 9)),
+    ("上周", date(2024, 12, 9)),
+    ("本月", date(2025, 1, 1)),
+    ("本季度", date(2025, 1, 1)),
+    ("今年", date(2025, 1, 1)),
+    ("2024年", None),
+    ("不是时间", None),
+])
+def test_next_change_at_period_boundaries(expression, expected):
+    boundary = DateTimeUtil.next_change(expression, NOW)
+    assert (boundary.date() if boundary is not None else None) == expected
+    if boundary is not None:
+        before = date.fromordinal(expected.toordinal() - 1)
+        assert DateTimeUtil.resolve_expression(expression, before) == DateTimeUtil.resolve_expression(expression, NOW)
+        assert DateTimeUtil.resolve_expression(expression, expected) != DateTimeUtil.resolve_expression(expression, NOW)
+
+
+def test_invalidation_index_across_reference_days():
+    from datetime import datetime
+    from date_convert import InvalidationIndex
+    index = InvalidationIndex()
+    index.add("week", "本周", NOW)
+    index.add("month", "本月", date(2024, 11, 20))
+    index.add("quarter", "本季度", NOW)
+    index.add("fixed", "2024年", NOW)
+    assert len(index) == 4 and index.next_change("fixed") is None
+    assert index.next_change("month") == datetime(2024, 12, 1)
+
+    assert set(index.affected(datetime(2024, 12, 6), datetime(2024, 12, 8))) == set()
+    assert set(index.affected(datetime(2024, 11, 30), datetime(2024, 12, 9))) == {"month", "week"}
+    assert index.expire(datetime(2024, 12, 9)) == ["month", "week"]
+    assert len(index) == 2 and index.affected(datetime(2024, 12, 9), datetime(2025, 1, 1)) == ["quarter"]
+
+    # 重新计算后以新的参考日期加回，旧的失效时刻被替换
+    index.add("week", "本周", date(2024, 12, 9))
+    index.add("week", "本周", date(2024, 12, 16))
+    assert index.next_change("week") == datetime(2024, 12, 23)
+    assert index.affected(datetime(2024, 12, 9), datetime(2024, 12, 22)) == []
+    index.remove("quarter")
+    assert index.expire(datetime(2025, 1, 1)) == ["week"] and len(index) == 1
@@ -0,0 +1,41 @@
+from datetime import date
+
+import pytest
+
+from date_extract import DateExtractUtil
+
+
+@pytest.mark.parametrize("question, expressions", [
+    ("上周三和上周五的销量是多少？", ["上周星期3", "上周星期5"]),
+    ("今年上半年的利润", ["今年上半年"]),
+    ("本年度的销量是多少？", ["今年"]),
+    ("公司在不包含今天的近三天内处理的订单数有多少？", ["不包含今天的近3天"]),
+    ("24年8月10号的订单", ["2024年08月10日"]),
+    ("本月中国区的销量", ["本月"]),
+    ("卖出1000件以上的商品", []),
+])
+def test_confident(question, expressions):
+    extraction = DateExtractUtil.extract(question)
+    assert extraction.expressions == expressions
+    assert extraction.confident
+
+
+@pytest.mark.parametrize("question", [
+    "周五的订单", "2023-05-01的订单", "20240501的订单", "2024/5/1的订单", "国庆期间的销量", "春节前后的客流",
+    "今年前三个月的收入", "上月底的库存", "去年以来的增长",
+])
+def test_not_confident(question):
+    assert not DateExtractUtil.extract(question).confident
+
+
+def test_run_calls_fallback_when_not_confident():
+    calls = []
+
+    def fallback(question):
+        calls.append(question)
+        return ["2023年05月01日"]
+
+    assert DateExtractUtil.run("2023-05-01的订单", fallback, now=date(2024, 12, 6)) == ["2023年05月01日=2023年05月01日"]
+    assert calls == ["2023-05-01的订单"]
+    assert DateExtractUtil.run("上周的订单", fallback, now=date(2024, 12, 6)) == ["上周=2024年11月25日至2024年12月01日"]
+    assert len(calls) == 1
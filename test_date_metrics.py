@@ -0,0 +1,69 @@
+from datetime import date
+
+import pytest
+
+from date_convert import DateTimeUtil
+from date_metrics import ResolverMetrics
+
+NOW = date(2024, 12, 6)
+
+
+@pytest.fixture
+def metrics():
+    events = []
+    metrics = ResolverMetrics(lambda event, expression, error: events.append((event, expression)))
+    metrics.events = events
+    yield DateTimeUtil.enable_metrics(metrics)
+    DateTimeUtil.disable_metrics()
+
+
+def test_counters(metrics):
+    DateTimeUtil.run_batch([["今天", "上周", "今天", "不是日期", "近99999999999999999999天"], ["上周"]], NOW)
+    snapshot = metrics.snapshot()
+    assert snapshot["total"] == 4
+    assert snapshot["unmatched"] == 1 and snapshot["errors"] == 1
+    assert snapshot["rules"]["GENERAL_WEEK"]["count"] == 1
+    assert (snapshot["rules"]["RECENT_N_DAY"]["count"], snapshot["rules"]["RECENT_N_DAY"]["errors"]) == (0, 1)
+    assert metrics.events == [("unmatched", "不是日期"), ("error", "近99999999999999999999天")]
+
+
+def test_error_counts_towards_total():
+    metrics = ResolverMetrics(callback=lambda *args: None)
+    metrics.record("GENERAL_WEEK", 3.0)
+    metrics.record_unmatched("不是日期")
+    metrics.record_error("RECENT_N_DAY", "近99999999999999999999天", OverflowError())
+    snapshot = metrics.snapshot()
+    assert snapshot["total"] == 3
+    assert snapshot["total"] == sum(rule["count"] + rule["errors"] for rule in snapshot["rules"].values()) + \
+        snapshot["unmatched"]
+
+
+def test_latency_histogram_is_cumulative():
+    metrics = ResolverMetrics()
+    for elapsed_us in (0.5, 1, 3, 20, 6000):
+        metrics.record("GENERAL_DAY", elapsed_us)
+    rule = metrics.snapshot()["rules"]["GENERAL_DAY"]
+    buckets = rule["latency_buckets_us"]
+    assert buckets["1"] == 2 and buckets["2"] == 2 and buckets["5"] == 3 and buckets["20"] == 4
+    assert buckets["5000"] == 4 and buckets["+Inf"] == 5
+    assert rule["latency_sum_us"] == pytest.approx(6024.5)
+    metrics.reset()
+    assert metrics.snapshot() == {"total": 0, "unmatched": 0, "errors": 0, "rules": {}}
+
+
+def test_prometheus_text():
+    metrics = ResolverMetrics(callback=lambda *args: None)
+    metrics.record("GENERAL_DAY", 3.0)
+    metrics.record_error("GENERAL_DAY", "上月今天", ValueError())
+    metrics.record_unmatched("不是日期")
+    lines = metrics.prometheus(prefix="dr").splitlines()
+    assert "dr_expressions_total 3" in lines
+    assert "dr_unmatched_total 1" in lines
+    assert 'dr_rule_hits_total{rule="GENERAL_DAY"} 1' in lines
+    assert 'dr_rule_errors_total{rule="GENERAL_DAY"} 1' in lines
+    assert 'dr_rule_latency_seconds_bucket{rule="GENERAL_DAY",le="2e-06"} 0' in lines
+    assert 'dr_rule_latency_seconds_bucket{rule="GENERAL_DAY",le="5e-06"} 1' in lines
+    assert 'dr_rule_latency_seconds_bucket{rule="GENERAL_DAY",le="+Inf"} 1' in lines
+    assert 'dr_rule_latency_seconds_sum{rule="GENERAL_DAY"} 3e-06' in lines
+    assert 'dr_rule_latency_seconds_count{rule="GENERAL_DAY"} 1' in lines
+    assert all(line.startswith(("# TYPE dr_", "dr_")) for line in lines)
@@ -0,0 +1,28 @@
+from datetime import date
+
+import pytest
+
+from date_normalize import DateNormalizeUtil
+
+NOW = date(2024, 12, 6)
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("24年2月29日", "2024年02月29日"), ("2024年3月5号", "2024年03月05日"), ("上个月", "上月"), ("近三天", "近3天"),
+    ("最近十二个月", "近12个月"), ("第二季度", "今年第2季度"), ("2024年Q3", "2024年第3季度"), ("Q1", "今年第1季度"),
+    ("上周一", "上周星期1"), ("下个星期天", "下周星期7"), ("二〇二四年", "2024年"), ("近２周", "近2周"),
+    ("近半年", "近6个月"), ("过去一百零五天", "近105天"), ("包含本季度的近3个季度", "包含当前季度的近3个季度"),
+])
+def test_normalize(expression, expected):
+    assert DateNormalizeUtil.normalize(expression) == expected
+
+
+@pytest.mark.parametrize("expression", ["今天", "上月", "本季度", "近7天", "2024年第48个完整周", "上周星期3",
+                                        "不包含今天的近3天", "2024年02月最后一周"])
+def test_canonical_expressions_unchanged(expression):
+    assert DateNormalizeUtil.normalize(expression) == expression
+
+
+def test_run_keeps_original_wording():
+    assert DateNormalizeUtil.run(["上个月", "近三天"], now=NOW) == [
+        "上个月=2024年11月", "近三天=2024年12月03日至2024年12月06日"]
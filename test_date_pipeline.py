@@ -0,0 +1,43 @@
+from datetime import date
+
+from date_cache import ExtractionCache
+from date_pipeline import ExtractionPipeline, RuleBackend
+
+NOW = date(2024, 12, 6)
+QUESTIONS = ["上周三和上周五的销量是多少？", "今年上半年的利润", "上个月的订单", "国庆节前后的客流"]
+
+
+def test_results_keep_input_order():
+    pipeline = ExtractionPipeline(RuleBackend(), batch_size=2)
+    results = pipeline.run(QUESTIONS, now=NOW)
+    assert results[0] == ["上周星期3=2024年11月27日", "上周星期5=2024年11月29日"]
+    assert results[1] == ["今年上半年=2024年01月01日至2024年06月30日"]
+    assert len(results) == len(QUESTIONS)
+    assert pipeline.stats()["generated"] == len(QUESTIONS) and pipeline.stats()["batches"] == 2
+
+
+def test_make_batches_sorts_by_length_and_limits_chars():
+    pipeline = ExtractionPipeline(RuleBackend(), batch_size=3, max_batch_chars=20)
+    questions = ["a" * 9, "a", "a" * 5, "a" * 2, "a" * 8]
+    batches = pipeline.make_batches(questions, list(range(len(questions))))
+    assert [index for batch in batches for index in batch] == [1, 3, 2, 4, 0]
+    assert all(len(batch) <= 3 and max(len(questions[i]) for i in batch) * len(batch) <= 20 for batch in batches)
+
+
+def test_rules_and_cache_skip_the_backend(tmp_path):
+    backend = RuleBackend()
+    cache = ExtractionCache(str(tmp_path / "cache.db"))
+    try:
+        pipeline = ExtractionPipeline(backend, use_rules=True, cache=cache)
+        first = pipeline.run(QUESTIONS, now=NOW)
+        generated = pipeline.generated
+        assert pipeline.skipped > 0 and generated < len(QUESTIONS)
+        assert pipeline.run(QUESTIONS, now=NOW) == first
+        assert pipeline.generated == generated
+    finally:
+        cache.close()
+
+
+def test_parse_output():
+    assert ExtractionPipeline.parse_output("```python\n[\"上周\", '今天']\n```") == ["上周", "今天"]
+    assert ExtractionPipeline.parse_output("没有时间") == []
@@ -0,0 +1,75 @@
+import json
+import asyncio
+
+from date_convert import DateTimeUtil
+from date_server import DateResolverServer, MicroBatcher
+
+
+async def post(port: int, body: bytes, path: str = "/resolve") -> tuple:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return head.split(b"\r\n")[0].decode(), json.loads(payload)
+
+
+def serve_and(requests, server: DateResolverServer = None) -> list:
+    # 启动服务后并发发出 requests（[(body, path), ...]），返回各自的 (状态行, 响应体)
+    async def main():
+        resolver = server or DateResolverServer(MicroBatcher(window_ms=50))
+        resolver.batcher.start()
+        listener = await asyncio.start_server(resolver.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            return await asyncio.gather(*[post(port, body, path) for body, path in requests])
+        finally:
+            listener.close()
+            await listener.wait_closed()
+            await resolver.batcher.stop()
+    return asyncio.run(main())
+
+
+def request(expressions, **fields) -> tuple:
+    return json.dumps({"expressions": expressions, "now": "2024-12-06", **fields}).encode(), "/resolve"
+
+
+def test_resolve():
+    [(status, payload)] = serve_and([request(["上周"])])
+    assert status == "HTTP/1.1 200 OK"
+    assert payload == {"result": ["上周=2024年11月25日至2024年12月01日"]}
+
+
+def test_overflowing_expression_does_not_fail_batched_requests():
+    responses = serve_and([request(["近99999999999999999999天", "今天"]), request(["明天"]), request(["昨天"])])
+    assert [status for status, payload in responses] == ["HTTP/1.1 200 OK"] * 3
+    assert [payload["result"] for status, payload in responses] == [
+        ["今天=2024年12月06日"], ["明天=2024年12月07日"], ["昨天=2024年12月05日"]]
+
+
+def test_unexpected_error_only_fails_its_own_request(monkeypatch):
+    run_batch = DateTimeUtil.run_batch
+
+    def failing_run_batch(date_lists, now=None, tz=None):
+        if any("坏" in expression for date_list in date_lists for expression in date_list):
+            raise RuntimeError("boom")
+        return run_batch(date_lists, now, tz)
+
+    monkeypatch.setattr(DateTimeUtil, "run_batch", staticmethod(failing_run_batch))
+    responses = serve_and([request(["坏"]), request(["今天"]), request(["明天"])])
+    assert responses[0] == ("HTTP/1.1 500 Internal Server Error", {"error": "RuntimeError: boom"})
+    assert responses[1] == ("HTTP/1.1 200 OK", {"result": ["今天=2024年12月06日"]})
+    assert responses[2] == ("HTTP/1.1 200 OK", {"result": ["明天=2024年12月07日"]})
+
+
+def test_bad_requests():
+    responses = serve_and([(b"not json", "/resolve"), request(["今天"], tz="Nowhere/City"), (b"", "/missing")])
+    assert [status for status, payload in responses] == [
+        "HTTP/1.1 400 Bad Request", "HTTP/1.1 400 Bad Request", "HTTP/1.1 404 Not Found"]
+
+
+def test_body_size_limit():
+    server = DateResolverServer(MicroBatcher(), max_body=64)
+    [(status, payload)] = serve_and([request(["今天"] * 20)], server)
+    assert status == "HTTP/1.1 413 Payload Too Large"
@@ -0,0 +1,63 @@
+from datetime import date, timezone, timedelta
+
+import pytest
+
+from date_sql import DateSqlUtil
+
+NOW = date(2024, 12, 6)
+
+
+@pytest.mark.parametrize("dialect, expected", [
+    ("mysql", "ds >= '2024-11-25' AND ds < '2024-12-02'"),
+    ("postgresql", "ds >= DATE '2024-11-25' AND ds < DATE '2024-12-02'"),
+    ("hive", "ds >= '20241125' AND ds < '20241202'"),
+])
+def test_run_dialects(dialect, expected):
+    assert DateSqlUtil.run(["上周"], "ds", dialect=dialect, now=NOW) == {"上周": expected}
+
+
+def test_epoch_with_iana_tz_name():
+    # 2024-11-25 00:00 +08:00 与 2024-12-02 00:00 +08:00
+    assert DateSqlUtil.run(["上周"], "ts", dialect="epoch", now=NOW, tz="Asia/Shanghai") == {
+        "上周": "ts >= 1732464000 AND ts < 1733068800"}
+    assert DateSqlUtil.run(["上周"], "ts", dialect="epoch_ms", now=NOW, tz="UTC") == {
+        "上周": "ts >= 1732492800000 AND ts < 1733097600000"}
+
+
+def test_epoch_with_tzinfo():
+    tz = timezone(timedelta(hours=8))
+    assert DateSqlUtil.literal(date(2024, 11, 25), "epoch", tz=tz) == "1732464000"
+
+
+def test_unknown_dialect():
+    with pytest.raises(ValueError):
+        DateSqlUtil.run(["上周"], "ds", dialect="oracle", now=NOW)
+
+
+def test_coalesce_merges_overlapping_and_adjacent():
+    ranges = [(date(2024, 12, 2), date(2024, 12, 8)), (date(2024, 11, 25), date(2024, 12, 1)),
+              (date(2024, 10, 5), date(2024, 10, 5)), (date(2024, 11, 27), date(2024, 12, 3))]
+    assert DateSqlUtil.coalesce(ranges) == [(date(2024, 10, 5), date(2024, 10, 5)),
+                                            (date(2024, 11, 25), date(2024, 12, 8))]
+    assert DateSqlUtil.coalesce([]) == []
+
+
+def test_run_partitions():
+    assert DateSqlUtil.run_partitions(["本周", "上周", "近7天", "2024年10月05日"], "ds", now=date(2024, 12, 3)) == (
+        "(ds = '20241005') OR (ds >= '20241125' AND ds < '20241209')")
+
+
+def test_partition_granularities():
+    ranges = [(date(2024, 11, 30), date(2024, 12, 1))]
+    assert DateSqlUtil.partition_runs(ranges, granularity="month") == [("202411", "202412")]
+    assert DateSqlUtil.partition_keys(ranges, granularity="day") == ["20241130", "20241201"]
+    assert len(DateSqlUtil.partition_keys(ranges, granularity="hour")) == 48
+    assert DateSqlUtil.partition_predicate(ranges, "ds", granularity="month") == "ds >= '202411' AND ds < '202501'"
+    with pytest.raises(ValueError):
+        DateSqlUtil.partition_keys(ranges, granularity="week")
+
+
+def test_coalesced_predicate():
+    ranges = [(date(2024, 11, 25), date(2024, 12, 1)), (date(2024, 12, 2), date(2024, 12, 3))]
+    assert DateSqlUtil.coalesced_predicate(ranges, "dt") == "dt >= '2024-11-25' AND dt < '2024-12-04'"
+    assert DateSqlUtil.coalesced_predicate([], "dt") == "1 = 0"
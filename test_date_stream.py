@@ -0,0 +1,31 @@
+from datetime import date
+
+from date_stream import StreamingListParser, StreamingResolver
+
+NOW = date(2024, 12, 6)
+
+
+def test_parser_across_chunk_boundaries():
+    parser = StreamingListParser()
+    chunks = ["```python\n", "[\"上周", "星期5\", '上周", "星期3', \"a\\\"b\\n\"", "]\n```", "[\"忽略\"]"]
+    elements = [element for chunk in chunks for element in parser.feed(chunk)]
+    assert elements == ["上周星期5", "上周星期3", "a\"b\n"]
+    assert parser.finished
+
+
+def test_parser_one_character_at_a_time():
+    text = "结果：['今天', \"近7天\"]"
+    parser = StreamingListParser()
+    assert [element for char in text for element in parser.feed(char)] == ["今天", "近7天"]
+
+
+def test_resolver_yields_each_element_when_closed():
+    resolver = StreamingResolver(now=NOW)
+    assert resolver.feed("[\"上周") == []
+    assert resolver.feed("\", \"今") == ["上周=2024年11月25日至2024年12月01日"]
+    assert resolver.feed("天\"]") == ["今天=2024年12月06日"]
+    assert resolver.finished and resolver.expressions == ["上周", "今天"]
+
+
+def test_run_with_normalize():
+    assert StreamingResolver.run(["[\"上个", "月\", \"不是日期\"]"], now=NOW, normalize=True) == ["上个月=2024年11月"]
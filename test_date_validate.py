@@ -0,0 +1,60 @@
+import io
+import os
+from datetime import date
+
+import pytest
+
+from date_validate import DEFAULT_SPREADSHEET, MODES, ROOT, expand, load_corpus, load_reference, main, run_sweep
+
+def test_expand_boundary_values():
+    expressions = expand("{%4d}年{%2d}月")
+    assert "2000年02月" in expressions and "2024年13月" in expressions
+    assert len(expressions) == 4 * 14
+
+
+@pytest.mark.skipif(not os.path.exists(DEFAULT_SPREADSHEET), reason="缺少时间表达式.xlsx")
+def test_load_corpus():
+    corpus = load_corpus()
+    assert corpus and all(entry.family and entry.expressions for entry in corpus)
+
+
+def test_reference_same_as_working_tree_warns(tmp_path):
+    log = io.StringIO()
+    load_reference(os.path.join(ROOT, "date_convert.py"), str(tmp_path), log=log)
+    assert "警告" in log.getvalue()
+
+
+def test_reference_is_required():
+    with pytest.raises(SystemExit):
+        main(["--start", "2024-12-01", "--end", "2024-12-01"])
+    with pytest.raises(SystemExit):
+        main(["--reference", "date_convert.py", "--modes", "comments,unknown"])
+
+
+@pytest.mark.skipif(not os.path.exists(DEFAULT_SPREADSHEET), reason="缺少时间表达式.xlsx")
+def test_sweep_reports_diffs(tmp_path):
+    with open(os.path.join(ROOT, "date_convert.py"), encoding="utf-8") as f:
+        source = f.read()
+    formatted = 'f"{day.year}年{day.month:02d}月{day.day:02d}日"'
+    assert formatted in source
+    broken = tmp_path / "date_convert_broken.py"
+    broken.write_text(source.replace(formatted, 'f"{day.year}-{day.month:02d}-{day.day:02d}"'), encoding="utf-8")
+    corpus = [entry for entry in load_corpus() if entry.family == "日"]
+    args = (date(2024, 2, 28), date(2024, 3, 1), 1, 92, 1, 5)
+    stats, diffs = run_sweep(corpus, os.path.join(ROOT, "date_convert.py"), *args, log=io.StringIO())
+    assert not any(stat[1] for stat in stats)
+    stats, diffs = run_sweep(corpus, str(broken), *args, log=io.StringIO())
+    assert any(stat[1] for stat in stats) and len(diffs) == 5
+
+
+@pytest.mark.skipif(not os.path.exists(DEFAULT_SPREADSHEET), reason="缺少时间表达式.xlsx")
+@pytest.mark.parametrize("mode", MODES)
+def test_modes_agree_with_current_implementation(mode):
+    if mode == "vectorize":
+        pytest.importorskip("numpy")
+    corpus = load_corpus()
+    # 跨闰日和月末，覆盖预计算表的重建和缓存的换日
+    stats, diffs = run_sweep(corpus, os.path.join(ROOT, "date_convert.py"), date(2024, 2, 28), date(2024, 3, 1), 1,
+                             2, 1, 5, log=io.StringIO(), mode=mode)
+    assert diffs == []
+    assert sum(stat[0] for stat in stats) > 0
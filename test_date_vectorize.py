@@ -0,0 +1,48 @@
+from datetime import date
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from date_calendar import CalendarConfig, FiscalCalendar  # noqa: E402
+from date_convert import DateTimeUtil  # noqa: E402
+from date_vectorize import VectorDateUtil  # noqa: E402
+
+ANCHORS = ["2023-12-31", "2024-02-29", "2024-05-15", "2024-12-06", "2025-01-01"]
+
+
+def scalar(expression: str) -> tuple:
+    ranges = [DateTimeUtil.resolve_range(expression, date.fromisoformat(anchor)) for anchor in ANCHORS]
+    return [r.start for r in ranges], [r.end for r in ranges]
+
+
+def vector(expression: str) -> tuple:
+    starts, ends = VectorDateUtil.resolve(expression, np.array(ANCHORS, dtype="datetime64[D]"))
+    return starts.astype(object).tolist(), ends.astype(object).tolist()
+
+
+@pytest.mark.parametrize("expression", ["近7天", "上周", "本月", "本季度", "去年第2季度", "今年", "下半年",
+                                        "近2个完整季度", "包含当前季度的近3个季度"])
+def test_matches_scalar(expression):
+    assert vector(expression) == scalar(expression)
+
+
+@pytest.mark.parametrize("expression", ["本季度", "上季度", "今年", "去年上半年", "近2个完整季度", "上周"])
+def test_matches_scalar_with_fiscal_calendar(expression):
+    DateTimeUtil.set_calendar(FiscalCalendar(CalendarConfig(fiscal_start_month=4, week_start=6)))
+    try:
+        assert vector(expression) == scalar(expression)
+    finally:
+        DateTimeUtil.set_calendar(None)
+
+
+def test_unsupported_expression():
+    with pytest.raises(ValueError):
+        VectorDateUtil.resolve("2024年", np.array(ANCHORS, dtype="datetime64[D]"))
+
+
+@pytest.mark.parametrize("expression", ["今年第0季度", "去年第5季度"])
+def test_quarter_out_of_range_is_nat(expression):
+    starts, ends = VectorDateUtil.resolve(expression, np.array(ANCHORS, dtype="datetime64[D]"))
+    assert np.isnat(starts).all() and np.isnat(ends).all()
+    assert all(DateTimeUtil.resolve_range(expression, date.fromisoformat(anchor)) is None for anchor in ANCHORS)
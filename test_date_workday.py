@@ -0,0 +1,56 @@
+from datetime import date
+
+import pytest
+
+from date_convert import DateTimeUtil
+from date_workday import WorkdayCalendar
+
+NOW = date(2024, 10, 8)
+
+
+@pytest.fixture
+def calendar():
+    calendar = WorkdayCalendar.load(first_year=2023, last_year=2025)
+    calendar.register()
+    yield calendar
+    WorkdayCalendar.unregister()
+
+
+def test_holidays_and_adjusted_workdays(calendar):
+    assert not calendar.is_workday(date(2024, 10, 1))
+    assert calendar.is_workday(date(2024, 10, 12))  # 调休的周六
+    assert not calendar.is_workday(date(2024, 10, 13))
+    assert calendar.count(date(2024, 10, 1), date(2024, 10, 31)) == 19
+    assert calendar.count(date(2024, 10, 31), date(2024, 10, 1)) == 0
+
+
+def test_shift_skips_holidays(calendar):
+    assert calendar.shift(date(2024, 10, 8), -1) == date(2024, 9, 30)
+    assert calendar.shift(date(2024, 9, 30), 1) == date(2024, 10, 8)
+    assert calendar.shift(date(2024, 10, 5), 1) == date(2024, 10, 8)
+
+
+def test_registered_rules(calendar):
+    assert DateTimeUtil.run(["近5个工作日", "不包含今天的近1个工作日", "上个工作日", "本月工作日", "本月第1个工作日",
+                             "本月最后一个工作日"], now=NOW) == [
+        "近5个工作日=2024年09月26日至2024年10月08日", "不包含今天的近1个工作日=2024年09月30日至2024年09月30日",
+        "上个工作日=2024年09月30日", "本月工作日=2024年10月08日至2024年10月31日，共19个工作日",
+        "本月第1个工作日=2024年10月08日", "本月最后一个工作日=2024年10月31日"]
+
+
+def test_outside_calendar_years(calendar):
+    with pytest.raises(ValueError):
+        calendar.count(date(2022, 12, 31), date(2023, 1, 3))
+    assert DateTimeUtil.resolve_range("近5个工作日", date(2030, 1, 1)) is None
+
+
+def test_unregister_restores_rules(calendar):
+    WorkdayCalendar.unregister()
+    assert DateTimeUtil.resolve_range("上个工作日", NOW) is None
+
+
+def test_parse_rejects_bad_lines():
+    assert WorkdayCalendar.parse(["2024-10-01~2024-10-03 休 # 国庆", "2024-10-12 班"]) == (
+        [date(2024, 10, 1), date(2024, 10, 2), date(2024, 10, 3)], [date(2024, 10, 12)])
+    with pytest.raises(ValueError):
+        WorkdayCalendar.parse(["2024-10-01 放假"])